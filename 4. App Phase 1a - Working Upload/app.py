@@ -1,20 +1,26 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
-from pycaret.classification import load_model, predict_model
+from pycaret.classification import predict_model
+
+# Models are resolved (and cached once per server process) through the shared model store in "8. Model Registry"
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '8. Model Registry'))
+from legacy_models import load_role_model
 
 # Load the PyCaret models
 models = [
-    load_model('model_y1_tradkeeper'),
-    load_model('model_y2_sweeperkeeper'),
-    load_model('model_y3_ballplayingdefender'),
-    load_model('model_y4_nononsensedefender'),
-    load_model('model_y5_fullback'),
-    load_model('model_y6_allactionmidfielder'),
-    load_model('model_y7_midfieldplaymaker'),
-    load_model('model_y8_traditionalwinger'),
-    load_model('model_y9_invertedwinger'),
-    load_model('model_y10_goalpoacher'),
-    load_model('model_y11_targetman')
+    load_role_model('Traditional Keeper'),
+    load_role_model('Sweeper Keeper'),
+    load_role_model('Ball-Playing Defender'),
+    load_role_model('No-Nonsense Defender'),
+    load_role_model('Full-Back'),
+    load_role_model('All-Action Midfielder'),
+    load_role_model('Midfield Playmaker'),
+    load_role_model('Traditional Winger'),
+    load_role_model('Inverted Winger'),
+    load_role_model('Goal Poacher'),
+    load_role_model('Target Man')
 ]
 
 # Streamlit app
@@ -1,22 +1,28 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
-from pycaret.classification import load_model, predict_model
+from pycaret.classification import predict_model
+
+# Models are resolved (and cached once per server process) through the shared model store in "8. Model Registry"
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '8. Model Registry'))
+from legacy_models import load_role_model
 
 # Load the PyCaret models
 def load_all_models():
     try:
         models = {
-            "Traditional Keeper": load_model('model_y1_tradkeeper'),
-            "Sweeper Keeper": load_model('model_y2_sweeperkeeper'),
-            "Ball-Playing Defender": load_model('model_y3_ballplayingdefender'),
-            "No-Nonsense Defender": load_model('model_y4_nononsensedefender'),
-            "Full-Back": load_model('model_y5_fullback'),
-            "All-Action Midfielder": load_model('model_y6_allactionmidfielder'),
-            "Midfield Playmaker": load_model('model_y7_midfieldplaymaker'),
-            "Traditional Winger": load_model('model_y8_traditionalwinger'),
-            "Inverted Winger": load_model('model_y9_invertedwinger'),
-            "Goal Poacher": load_model('model_y10_goalpoacher'),
-            "Target Man": load_model('model_y11_targetman')
+            "Traditional Keeper": load_role_model('Traditional Keeper'),
+            "Sweeper Keeper": load_role_model('Sweeper Keeper'),
+            "Ball-Playing Defender": load_role_model('Ball-Playing Defender'),
+            "No-Nonsense Defender": load_role_model('No-Nonsense Defender'),
+            "Full-Back": load_role_model('Full-Back'),
+            "All-Action Midfielder": load_role_model('All-Action Midfielder'),
+            "Midfield Playmaker": load_role_model('Midfield Playmaker'),
+            "Traditional Winger": load_role_model('Traditional Winger'),
+            "Inverted Winger": load_role_model('Inverted Winger'),
+            "Goal Poacher": load_role_model('Goal Poacher'),
+            "Target Man": load_role_model('Target Man')
         }
         st.write("Models loaded successfully.")
         return models
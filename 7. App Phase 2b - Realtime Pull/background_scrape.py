@@ -0,0 +1,203 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from lazy_imports import lazy_import
+from scrape_cache import ScrapeCache, incremental_scrape
+from scrape_jobs import ScrapeJournal, run_scrape_job, unfinished_jobs
+from scraper import make_headless_driver, scrape_squad_urls, scrape_team_urls, summarize_timings
+
+# Finished scrapes a runner keeps for sessions to collect; older ones (and their results) are dropped
+MAX_FINISHED_SCRAPES = 4
+
+
+class BackgroundScrape:
+    """One scrape running on the server's scrape executor, with progress counters and a cancel control.
+
+    Given a league_url, the pages are fetched over HTTP (see http_source) instead, with
+    max_workers requests in flight and the given response cache.
+    """
+
+    def __init__(self, max_workers=1, incremental=True, league_url=None, http_cache=None):
+        self.scrape_id = uuid.uuid4().hex[:8]
+        self.max_workers = max_workers
+        self.incremental = incremental
+        self.league_url = league_url
+        self.http_cache = http_cache
+
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.result = None
+        self.stats = {}
+        self.timings = []
+
+        # Progress counters, updated from the scrape thread and read by the Streamlit sessions
+        self.started_at = None
+        self.players_started_at = None
+        self.teams_done = 0
+        self.teams_total = 0
+        self.players_done = 0
+        self.players_total = 0
+        self.errors = 0
+        self.message = "Queued"
+
+    def cancel(self):
+        """Asks the scrape to stop; the workers finish their current page and close their browsers."""
+        self.cancel_event.set()
+
+    @property
+    def status(self):
+        if self.future is None or not self.future.done():
+            return "cancelling" if self.cancel_event.is_set() else ("running" if self.started_at else "queued")
+        if self.future.exception() is not None:
+            return "failed"
+        return "cancelled" if self.cancel_event.is_set() else "finished"
+
+    @property
+    def error(self):
+        if self.future is not None and self.future.done():
+            return self.future.exception()
+        return None
+
+    def eta_seconds(self):
+        """Estimates the seconds left from the average time per player page so far."""
+        if not self.players_started_at or not self.players_done or self.players_total <= self.players_done:
+            return None
+        elapsed = time.time() - self.players_started_at
+        return elapsed / self.players_done * (self.players_total - self.players_done)
+
+    def progress(self):
+        """Returns a snapshot of the progress counters for display."""
+        return {
+            "status": self.status,
+            "message": self.message,
+            "teams_done": self.teams_done,
+            "teams_total": self.teams_total,
+            "players_done": self.players_done,
+            "players_total": self.players_total,
+            "errors": self.errors,
+            "eta_seconds": self.eta_seconds()
+        }
+
+    ## Callbacks handed to the scrape functions
+
+    def _on_team_progress(self, done, total):
+        self.teams_done, self.teams_total = done, total
+
+    def _on_player_progress(self, done, total):
+        if self.players_started_at is None:
+            self.players_started_at = time.time()
+        self.players_done, self.players_total = done, total
+
+    def _on_error(self, player_url, error):
+        self.errors += 1
+
+    def run(self):
+        """Runs the scrape on the calling thread and returns the scraped players_df."""
+        self.started_at = time.time()
+
+        if self.league_url is not None:
+            return self._fetch_over_http()
+
+        if self.incremental:
+            self.message = "Refreshing stale teams and players"
+            self.result, self.stats = incremental_scrape(
+                ScrapeCache(),
+                max_workers=self.max_workers,
+                timings=self.timings,
+                on_progress=self._on_player_progress,
+                on_team_progress=self._on_team_progress,
+                on_error=self._on_error,
+                cancel_event=self.cancel_event
+            )
+        else:
+            # Resume the last interrupted or cancelled full scrape, or start a new job
+            interrupted_jobs = unfinished_jobs(kind='full')
+            if interrupted_jobs:
+                journal = interrupted_jobs[-1]
+                self.message = f"Resuming scrape job {journal.job_id}"
+            else:
+                self.message = "Collecting team and squad pages"
+                team_urls = scrape_team_urls(driver_factory=make_headless_driver, timings=self.timings,
+                                             cancel_event=self.cancel_event)
+                squad_urls = scrape_squad_urls(team_urls, make_headless_driver, timings=self.timings,
+                                               on_progress=self._on_team_progress, cancel_event=self.cancel_event)
+                player_urls = [url for urls in squad_urls.values() for url in urls]
+                if self.cancel_event.is_set():
+                    return None
+                journal = ScrapeJournal.create(player_urls)
+
+            self.message = f"Scraping player pages (job {journal.job_id})"
+            self.players_total = len(journal.urls)
+            self.result = run_scrape_job(
+                journal,
+                max_workers=self.max_workers,
+                timings=self.timings,
+                on_progress=self._on_player_progress,
+                on_error=self._on_error,
+                cancel_event=self.cancel_event
+            )
+
+        self.stats.update(summarize_timings(self.timings))
+        if not self.cancel_event.is_set():
+            self.message = "Done"
+        elif self.incremental:
+            self.message = "Cancelled; the next refresh fetches the remaining stale players"
+        else:
+            self.message = "Cancelled; the next full scrape resumes the remaining players"
+        return self.result
+
+    def _fetch_over_http(self):
+        self.message = f"Fetching pages from {self.league_url}"
+        self.result, self.stats = lazy_import('http_source').fetch_players_df(
+            self.league_url,
+            max_concurrency=self.max_workers,
+            cache=self.http_cache,
+            on_progress=self._on_player_progress,
+            on_team_progress=self._on_team_progress,
+            on_error=self._on_error,
+            cancel_event=self.cancel_event
+        )
+
+        if not self.cancel_event.is_set():
+            self.message = "Done"
+        else:
+            self.message = "Cancelled; the pages fetched so far are cached for the next fetch"
+        return self.result
+
+
+class ScrapeRunner:
+    """Server-wide executor for scrapes, so they outlive Streamlit reruns and never block a session's script."""
+
+    def __init__(self, max_concurrent=1):
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='scrape')
+        self._scrapes = {}
+        self._lock = threading.Lock()
+
+    def submit(self, max_workers=1, incremental=True, league_url=None, http_cache=None):
+        """Queues a scrape (an HTTP fetch given a league_url) and returns it; further scrapes wait until a slot is free."""
+        scrape = BackgroundScrape(max_workers=max_workers, incremental=incremental, league_url=league_url,
+                                  http_cache=http_cache)
+        with self._lock:
+            self._evict_finished()
+            self._scrapes[scrape.scrape_id] = scrape
+            scrape.future = self._executor.submit(scrape.run)
+        return scrape
+
+    def _evict_finished(self):
+        """Drops the oldest finished scrapes beyond MAX_FINISHED_SCRAPES, so their results can be freed."""
+        finished = [scrape_id for scrape_id, scrape in self._scrapes.items() if scrape.future.done()]
+        for scrape_id in finished[:-MAX_FINISHED_SCRAPES]:
+            del self._scrapes[scrape_id]
+
+    def get(self, scrape_id):
+        return self._scrapes.get(scrape_id)
+
+    def active(self):
+        """Returns the scrapes that are queued or still running."""
+        return [scrape for scrape in self._scrapes.values() if not scrape.future.done()]
+
+    def cancel_all(self):
+        for scrape in self.active():
+            scrape.cancel()
@@ -0,0 +1,193 @@
+"""Times the pipeline on synthetic player pools and saves the results as JSON.
+
+Examples:
+    python benchmark.py
+    python benchmark.py --sizes 1000 10000 --repeat 5
+    python benchmark.py compare benchmarks/old.json benchmarks/new.json
+
+Each stage (cleaning, role composite scoring, 11-model prediction, generate_squad) is
+timed at every pool size, best of --repeat runs, then run once more under tracemalloc
+for its peak memory. Results go to benchmarks/<timestamp>.json so runs can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from cleaning import clean_players
+from role_weights import DEFAULT_PROFILE, composite_scores, load_weight_profiles
+from schema import STAT_NAMES
+from scoring import score_players
+from squad import DEFAULT_NUM_PLAYERS_PER_ROLE, generate_squad
+from synthetic_players import BENCHMARK_SIZES, generate_players
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+
+STAGES = ['cleaning', 'composite_scoring', 'prediction', 'generate_squad']
+
+
+def log(message):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+def measure(run, repeat):
+    """Returns (best seconds of repeat runs, peak traced memory in bytes of one more run)."""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+
+    # Timed separately, since tracing allocations slows the run down
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return min(seconds), peak
+
+
+def load_models():
+    """Returns the role models, or None (with the reason) if they cannot be loaded here."""
+    try:
+        from model_registry import ModelRegistry
+        return ModelRegistry().get_all(), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def benchmark_size(num_players, weights, models, repeat, seed=0):
+    """Runs every stage on a synthetic pool of num_players and returns one result per stage."""
+    log(f"Generating {num_players} players")
+    players_df = generate_players(num_players, seed)
+
+    players_df_sin_reco = clean_players(players_df, weights)
+    scaled = players_df_sin_reco[STAT_NAMES].to_numpy(dtype=float)
+    positions = players_df_sin_reco['POSITION'].to_numpy()
+
+    # The squad is picked from the model probabilities, or from the composite scores without models
+    if models:
+        role_scores = score_players(models, players_df_sin_reco).probabilities
+    else:
+        role_scores = players_df_sin_reco.set_index('Player Name')[list(weights.index)]
+
+    runs = {
+        'cleaning': (num_players, lambda: clean_players(players_df, weights)),
+        'composite_scoring': (len(scaled), lambda: composite_scores(scaled, weights[STAT_NAMES])),
+        'generate_squad': (len(role_scores), lambda: generate_squad(role_scores, positions,
+                                                                    DEFAULT_NUM_PLAYERS_PER_ROLE))
+    }
+    if models:
+        runs['prediction'] = (len(players_df_sin_reco), lambda: score_players(models, players_df_sin_reco))
+
+    results = []
+    for stage in STAGES:
+        result = {'size': num_players, 'stage': stage}
+        if stage not in runs:
+            result['skipped'] = "models could not be loaded"
+        else:
+            rows, run = runs[stage]
+            seconds, peak = measure(run, repeat)
+            result.update({
+                'rows': rows,
+                'seconds': seconds,
+                'rows_per_second': rows / seconds if seconds else None,
+                'peak_mb': peak / 1024 ** 2
+            })
+            log(f"{stage:<18} {rows:>9} rows  {seconds * 1000:10.1f} ms  {result['peak_mb']:8.1f} MB peak")
+        results.append(result)
+    return results
+
+
+def environment():
+    """Returns what a result depends on besides the code: versions, machine and commit."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'commit': commit
+    }
+
+
+def run_benchmarks(sizes=BENCHMARK_SIZES, repeat=3, profile=DEFAULT_PROFILE, with_models=True):
+    weights = load_weight_profiles()[profile]
+    models, reason = load_models() if with_models else (None, "disabled with --no-models")
+    if not models:
+        log(f"Skipping prediction: {reason}")
+
+    results = []
+    for num_players in sizes:
+        results.extend(benchmark_size(num_players, weights, models, repeat))
+
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'repeat': repeat,
+        'profile': profile,
+        'results': results
+    }
+
+
+def save_report(report, output_path=None):
+    if output_path is None:
+        os.makedirs(BENCHMARK_DIR, exist_ok=True)
+        output_path = os.path.join(BENCHMARK_DIR, report['created_at'].replace(':', '') + '.json')
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return output_path
+
+
+def compare_reports(old_path, new_path):
+    """Returns a frame of each (size, stage) in both reports with old and new seconds, peak memory and speedup."""
+    frames = []
+    for path in (old_path, new_path):
+        with open(path) as f:
+            frames.append(pd.DataFrame(json.load(f)['results']).dropna(subset=['seconds']))
+
+    merged = frames[0].merge(frames[1], on=['size', 'stage'], suffixes=('_old', '_new'))
+    merged['speedup'] = merged['seconds_old'] / merged['seconds_new']
+    return merged[['size', 'stage', 'seconds_old', 'seconds_new', 'speedup', 'peak_mb_old', 'peak_mb_new']]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic player pools.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=BENCHMARK_SIZES, help="pool sizes to run at")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage; the best one is kept")
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, help="role weight profile from weight_profiles.json")
+    parser.add_argument('--no-models', action='store_true', help="skip the prediction stage")
+    parser.add_argument('--output', help="JSON file to write (default: benchmarks/<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'compare':
+        print(compare_reports(argv[1], argv[2]).to_string(index=False))
+        return 0
+
+    args = parse_args(argv)
+    report = run_benchmarks(args.sizes, args.repeat, args.profile, with_models=not args.no_models)
+    log(f"Wrote {save_report(report, args.output)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
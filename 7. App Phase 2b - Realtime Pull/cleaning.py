@@ -0,0 +1,124 @@
+import hashlib
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from role_weights import DEFAULT_PROFILE, composite_scores, load_weight_profiles
+from schema import KEEPER_STAT_NAMES, STAT_NAMES, parse_players
+
+### Cleaning Configuration
+
+# Nationality of the players kept for analysis
+NATIONALITY = 'SIN'
+
+# Stat scaled in reverse (lower is better); every other stat is min-max scaled to 25-100
+REVERSE_CODE_COLUMN = 'Dribbled past per game'
+
+# Stats whose missing values are filled with 0 after scaling
+FILL_COLUMNS = KEEPER_STAT_NAMES
+
+# Role scores above this are classed as suitable (1)
+CLASSIFICATION_THRESHOLD = 50
+
+# Bumped whenever the cleaning rules change, so cached cleaned data is rebuilt
+CLEANING_VERSION = 1
+
+
+def stat_bounds(values):
+    """Returns the per-column (min, max) of a 2D array, ignoring NaN (NaN for all-NaN columns)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+
+
+def min_max_scale(values, reverse=False, bounds=None):
+    """Scales each column of a 2D array to 25-100 (100 for the column minimum when reversed).
+
+    bounds is an optional (min, max) pair to scale with instead of the array's own,
+    e.g. the bounds of a whole file that is cleaned one chunk at a time.
+    """
+    if not values.size:
+        return values
+
+    # Like pandas, all-NaN columns and constant columns give NaN/inf instead of warnings
+    min_val, max_val = bounds if bounds is not None else stat_bounds(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if reverse:
+            return 25 + ((max_val - values) / (max_val - min_val)) * 75
+        return 25 + ((values - min_val) / (max_val - min_val)) * 75
+
+
+def select_nationality(players):
+    """Filter to retain only players with SIN nationality."""
+    return players[players['NATIONALITY'] == NATIONALITY].copy()
+
+
+def clean_selected(players_df_sin, weights, bounds=None):
+    """Scales, scores and classifies parsed SIN players (see clean_players).
+
+    bounds is the (min, max) of each stat to scale with; by default those of players_df_sin.
+    """
+    # Scale the stats to 25-100, reverse coding the one where lower is better
+    stats = players_df_sin[STAT_NAMES].to_numpy(dtype=float)
+    reverse = np.array(STAT_NAMES) == REVERSE_CODE_COLUMN
+    if bounds is None:
+        bounds = stat_bounds(stats)
+    scaled = np.where(reverse, min_max_scale(stats, reverse=True, bounds=bounds),
+                      min_max_scale(stats, bounds=bounds))
+
+    # Fill missing values with 0 in the goalkeeping columns
+    fill = np.isin(STAT_NAMES, FILL_COLUMNS)
+    scaled[:, fill] = np.nan_to_num(scaled[:, fill], nan=0.0)
+
+    players_df_sin[STAT_NAMES] = scaled
+
+    # Calculate the score for each role and add it as a new column
+    scores = pd.DataFrame(composite_scores(scaled, weights[STAT_NAMES]), index=players_df_sin.index,
+                          columns=weights.index)
+
+    # Classify each role score as suitable (1) or not (0)
+    classes = (scores > CLASSIFICATION_THRESHOLD).astype(int).add_prefix('Class_')
+
+    return pd.concat([players_df_sin, scores, classes], axis=1)
+
+
+def cleaning_config_key(weights):
+    """Returns a hash of everything besides the data that the cleaning result depends on."""
+    digest = hashlib.sha256()
+    digest.update(repr((CLEANING_VERSION, NATIONALITY, REVERSE_CODE_COLUMN, list(FILL_COLUMNS),
+                        CLASSIFICATION_THRESHOLD, list(weights.index), list(weights.columns))).encode())
+    digest.update(weights.to_numpy(dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def clean_players(players_df, weights=None):
+    """Runs the tab1 cleaning on a raw scrape and returns players_df_sin_reco.
+
+    Reads the schema columns by name, keeps the SIN players, scales the stats to
+    25-100, adds a weighted score per role and a Class_ column per role. weights is
+    a role x stat weight matrix, by default the "Default" profile of weight_profiles.json.
+    """
+    return clean_parsed(parse_players(players_df), weights)
+
+
+def clean_parsed(players, weights=None):
+    """Like clean_players, for players already parsed to the schema (e.g. a stored raw dataset)."""
+    if weights is None:
+        weights = load_weight_profiles()[DEFAULT_PROFILE]
+
+    return clean_selected(select_nationality(players), weights)
+
+
+if __name__ == '__main__':
+    # Usage: python cleaning.py players_raw.csv players_df_sin_reco.csv
+    input_path, output_path = sys.argv[1], sys.argv[2]
+
+    start = time.perf_counter()
+    players_df_sin_reco = clean_players(pd.read_csv(input_path))
+    elapsed = time.perf_counter() - start
+
+    players_df_sin_reco.to_csv(output_path, index=False)
+    print(f"Cleaned {len(players_df_sin_reco)} players in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,217 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_import
+from schema import CLASS_NAMES, STAT_NAMES
+from scoring import RoleScores
+
+# Folder holding one Parquet file per stage and dataset name: datasets/<stage>/<name>.parquet
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datasets')
+
+# Bumped whenever the stored columns or dtypes of a stage change; older files must be rebuilt
+SCHEMA_VERSION = 1
+
+# raw - the parsed schema columns of a scrape or upload, before the SIN filter
+# cleaned - players_df_sin_reco
+# scored - role probabilities and labels, one row per player
+# squads - generated squads, one dataset per configuration
+STAGES = ['raw', 'cleaned', 'scored', 'squads']
+
+DEFAULT_NAME = 'latest'
+EXTENSION = '.parquet'
+
+# Low-cardinality text columns, stored dictionary encoded and read back as categories
+CATEGORY_NAMES = ['NATIONALITY', 'PREFERRED FOOT', 'POSITION']
+
+# Prefix of the label columns of the scored stage (next to the probability columns)
+LABEL_PREFIX = 'Label_'
+
+
+def compact(frame, stage):
+    """Downcasts a stage frame for storage: float32 stats and scores, int8 classes, categories.
+
+    The raw stage keeps its stats as float64, so cleaning a stored scrape again gives
+    exactly the result of cleaning it in memory.
+    """
+    dtypes = {}
+    if stage != 'raw':
+        dtypes.update({name: np.float32 for name in STAT_NAMES if name in frame.columns})
+    dtypes.update({name: np.float32 for name in frame.columns if f'Class_{name}' in frame.columns})
+    dtypes.update({name: np.int8 for name in CLASS_NAMES if name in frame.columns})
+    dtypes.update({name: 'category' for name in CATEGORY_NAMES if name in frame.columns})
+    return frame.astype(dtypes)
+
+
+def arrow_schema(frame, stage):
+    """Returns the Arrow schema a stage frame is stored with, tagged with the stage and schema version.
+
+    Category columns are dictionary encoded with string values, so chunks with different
+    categories can go to the same file.
+    """
+    pa = lazy_import('pyarrow')
+
+    fields = []
+    for name, dtype in frame.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        elif pd.api.types.is_string_dtype(dtype):
+            # object columns as well as the str dtype of pandas 2 and later
+            fields.append(pa.field(name, pa.string()))
+        else:
+            fields.append(pa.field(name, pa.from_numpy_dtype(dtype)))
+
+    metadata = {'goal2030': json.dumps({'stage': stage, 'schema_version': SCHEMA_VERSION})}
+    return pa.schema(fields, metadata=metadata)
+
+
+def stage_path(stage, name=DEFAULT_NAME, root=DATASET_DIR):
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage '{stage}', expected one of {', '.join(STAGES)}")
+    return os.path.join(root, stage, name + EXTENSION)
+
+
+class StageWriter:
+    """Writes a stage to Parquet one frame (row group) at a time, e.g. while ingesting in chunks.
+
+    Rows go to a temporary file that only replaces the stage's file on close(), so
+    readers never see half a dataset. The first frame fixes the stored schema.
+    """
+
+    def __init__(self, stage, name=DEFAULT_NAME, root=DATASET_DIR):
+        self.stage = stage
+        self.path = stage_path(stage, name, root)
+        self.tmp_path = self.path + '.tmp'
+        self.rows = 0
+        self._schema = None
+        self._writer = None
+
+    def write(self, frame):
+        pa = lazy_import('pyarrow')
+        parquet = lazy_import('pyarrow.parquet')
+
+        frame = compact(frame, self.stage)
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._schema = arrow_schema(frame, self.stage)
+            self._writer = parquet.ParquetWriter(self.tmp_path, self._schema)
+
+        self._writer.write_table(pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False))
+        self.rows += len(frame)
+
+    def close(self):
+        """Publishes the written rows. A stage nothing was written to is removed."""
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self.tmp_path, self.path)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        return self.path
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def save_stage(frame, stage, name=DEFAULT_NAME, root=DATASET_DIR):
+    """Stores a whole frame as a stage dataset and returns its path."""
+    with StageWriter(stage, name, root) as writer:
+        writer.write(frame)
+    return writer.path
+
+
+def stage_exists(stage, name=DEFAULT_NAME, root=DATASET_DIR):
+    return os.path.exists(stage_path(stage, name, root))
+
+
+def load_stage(stage, name=DEFAULT_NAME, columns=None, root=DATASET_DIR):
+    """Reads a stage dataset, memory mapped, with only the given columns (all by default).
+
+    Raises ValueError if the file was written by another schema version or for another stage.
+    """
+    parquet = lazy_import('pyarrow.parquet')
+
+    path = stage_path(stage, name, root)
+    metadata = json.loads((parquet.read_schema(path).metadata or {}).get(b'goal2030', b'{}'))
+    if metadata.get('stage') != stage or metadata.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(f"{path} was stored with another schema version; run the stage again")
+
+    table = parquet.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def list_stages(root=DATASET_DIR):
+    """Returns {stage: [dataset names]} of the datasets stored under root."""
+    stages = {}
+    for stage in STAGES:
+        folder = os.path.join(root, stage)
+        if os.path.isdir(folder):
+            stages[stage] = sorted(file_name[:-len(EXTENSION)] for file_name in os.listdir(folder)
+                                   if file_name.endswith(EXTENSION))
+    return stages
+
+
+def export_csv(stage, path, name=DEFAULT_NAME, columns=None, root=DATASET_DIR):
+    """Writes a stage dataset out as CSV, the format kept for sharing outside the app.
+
+    The cleaned, scored and squads stages hold their stats and scores as float32 (see
+    compact), so their CSV values can differ from an in-memory run by about 1e-6.
+    """
+    load_stage(stage, name, columns, root).to_csv(path, index=False)
+    return path
+
+
+def role_scores_frame(role_scores):
+    """Flattens a RoleScores pair into the scored stage layout: player, probabilities, Label_ columns."""
+    probabilities = role_scores.probabilities
+    labels = role_scores.labels.add_prefix(LABEL_PREFIX)
+    frame = pd.concat([probabilities, labels], axis=1)
+    return frame.reset_index() if probabilities.index.name else frame
+
+
+def save_role_scores(role_scores, name=DEFAULT_NAME, root=DATASET_DIR):
+    return save_stage(role_scores_frame(role_scores), 'scored', name, root)
+
+
+def load_role_scores(name=DEFAULT_NAME, roles=None, id_column='Player Name', root=DATASET_DIR):
+    """Reads the scored stage back as a RoleScores pair, reading only the given roles' columns."""
+    parquet = lazy_import('pyarrow.parquet')
+
+    names = parquet.read_schema(stage_path('scored', name, root)).names
+    if roles is None:
+        roles = [column for column in names if LABEL_PREFIX + column in names]
+
+    columns = ([id_column] if id_column in names else []) + list(roles) + [LABEL_PREFIX + role for role in roles]
+    frame = load_stage('scored', name, columns, root)
+    if id_column in frame.columns:
+        frame = frame.set_index(id_column)
+
+    labels = frame[[LABEL_PREFIX + role for role in roles]]
+    labels.columns = list(roles)
+    return RoleScores(probabilities=frame[list(roles)], labels=labels)
+
+
+if __name__ == '__main__':
+    # Usage: python dataset_store.py [list] | export <stage> <output.csv> [name]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+
+    if command == 'export':
+        stage, output_path = sys.argv[2], sys.argv[3]
+        name = sys.argv[4] if len(sys.argv) > 4 else DEFAULT_NAME
+        print(f"Wrote {export_csv(stage, output_path, name)}")
+    else:
+        for stage, names in list_stages().items():
+            print(f"{stage:<8} {', '.join(names)}")
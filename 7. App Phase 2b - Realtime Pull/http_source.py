@@ -0,0 +1,327 @@
+"""Fetches saved league, team and player pages over plain HTTP with asyncio, without a browser.
+
+This is not a drop-in for the Selenium scrape of the live site: SofaScore renders the
+squad lists and the player stats in the browser, so its raw HTML has neither and a fetch
+of sofascore.com returns an empty players_df. It works against pages served with their
+content already in the HTML, such as pages saved from a browser and served by "serve".
+
+Pages go through one pooled aiohttp session with a cap on requests in flight, retries
+with exponential backoff for rate limiting and server errors, and a response cache. They
+are parsed by page_parser like the Selenium scrape, so the result has the same
+players_df layout as scrape_player_data.
+
+Examples:
+    python http_source.py serve saved_pages 8000
+    python http_source.py fetch players_local.csv http://127.0.0.1:8000
+
+"serve" runs a local stand-in for SofaScore from a folder of saved pages laid out like
+the site's paths (e.g. saved_pages/tournament/football/singapore/premier-league/634).
+"""
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import aiohttp
+import pandas as pd
+
+from page_parser import LEAGUE_URL, parse_player_page, parse_squad_urls, parse_team_urls
+
+# Path of the league page, under the base URL of a stand-in server
+LEAGUE_PATH = urlsplit(LEAGUE_URL).path
+
+# Requests in flight at once, which is also the size of the connection pool
+MAX_CONCURRENCY = 8
+
+# Seconds a request (connecting, waiting and reading the page) may take
+REQUEST_TIMEOUT = 10
+
+# Retries of a failed request; the n-th waits BACKOFF_SECONDS * 2 ** n plus up to BACKOFF_SECONDS of jitter
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+
+# Longest Retry-After (seconds) a rate-limited response is waited out for
+MAX_RETRY_AFTER = 60
+
+# Responses worth retrying: rate limiting and server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Seconds a cached page is reused for before it is fetched again
+CACHE_TTL = 3600
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml'
+}
+
+
+class FetchError(Exception):
+    """Raised for a page that could not be fetched, after any retries."""
+
+
+class FetchCancelled(FetchError):
+    """Raised for pages skipped because the fetch was cancelled."""
+
+
+def retry_delay(attempt, backoff=BACKOFF_SECONDS, retry_after=None):
+    """Returns the seconds to wait before retry number attempt (from 0), honouring a Retry-After header."""
+    if retry_after is not None and retry_after.isdigit():
+        return min(int(retry_after), MAX_RETRY_AFTER)
+    return backoff * 2 ** attempt + random.uniform(0, backoff)
+
+
+class ResponseCache:
+    """Page bodies by URL with a time-to-live, kept in memory and, given a directory, on disk too."""
+
+    def __init__(self, directory=None, ttl=CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+
+        # url -> (fetched_at, text)
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + '.html')
+
+    def get(self, url):
+        """Returns the cached page, or None if it is missing or older than the TTL."""
+        with self._lock:
+            page = self._pages.get(url)
+
+        if page is None and self.directory is not None and os.path.exists(self._path(url)):
+            with open(self._path(url), encoding='utf-8') as f:
+                page = (os.path.getmtime(self._path(url)), f.read())
+
+        if page is None or time.time() - page[0] > self.ttl:
+            return None
+        return page[1]
+
+    def put(self, url, text):
+        with self._lock:
+            self._pages[url] = (time.time(), text)
+
+        if self.directory is not None:
+            # Written to a temporary file first so a crash never leaves a page half written
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(url) + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, self._path(url))
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+
+class HttpSource:
+    """Fetches pages concurrently over one pooled aiohttp session, with retries and a response cache.
+
+    Use it as an async context manager, which opens and closes the session:
+
+        async with HttpSource() as source:
+            players_df = await source.fetch_players()
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES,
+                 backoff=BACKOFF_SECONDS, cache=None, cancel_event=None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache = ResponseCache() if cache is None else cache
+
+        # Once set (from any thread), pages not yet requested raise FetchCancelled
+        self.cancel_event = cancel_event or threading.Event()
+
+        self.stats = {'pages': 0, 'cache_hits': 0, 'requests': 0, 'retries': 0, 'errors': 0}
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        # Keep-alive connections are reused across requests, at most max_concurrency of them
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(connector=connector, headers=HEADERS,
+                                              timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self._session.close()
+
+    async def fetch(self, url):
+        """Returns the body of a page, from the cache while it is fresh. Raises FetchError if it cannot be fetched."""
+        self.stats['pages'] += 1
+        text = self.cache.get(url)
+        if text is not None:
+            self.stats['cache_hits'] += 1
+            return text
+
+        # Retries wait while holding their slot, so a rate-limited host gets fewer requests
+        async with self._semaphore:
+            if self.cancel_event.is_set():
+                raise FetchCancelled(f"Cancelled before fetching {url}")
+            text = await self._fetch_with_retries(url)
+
+        self.cache.put(url, text)
+        return text
+
+    async def _fetch_with_retries(self, url):
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            self.stats['requests'] += 1
+            try:
+                async with self._session.get(url) as response:
+                    if response.status == 200:
+                        return await response.text(errors='replace')
+                    if response.status not in RETRY_STATUSES:
+                        self.stats['errors'] += 1
+                        raise FetchError(f"HTTP {response.status} for {url}")
+                    error = f"HTTP {response.status}"
+                    retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__} {e}".strip()
+
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(retry_delay(attempt, self.backoff, retry_after))
+
+        self.stats['errors'] += 1
+        raise FetchError(f"{error} for {url} after {self.max_retries + 1} attempts")
+
+    async def fetch_all(self, urls, on_progress=None):
+        """Fetches the URLs concurrently and returns {url: page text or FetchError}.
+
+        on_progress(done, total) is called as each page finishes.
+        """
+        async def fetch_one(url):
+            try:
+                return url, await self.fetch(url)
+            except FetchError as e:
+                return url, e
+
+        pages = {}
+        for done, task in enumerate(asyncio.as_completed([fetch_one(url) for url in urls]), start=1):
+            url, page = await task
+            pages[url] = page
+            if on_progress is not None:
+                on_progress(done, len(urls))
+        return pages
+
+    async def fetch_squad_urls(self, league_url, on_progress=None):
+        """Returns {team url: player urls} of the league; teams whose page could not be fetched are left out."""
+        team_urls = parse_team_urls(await self.fetch(league_url), league_url)
+        team_pages = await self.fetch_all(team_urls, on_progress)
+
+        squad_urls = {}
+        for team_url in team_urls:
+            if isinstance(team_pages[team_url], FetchCancelled):
+                continue
+            if isinstance(team_pages[team_url], FetchError):
+                print(f"Error processing {team_url}: {team_pages[team_url]}")
+            else:
+                squad_urls[team_url] = parse_squad_urls(team_pages[team_url], team_url)
+
+        if squad_urls and not any(squad_urls.values()):
+            print(f"No squad links on the team pages of {league_url}; pages rendered in the browser, like "
+                  f"SofaScore's, have to be saved and served before they can be fetched over HTTP")
+        return squad_urls
+
+    async def fetch_player_data(self, player_urls, on_progress=None, on_error=None):
+        """Returns the players_df of scrape_player_data for the given player pages, in their order.
+
+        Pages that could not be fetched are left out, after on_error(player_url, error) is
+        called for them; pages skipped by a cancel are left out silently.
+        """
+        player_pages = await self.fetch_all(player_urls, on_progress)
+
+        players_list = []
+        for player_url in player_urls:
+            page = player_pages[player_url]
+            if isinstance(page, FetchCancelled):
+                continue
+            if isinstance(page, FetchError):
+                print(f"Error processing {player_url}: {page}")
+                if on_error is not None:
+                    on_error(player_url, page)
+                continue
+
+            player_dict = parse_player_page(page, player_url)
+            if player_dict is not None:
+                players_list.append(player_dict)
+
+        return pd.DataFrame(players_list)
+
+    async def fetch_players(self, league_url, on_progress=None, on_team_progress=None, on_error=None):
+        """Fetches the league's team, squad and player pages and returns players_df."""
+        squad_urls = await self.fetch_squad_urls(league_url, on_team_progress)
+        player_urls = [player_url for player_urls in squad_urls.values() for player_url in player_urls]
+        return await self.fetch_player_data(player_urls, on_progress, on_error)
+
+
+def fetch_players_df(league_url, max_concurrency=MAX_CONCURRENCY, cache=None, on_progress=None,
+                     on_team_progress=None, on_error=None, cancel_event=None):
+    """Runs HttpSource.fetch_players on a new event loop and returns (players_df, stats).
+
+    Setting cancel_event stops the fetch early; players_df then holds the pages fetched so far.
+    """
+    async def run():
+        async with HttpSource(max_concurrency, cache=cache, cancel_event=cancel_event) as source:
+            players_df = await source.fetch_players(league_url, on_progress, on_team_progress, on_error)
+            return players_df, source.stats
+
+    return asyncio.run(run())
+
+
+## Stand-in Server
+
+class SavedPageHandler(SimpleHTTPRequestHandler):
+    """Serves saved pages as HTML without logging every request."""
+
+    extensions_map = {'': 'text/html; charset=utf-8', '.html': 'text/html; charset=utf-8'}
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in_server(directory, port=0, handler=SavedPageHandler):
+    """Serves a folder of saved pages on localhost from a background thread, as a stand-in for SofaScore.
+
+    Links in the saved pages should be relative to the site ("/team/..."), so they resolve
+    against the stand-in. A SavedPageHandler subclass can be given to simulate errors.
+    Returns (server, base_url); stop it with server.shutdown().
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), partial(handler, directory=directory))
+    threading.Thread(target=server.serve_forever, name='stand-in-server', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    # Usage: python http_source.py fetch <output.csv> <stand-in base url> | serve <folder> [port]
+    command = sys.argv[1]
+
+    if command == 'serve':
+        port = int(sys.argv[3]) if len(sys.argv) > 3 else 8000
+        server, base_url = start_stand_in_server(sys.argv[2], port)
+        print(f"Serving {sys.argv[2]} at {base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        output_path = sys.argv[2]
+        league_url = sys.argv[3].rstrip('/') + LEAGUE_PATH
+
+        start = time.perf_counter()
+        players_df, stats = fetch_players_df(league_url)
+        players_df.to_csv(output_path, index=False)
+        print(f"Wrote {len(players_df)} players to {output_path} in {time.perf_counter() - start:.1f}s "
+              f"({stats['requests']} requests, {stats['cache_hits']} cache hits, {stats['retries']} retries, "
+              f"{stats['errors']} errors)")
@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cleaning import NATIONALITY, clean_selected, select_nationality, stat_bounds
+from dataset_store import (CATEGORY_NAMES, DATASET_DIR, DEFAULT_NAME, StageWriter, load_role_scores, load_stage,
+                           role_scores_frame)
+from role_weights import DEFAULT_PROFILE, load_weight_profiles
+from schema import INFO_COLUMNS, PLAYER_COLUMNS, STAT_COLUMNS, STAT_NAMES, parse_players, require_columns
+from scoring import score_players
+
+# Rows read from the upload at a time; peak memory grows with this, not with the file size
+DEFAULT_CHUNKSIZE = 5000
+
+NATIONALITY_COLUMN = [column for column in INFO_COLUMNS if column.name == 'NATIONALITY']
+
+# Summary of one ingest: rows read, SIN players kept, chunks processed, the dataset name
+# and root it was stored under, and the written {stage: path}
+IngestResult = namedtuple('IngestResult', ['rows', 'players', 'chunks', 'name', 'root', 'paths'])
+
+
+def read_dtypes(columns):
+    """Returns the read_csv dtypes of the schema columns: categories for the low-cardinality
+    text columns and strings for the rest, which the schema parsers then turn into numbers."""
+    return {column.label: 'category' if column.name in CATEGORY_NAMES else str for column in columns}
+
+
+def read_chunks(source, columns, chunksize=DEFAULT_CHUNKSIZE):
+    """Reads a raw players CSV in chunks, parsing only the given schema columns.
+
+    Every other column (e.g. the hundreds of date-of-birth headers of a scrape) is
+    skipped while reading, so it never takes memory.
+    """
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    labels = {column.label for column in columns}
+    reader = pd.read_csv(source, usecols=lambda label: label in labels, dtype=read_dtypes(columns),
+                         chunksize=chunksize)
+    for chunk in reader:
+        yield parse_players(chunk, columns)
+
+
+def scan_bounds(source, chunksize=DEFAULT_CHUNKSIZE):
+    """First pass: returns (rows, (min, max) of each stat over the SIN players) of the whole file.
+
+    The cleaning scales every stat by the minimum and maximum of all SIN players, so
+    these have to be known before any chunk can be scaled.
+    """
+    rows = 0
+    min_val = np.full(len(STAT_NAMES), np.nan)
+    max_val = np.full(len(STAT_NAMES), np.nan)
+
+    for chunk in read_chunks(source, NATIONALITY_COLUMN + STAT_COLUMNS, chunksize):
+        rows += len(chunk)
+        stats = chunk.loc[chunk['NATIONALITY'] == NATIONALITY, STAT_NAMES].to_numpy(dtype=float)
+        if len(stats):
+            # fmin/fmax ignore NaN, so a stat stays NaN only if no chunk has a value for it
+            chunk_min, chunk_max = stat_bounds(stats)
+            min_val, max_val = np.fmin(min_val, chunk_min), np.fmax(max_val, chunk_max)
+
+    return rows, (min_val, max_val)
+
+
+def ingest_players(source, name=DEFAULT_NAME, weights=None, models=None, chunksize=DEFAULT_CHUNKSIZE,
+                   root=DATASET_DIR, csv_path=None):
+    """Cleans (and, if models are given, scores) a raw players CSV of any size, one chunk at a time.
+
+    source is a path or a file-like object such as a Streamlit upload. Gives the same
+    players_df_sin_reco and role scores as clean_players and score_players on the whole
+    file, streamed into the 'cleaned' and 'scored' stages of the dataset store, and
+    returns an IngestResult. Stats and scores are stored as float32.
+
+    Given csv_path, the cleaned chunks are also written there as CSV before they are
+    downcast, so the file matches players_df_sin_reco.csv of an in-memory run.
+    """
+    if weights is None:
+        weights = load_weight_profiles()[DEFAULT_PROFILE]
+
+    # Check the header for the required columns before reading any rows
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    require_columns(pd.read_csv(source, nrows=0))
+
+    rows, bounds = scan_bounds(source, chunksize)
+
+    # Second pass: scale each chunk with the file's bounds, score it and append it
+    players, chunks = 0, 0
+    csv_file = None if csv_path is None else open(csv_path + '.tmp', 'w', newline='', encoding='utf-8')
+    try:
+        with StageWriter('cleaned', name, root) as cleaned_writer, StageWriter('scored', name, root) as scored_writer:
+            for chunk in read_chunks(source, PLAYER_COLUMNS, chunksize):
+                chunks += 1
+                players_df_sin = select_nationality(chunk)
+                if players_df_sin.empty:
+                    continue
+
+                cleaned = clean_selected(players_df_sin, weights, bounds)
+                players += len(cleaned)
+
+                # Score and export before the writer downcasts, so both see the same values as in memory
+                if models:
+                    scored_writer.write(role_scores_frame(score_players(models, cleaned)))
+                if csv_file is not None:
+                    cleaned.to_csv(csv_file, index=False, header=not cleaned_writer.rows)
+
+                cleaned_writer.write(cleaned)
+    except BaseException:
+        if csv_file is not None:
+            csv_file.close()
+            os.remove(csv_path + '.tmp')
+        raise
+
+    # Like the stages, no CSV is left behind when no player was kept
+    if csv_file is not None:
+        csv_file.close()
+        if cleaned_writer.rows:
+            os.replace(csv_path + '.tmp', csv_path)
+        else:
+            os.remove(csv_path + '.tmp')
+
+    paths = {writer.stage: writer.path for writer in (cleaned_writer, scored_writer) if writer.rows}
+    return IngestResult(rows, players, chunks, name, root, paths)
+
+
+def read_cleaned(result, columns=None):
+    """Reads the cleaned players of an ingest back, only the given columns (empty if there were none)."""
+    if 'cleaned' not in result.paths:
+        return pd.DataFrame()
+    return load_stage('cleaned', result.name, columns, result.root)
+
+
+def read_role_scores(result, roles=None):
+    """Reads the role scores of an ingest back as a RoleScores pair, or returns None if it was not scored."""
+    if 'scored' not in result.paths:
+        return None
+    return load_role_scores(result.name, roles, root=result.root)
+
+
+if __name__ == '__main__':
+    # Usage: python ingest.py players_raw.csv [dataset name] [chunksize]
+    input_path = sys.argv[1]
+    name = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_NAME
+    chunksize = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CHUNKSIZE
+
+    start = time.perf_counter()
+    result = ingest_players(input_path, name, chunksize=chunksize)
+    elapsed = time.perf_counter() - start
+
+    print(f"Read {result.rows} rows in {result.chunks} chunks, kept {result.players} players in {elapsed:.1f}s")
+    for path in result.paths.values():
+        print(f"Wrote {path}")
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Records kept per Diagnostics; the oldest are dropped first
+MAX_RECORDS = 500
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def current_rss():
+    """Returns the resident memory of this process in bytes, or None where it cannot be read cheaply."""
+    if _PAGE_SIZE is not None:
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * _PAGE_SIZE
+        except OSError:
+            pass
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+class _NullStage:
+    """Stand-in for Stage when diagnostics are off: entering and leaving it does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def set_rows(self, rows):
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+
+class Stage:
+    """Times one run of a pipeline stage and records its wall time, rows and memory delta on exit."""
+
+    def __init__(self, diagnostics, name, rows=None, **details):
+        self.diagnostics = diagnostics
+        self.name = name
+        self.rows = rows
+        self.details = details
+
+    def set_rows(self, rows):
+        """Sets the number of rows processed, for stages that only know it at the end."""
+        self.rows = rows
+
+    def __enter__(self):
+        self._rss = current_rss()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        seconds = time.perf_counter() - self._start
+        rss = current_rss()
+
+        record = {
+            'stage': self.name,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(time.time() - seconds)),
+            'seconds': seconds,
+            'rows': self.rows,
+            'rows_per_second': self.rows / seconds if self.rows and seconds else None,
+            'memory_delta_mb': (rss - self._rss) / 1024 ** 2 if rss is not None and self._rss is not None else None,
+            'rss_mb': rss / 1024 ** 2 if rss is not None else None,
+            'error': exc_type.__name__ if exc_type else None
+        }
+        record.update(self.details)
+        self.diagnostics.add(record)
+        return False
+
+
+class Diagnostics:
+    """Collects per-stage timing and memory records, e.g. for one Streamlit session.
+
+    Wrap each stage in "with diagnostics.stage('cleaning', rows=n):". While disabled,
+    stage() hands back a shared do-nothing context, so the instrumentation costs one
+    attribute check per stage and nothing is measured or stored.
+    """
+
+    def __init__(self, enabled=False, max_records=MAX_RECORDS):
+        self.enabled = enabled
+        self.records = deque(maxlen=max_records)
+        self.run = 0
+        self._lock = threading.Lock()
+
+    def stage(self, name, rows=None, **details):
+        if not self.enabled:
+            return NULL_STAGE
+        return Stage(self, name, rows, run=self.run, **details)
+
+    def new_run(self):
+        """Starts a new run (e.g. a Streamlit rerun), so its records can be told apart."""
+        self.run += 1
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+    def last_run(self):
+        """Returns the records of the latest run that recorded anything."""
+        with self._lock:
+            records = list(self.records)
+        if not records:
+            return []
+        run = records[-1].get('run')
+        return [record for record in records if record.get('run') == run]
+
+    def summary(self):
+        """Returns {stage: {runs, total, mean and max seconds, mean memory delta}} over all records."""
+        with self._lock:
+            records = list(self.records)
+
+        summary = {}
+        for record in records:
+            stats = summary.setdefault(record['stage'], {'runs': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                                                         'memory_delta_mb': 0.0})
+            stats['runs'] += 1
+            stats['total_seconds'] += record['seconds']
+            stats['max_seconds'] = max(stats['max_seconds'], record['seconds'])
+            stats['memory_delta_mb'] += record['memory_delta_mb'] or 0.0
+
+        for stats in summary.values():
+            stats['mean_seconds'] = stats['total_seconds'] / stats['runs']
+            stats['memory_delta_mb'] /= stats['runs']
+        return summary
+
+    def to_json_lines(self):
+        """Returns the records as JSON lines, one structured metric per stage run."""
+        with self._lock:
+            return ''.join(json.dumps(record) + '\n' for record in self.records)
+
+    def export(self, path):
+        """Appends the records to a JSON lines file and returns its path."""
+        with open(path, 'a') as f:
+            f.write(self.to_json_lines())
+        return path
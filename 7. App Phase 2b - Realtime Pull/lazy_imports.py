@@ -0,0 +1,85 @@
+import importlib
+import re
+import subprocess
+import sys
+import threading
+import time
+
+# Heavy subsystems, imported on first use instead of when the app starts
+HEAVY_MODULES = {
+    "pycaret.classification": "Predictions (loading the role models)",
+    "selenium.webdriver": "Scraping",
+    "scipy.optimize": "Optimal squad selection",
+    "joblib": "Model preprocessing",
+    "pyarrow.parquet": "Stored datasets (Parquet)",
+    "aiohttp": "Fetching over HTTP"
+}
+
+# Modules every run of the app imports up front
+STARTUP_MODULES = ["streamlit", "pandas", "numpy"]
+
+# module name -> seconds its first import took in this process, filled in by lazy_import
+IMPORT_TIMES = {}
+_lock = threading.Lock()
+
+IMPORTTIME_PATTERN = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def lazy_import(name):
+    """Imports a module the first time it is needed, recording how long the import took.
+
+    Later calls return the already imported module from sys.modules at no cost.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    with _lock:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def import_report():
+    """Returns [(module, seconds)] of the lazy imports done so far in this process, slowest first."""
+    return sorted(IMPORT_TIMES.items(), key=lambda item: -item[1])
+
+
+def _top_level_imports(statement, python=sys.executable):
+    """Runs a statement under -X importtime and returns {module: cumulative microseconds} of its top-level imports."""
+    result = subprocess.run([python, '-X', 'importtime', '-c', statement], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        # Imports made directly by the statement (or by interpreter startup) are indented by one space
+        if match and len(match.group(3)) == 1:
+            imports[match.group(4)] = int(match.group(2))
+    return imports
+
+
+def measure_import_time(name, python=sys.executable):
+    """Returns the cold import time of a module in seconds, measured in a fresh interpreter with -X importtime.
+
+    Modules the interpreter imports at startup anyway are not counted.
+    """
+    baseline = _top_level_imports('pass', python) or {}
+    imports = _top_level_imports(f'import {name}', python)
+    if imports is None:
+        return None
+    return sum(us for module, us in imports.items() if module not in baseline) / 1e6
+
+
+def measure_import_times(names=None):
+    """Returns {module: cold import seconds (None if it is not installed)} for the startup and heavy modules."""
+    names = names or STARTUP_MODULES + list(HEAVY_MODULES)
+    return {name: measure_import_time(name) for name in names}
+
+
+if __name__ == '__main__':
+    # Usage: python lazy_imports.py [module ...]
+    for name, seconds in measure_import_times(sys.argv[1:]).items():
+        print(f"{name:<28} {'not installed' if seconds is None else f'{seconds:.3f}s'}")
@@ -1,248 +1,94 @@
 #Import libraries
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-import time
-import random
-from bs4 import BeautifulSoup as bs
-import pandas as pd
-import re
-import requests
+import os
 import streamlit as st
 import pandas as pd
-from pycaret.classification import load_model, predict_model
+import numpy as np
+from cleaning import clean_parsed, clean_players, cleaning_config_key
+from role_weights import DEFAULT_PROFILE, load_weight_profiles
+from schema import SchemaError, parse_players, validate_players
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache, cached_frame_fingerprint
+from scoring import RoleScores, score_players
+from lazy_imports import import_report, lazy_import, measure_import_times
+from squad import POSITION_ROLES, SQUAD_METHODS
+from squad_batch import batch_squads, load_squad_configs
+from ingest import DEFAULT_CHUNKSIZE, ingest_players, read_cleaned, read_role_scores
+from dataset_store import load_stage, save_role_scores, save_stage, stage_exists, stage_path
+from player_history import PlayerHistory, player_id
+from instrumentation import Diagnostics
+
+# Dataset names in the store (datasets/<stage>/<name>.parquet)
+SCRAPE_DATASET = 'livescrape'
+UPLOAD_DATASET = 'upload'
 
 ### Define Functions
 
-## Scrape Team Links
-def scrape_team_urls():
-    # Initialize the WebDriver (Make sure you have the appropriate driver installed, e.g., chromedriver for Chrome)
-    driver = webdriver.Chrome()
-
-    # Navigate to the webpage
-    driver.get('https://www.sofascore.com/tournament/football/singapore/premier-league/634')
-
-    # Find all div elements with the specified class name using a CSS selector
-    div_elements = driver.find_elements(By.CSS_SELECTOR, "div.Box.eHXJll")
-
-    # Create a list to store all the player page urls
-    team_urls = []
-
-    # Loop through each div element and find all a elements within it
-    for div in div_elements:
-        # Find all <a> elements within the current <div>
-        link_elements = div.find_elements(By.CSS_SELECTOR, "a")
-        
-        # Loop through each <a> element and extract its href attribute
-        for link in link_elements:
-            href = link.get_attribute('href')
-            team_urls.append(href)
-            print(href)
-
-    # Close the WebDriver
-    driver.quit()
-
-    # Return the list of team URLs
-    return team_urls
-
-## Scrape Player Links
-def scrape_player_urls(team_urls):
-    # Initialize the WebDriver (Make sure you have the appropriate driver installed, e.g., chromedriver for Chrome)
-    driver = webdriver.Chrome()
-
-    # Create a list to store all the player page urls
-    player_urls = []
-
-    # Loop through each team URL
-    for team_url in team_urls:
-        
-        # Navigate to the team webpage
-        driver.get(team_url)
-
-        # Find the element using XPath and click it to navigate to the squad page
-        try:
-            element = driver.find_element(By.XPATH, "/html/body/div[1]/main/div[1]/div[3]/div[1]/div/div/div/h2[4]/a")
-            element.click()
-
-            # Find all div elements with the specified class name using a CSS selector
-            div_elements = driver.find_elements(By.CSS_SELECTOR, "div.Box.dflyPx")
-
-            # Loop through each div element and find all <a> elements within it
-            for div in div_elements:
-                link_elements = div.find_elements(By.CSS_SELECTOR, "a")
-                
-                # Loop through each <a> element and extract the href attribute
-                for link in link_elements:
-                    href = link.get_attribute('href')
-                    player_urls.append(href)
-                    print(href)
-
-        except Exception as e:
-            print(f"Error processing {team_url}: {e}")
-
-    # Close the WebDriver
-    driver.quit()
-
-    # Return the list of player URLs
-    return player_urls
-
-## Scrape Player Data
-
-def scrape_player_data(player_urls):
-    # Initialize the WebDriver (Make sure you have the appropriate driver installed, e.g., chromedriver for Chrome)
-    driver = webdriver.Chrome()
-
-    # Instantiate a list to store the stats of each player
-    players_list = []
-
-    for player_url in player_urls:
-        
-        # Navigate to the player's webpage
-        driver.get(player_url)
-
-        # Pause to allow the page to load with a random delay
-        time.sleep(random.uniform(2, 3))
-        
-        # Check if the bdi element contains the value 2024
-        try:
-            bdi_element = driver.find_element(By.CSS_SELECTOR, "bdi.Text.jFxLbA")
-            if bdi_element.text != "2024":
-                continue  # Skip this player if the value is not 2024
-        except:
-            continue  # Skip this player if the bdi element is not found
-        
-        # Define the CSS selectors
-        css_selectors = [
-            "div.Box.Flex.dlyXLO.bnpRyo",
-            "div.Box.fGLgkO",
-            "div.Box.jwDcoO"
-        ]
-        
-        player_list = []
-
-        # Find and collect elements for each CSS selector
-        for selector in css_selectors:
-            div_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            for div in div_elements:
-                lines = div.text.split("\n")
-                if len(lines) >= 2:  # Ensure there are at least two lines to avoid errors
-                    player_list.append(lines[0])
-                    player_list.append(lines[1])
-        
-        # Initialize an empty dictionary
-        player_dict = {}
-
-        # Extract the string between the last two backslashes
-        last_part = player_url.rstrip('/').split('/')[-2]
-
-        # Remove any hyphens from the extracted string
-        last_part_cleaned = last_part.replace('-', ' ')
+# Share one model registry across all sessions and reruns of this server process
+@st.cache_resource
+def get_model_registry():
+    return ModelRegistry()
 
-        # Store player name
-        player_dict["Player Name"] = last_part_cleaned
-
-        # Loop through the list with index
-        for i in range(0, len(player_list), 2):
-            # Assign even-indexed value as key and odd-indexed value as value
-            player_dict[player_list[i]] = player_list[i + 1]
-
-        # Append the dictionary to the list
-        players_list.append(player_dict)
-    
-    # Close the WebDriver
-    driver.quit()
-
-    # Create and return DataFrame of players
-    players_df = pd.DataFrame(players_list)
-    return players_df
-
-# Load the PyCaret models
+# Load the PyCaret models (each pickle is only deserialized again if it changed on disk)
 def load_all_models():
     try:
-        models = {
-            "Traditional Keeper": load_model('model_Class_Traditional Keeper'),
-            "Sweeper Keeper": load_model('model_Class_Sweeper Keeper'),
-            "Ball-Playing Defender": load_model('model_Class_Ball-Playing Defender'),
-            "No-Nonsense Defender": load_model('model_Class_No-Nonsense Defender'),
-            "Full-Back": load_model('model_Class_Full-Back'),
-            "All-Action Midfielder": load_model('model_Class_All-Action Midfielder'),
-            "Midfield Playmaker": load_model('model_Class_Midfield Playmaker'),
-            "Traditional Winger": load_model('model_Class_Traditional Winger'),
-            "Inverted Winger": load_model('model_Class_Inverted Winger'),
-            "Goal Poacher": load_model('model_Class_Goal Poacher'),
-            "Target Man": load_model('model_Class_Target Man')
-        }
+        with diagnostics.stage('load_models') as stage:
+            models = get_model_registry().get_all()
+            stage.set_rows(len(models))
         st.write("Models loaded successfully.")
         return models
     except Exception as e:
         st.error(f"Error loading models: {e}")
         return {}
 
+# Share one bounded prediction cache across all sessions of this server process
+@st.cache_resource
+def get_prediction_cache():
+    return PredictionCache(max_entries=16, max_bytes=256 * 1024 * 1024)
+
+
+# Share one connection to the player history database across all sessions
+@st.cache_resource
+def get_player_history():
+    return PlayerHistory()
+
+# Snapshots never change once recorded, so each is read from the database once
+@st.cache_data
+def load_snapshot(snapshot_id):
+    return get_player_history().snapshot(snapshot_id)
+# The same frame object is returned until the stored scrape changes, so its fingerprint is reused
+@st.cache_resource(max_entries=2)
+def load_stored_scrape(mtime):
+    return load_stage('raw', SCRAPE_DATASET)
+
+# Share one bounded cache of cleaned data across all sessions of this server process
+@st.cache_resource
+def get_cleaning_cache():
+    return PredictionCache(max_entries=8, max_bytes=128 * 1024 * 1024)
+
+# Key of the cleaned data each stage was last written with by this server
+@st.cache_resource
+def get_persisted_keys():
+    return {}
+
+def persist_cleaned(players_df_sin_reco, key):
+    """Writes the cleaned stage only when the cleaned data differs from what was last written."""
+    persisted = get_persisted_keys()
+    if persisted.get('cleaned') != key:
+        save_stage(players_df_sin_reco, 'cleaned')
+        persisted['cleaned'] = key
+
+# The CSV download is built once per cleaned result rather than on every rerun
+@st.cache_data(max_entries=4)
+def cleaned_csv(key, _players_df_sin_reco):
+    return _players_df_sin_reco.to_csv(index=False)
+
+# Store freshly computed scores as the 'scored' stage
+def store_role_scores(role_scores):
+    save_role_scores(role_scores)
+    return role_scores
 
-### Squad Generation Functions
-
-def generate_squad(prediction_results, num_players_per_position):
-    """Generates a squad based on prediction results and number of players per position."""
-    
-    # Separate goalkeepers and outfield players
-    keepers_df = prediction_results[prediction_results['POSITION'] == 'G']
-    positions_of_interest = ['M', 'D', 'F']
-    outfield_df = prediction_results[prediction_results['POSITION'].isin(positions_of_interest)]
-    
-    # Create DataFrame to hold scores for all roles
-    all_scores_df = pd.DataFrame()
-    
-    # Evaluate goalkeepers for goalkeeper roles
-    for role in ["Traditional Keeper", "Sweeper Keeper"]:
-        role_predictions = keepers_df[keepers_df['model_names'] == role]
-        
-        if not role_predictions.empty:
-            score_column = score_column_map.get(role, "prediction_score")
-            role_predictions = role_predictions[['Player Name', score_column]].rename(columns={score_column: 'Score'})
-            role_predictions['Role'] = role
-            all_scores_df = pd.concat([all_scores_df, role_predictions], ignore_index=True)
-    
-    # Evaluate outfield players for outfield roles
-    for role in score_column_map.keys():
-        if role not in ["Traditional Keeper", "Sweeper Keeper"]:
-            role_predictions = outfield_df[outfield_df['model_names'] == role]
-            
-            if not role_predictions.empty:
-                score_column = score_column_map.get(role, "prediction_score")
-                role_predictions = role_predictions[['Player Name', score_column]].rename(columns={score_column: 'Score'})
-                role_predictions['Role'] = role
-                all_scores_df = pd.concat([all_scores_df, role_predictions], ignore_index=True)
-    
-    # Sort by score in descending order
-    all_scores_df = all_scores_df.sort_values(by='Score', ascending=False)
-    
-    # Initialize a dictionary to keep track of the number of players selected for each role
-    role_counts = {role: 0 for role in score_column_map.keys()}
-    
-    # Initialize a list to store the selected players and their roles
-    selected_players = set()
-    squad = []
 
-    for _, player in all_scores_df.iterrows():
-        player_name = player['Player Name']
-        player_role = player['Role']
-        
-        if player_name in selected_players:
-            continue
-        
-        if role_counts[player_role] < num_players_per_position.get(player_role, 0):
-            # Assign player to the role
-            squad.append(player)
-            selected_players.add(player_name)
-            role_counts[player_role] += 1
-            
-            # Stop if the squad is full
-            if len(selected_players) == sum(num_players_per_position.values()):
-                break
-    
-    # Convert the squad list to a DataFrame
-    final_squad = pd.DataFrame(squad) if squad else pd.DataFrame()
-
-    return final_squad
+### Squad Generation Functions
 
 def display_squad(squad):
     """Displays the generated squad in a formatted table with demarcations."""
@@ -254,14 +100,7 @@ def display_squad(squad):
     
     # Create a DataFrame for displaying
     squad_data = []
-    position_types = {
-        "Goalkeeper": ["Traditional Keeper", "Sweeper Keeper"],
-        "Defender": ["Ball-Playing Defender", "No-Nonsense Defender", "Full-Back"],
-        "Midfielder": ["All-Action Midfielder", "Midfield Playmaker", "Traditional Winger", "Inverted Winger"],
-        "Attacker": ["Goal Poacher", "Target Man"]
-    }
-    
-    for position, roles in position_types.items():
+    for position, roles in POSITION_ROLES.items():
         # Add a demarcation for the position type
         squad_data.append(["", "", position, ""])
         
@@ -269,9 +108,6 @@ def display_squad(squad):
         for role in roles:
             role_players = squad[squad['Role'] == role]
             
-            # Get the correct score column based on the role
-            score_column = score_column_map.get(role, "prediction_score")
-            
             for _, player in role_players.iterrows():
                 squad_data.append([player['Player Name'], position, role, f"{player['Score']:.2f}"])
     
@@ -280,6 +116,135 @@ def display_squad(squad):
     
     # Display the DataFrame
     st.write(squad_df)
+    st.write(f"Total score: {squad['Score'].sum():.2f}")
+
+### Background Scraping Functions
+
+def collect_scrape(scraped_data):
+    """Stores a finished scrape and makes it the session's scraped data."""
+    # Store the parsed scrape, so it can be cleaned again later without re-parsing the text
+    try:
+        save_stage(parse_players(scraped_data), 'raw', SCRAPE_DATASET)
+    except SchemaError as e:
+        st.error(f"Scrape not stored: {e}")
+
+    # Update session state with scraped data
+    st.session_state.scraped_data = scraped_data
+    st.session_state.current_data = scraped_data
+
+# Share one scrape executor across all sessions of this server process
+@st.cache_resource
+def get_scrape_runner():
+    # Selenium is only imported once someone scrapes or fetches saved pages
+    return lazy_import('background_scrape').ScrapeRunner(max_concurrent=1)
+
+@st.fragment(run_every=2)
+def show_scrape_progress():
+    """Polls this session's background scrape and shows its progress, refreshing every two seconds."""
+    scrape_id = st.session_state.get('scrape_id')
+    scrape = get_scrape_runner().get(scrape_id) if scrape_id else None
+    if scrape is None:
+        return
+
+    progress = scrape.progress()
+    st.write(f"Scrape {progress['status']}: {progress['message']}")
+
+    if progress['teams_total']:
+        st.write(f"Teams: {progress['teams_done']}/{progress['teams_total']}")
+    if progress['players_total']:
+        st.progress(progress['players_done'] / progress['players_total'],
+                    text=f"Players: {progress['players_done']}/{progress['players_total']}")
+
+    eta = f", about {progress['eta_seconds']:.0f}s left" if progress['eta_seconds'] is not None else ""
+    st.write(f"Errors: {progress['errors']}{eta}")
+
+    if progress['status'] in ("queued", "running"):
+        if st.button("Cancel Scrape"):
+            scrape.cancel()
+
+    elif progress['status'] == "failed":
+        st.error(f"Scrape failed: {scrape.error}")
+
+    elif scrape.result is not None and st.session_state.get('collected_scrape_id') != scrape.scrape_id:
+        # Collect the finished (or cancelled, partial) result once
+        st.session_state.collected_scrape_id = scrape.scrape_id
+        collect_scrape(scrape.result)
+
+        # Rerun the whole app so the tabs pick up the new data
+        st.rerun()
+
+    elif st.session_state.get('collected_scrape_id') == scrape.scrape_id:
+        st.write("Scraped Player Data:")
+        st.write(scrape.result.head())
+        st.download_button("Download Scrape (CSV)", scrape.result.to_csv(index=False), 'livescrape.csv', 'text/csv')
+
+        if scrape.league_url is not None:
+            st.write(f"{scrape.stats['pages']} pages, {scrape.stats['cache_hits']} from cache, "
+                     f"{scrape.stats['retries']} retries, {scrape.stats['errors']} errors")
+        else:
+            # Report page load latency
+            st.write(f"Loaded {scrape.stats['ready']}/{scrape.stats['pages']} pages, "
+                     f"mean {scrape.stats['mean_seconds']:.2f}s, max {scrape.stats['max_seconds']:.2f}s per page")
+
+### HTTP Fetch Functions
+
+# Share one response cache across all sessions, so a repeated fetch within the hour reuses its pages
+@st.cache_resource
+def get_http_cache():
+    return lazy_import('http_source').ResponseCache()
+
+### Startup Report Functions
+
+# Cold import times only change with the installed packages, so measure them once per server
+@st.cache_data
+def get_cold_import_times():
+    return measure_import_times()
+
+def show_startup_report():
+    """Shows what each heavy subsystem cost to import, so startup regressions are visible."""
+    with st.expander("Startup Report"):
+        report = import_report()
+        if report:
+            st.write("Imported on first use in this server:")
+            st.write(pd.DataFrame(report, columns=["Module", "Seconds"]))
+        else:
+            st.write("No heavy modules imported yet.")
+
+        if st.button("Measure Cold Import Times"):
+            cold_times = get_cold_import_times()
+            st.write(pd.DataFrame(
+                [(name, seconds) for name, seconds in cold_times.items()],
+                columns=["Module", "Seconds"]
+            ))
+
+### Diagnostics Functions
+
+def get_diagnostics():
+    """Returns this session's stage timings; they are only recorded while diagnostics are switched on."""
+    if 'diagnostics' not in st.session_state:
+        st.session_state.diagnostics = Diagnostics()
+    return st.session_state.diagnostics
+
+def show_diagnostics():
+    """Shows the wall time, rows and memory delta of each stage of this run, plus totals per stage."""
+    with st.expander("Diagnostics"):
+        if not diagnostics.enabled:
+            st.write("Switch on \"Record diagnostics\" to time each stage.")
+            return
+
+        st.write("This run:")
+        st.write(pd.DataFrame(diagnostics.last_run()))
+        st.write("All runs in this session:")
+        st.write(pd.DataFrame.from_dict(diagnostics.summary(), orient='index'))
+
+        st.download_button("Export Metrics (JSON lines)", diagnostics.to_json_lines(), 'diagnostics.jsonl',
+                           'application/json')
+        if st.button("Clear Diagnostics"):
+            diagnostics.clear()
+
+# Every rerun is a new diagnostics run
+diagnostics = get_diagnostics()
+diagnostics.new_run()
 
 # Create tabs
 st.title("GOAL 2030? Back On!")
@@ -291,6 +256,8 @@ with st.sidebar:
 
     st.title("Live Player Data Scraping")
 
+    diagnostics.enabled = st.checkbox("Record diagnostics", key='record_diagnostics')
+
     # Initialize session state variables if they don't exist
     if 'scraped_data' not in st.session_state:
         st.session_state.scraped_data = None
@@ -298,215 +265,161 @@ with st.sidebar:
         st.session_state.uploaded_data = None
     if 'current_data' not in st.session_state:
         st.session_state.current_data = None
+    if 'ingested' not in st.session_state:
+        st.session_state.ingested = None
 
     # Radio button for data source selection
-    option = st.radio("Choose Data Source", ["Scrape Data", "Upload CSV"])
+    option = st.radio("Choose Data Source", ["Scrape Data", "Fetch Saved Pages", "Upload CSV"])
 
     if option == "Scrape Data":
+        num_workers = st.number_input("Browser workers", min_value=1, max_value=8, value=4)
+        incremental = st.checkbox("Incremental refresh (only re-fetch stale players)", value=True)
+
+        # Scrapes run on the server's background executor so this session stays responsive
         if st.button("Confirm Scrape"):
-            st.write("Scraping player data...")
-            # Replace these functions with your actual scraping functions
-            team_urls = scrape_team_urls()
-            player_urls = scrape_player_urls(team_urls)
-            scraped_data = scrape_player_data(player_urls)
-            
-            st.write("Scraped Player Data:")
-            st.write(scraped_data.head())
-            
-            # Save scraped data to CSV
-            scraped_data.to_csv('livescrape.csv', index=False)
-            
-            # Update session state with scraped data
-            st.session_state.scraped_data = scraped_data
-            st.session_state.current_data = scraped_data
+            scrape = get_scrape_runner().submit(max_workers=num_workers, incremental=incremental)
+            st.session_state.scrape_id = scrape.scrape_id
+
+        show_scrape_progress()
+
+    elif option == "Fetch Saved Pages":
+        # SofaScore renders squads and stats in the browser, so only saved pages can be fetched without one
+        st.caption("Fetches saved SofaScore pages over HTTP, without browsers. Serve them first with "
+                   "`python http_source.py serve <folder>`; the live site needs \"Scrape Data\".")
+        base_url = st.text_input("Stand-in server URL", value="http://127.0.0.1:8000")
+        max_concurrency = st.number_input("Concurrent requests", min_value=1, max_value=32, value=8)
+
+        # Fetches run on the same background executor as scrapes, with the same progress and cancel controls
+        if st.button("Confirm Fetch"):
+            league_url = base_url.rstrip('/') + lazy_import('http_source').LEAGUE_PATH
+            scrape = get_scrape_runner().submit(max_workers=max_concurrency, league_url=league_url,
+                                                http_cache=get_http_cache())
+            st.session_state.scrape_id = scrape.scrape_id
+
+        show_scrape_progress()
 
     elif option == "Upload CSV":
         uploaded_file = st.file_uploader("Upload a CSV file with player attributes", type="csv")
-        if uploaded_file:
+        chunked = st.checkbox("Large file: clean and score in chunks on disk")
+        if uploaded_file and chunked:
+            # Stream the file through cleaning and scoring once per upload, never holding it whole
+            ingest_key = (uploaded_file.file_id, st.session_state.get('weight_profile', DEFAULT_PROFILE))
+            if st.session_state.get('ingest_key') != ingest_key:
+                try:
+                    with st.spinner("Ingesting in chunks..."), diagnostics.stage('chunked_ingest') as stage:
+                        st.session_state.ingested = ingest_players(
+                            uploaded_file,
+                            UPLOAD_DATASET,
+                            weights=load_weight_profiles()[ingest_key[1]],
+                            models=get_model_registry().get_all(),
+                            chunksize=DEFAULT_CHUNKSIZE
+                        )
+                        stage.set_rows(st.session_state.ingested.rows)
+                    st.session_state.ingest_key = ingest_key
+                except Exception as e:
+                    st.error(f"Error ingesting file: {e}")
+            st.session_state.uploaded_data = None
+        elif uploaded_file:
             uploaded_data = pd.read_csv(uploaded_file)
             # Update session state with uploaded data
             st.session_state.uploaded_data = uploaded_data
             st.session_state.current_data = uploaded_data
+            st.session_state.ingested = None
+            st.session_state.ingest_key = None
 
     # Allow user to choose which dataset to process
-    data_choice = st.radio("Choose which data to process", ["Scraped Data", "Uploaded Data"])
+    data_choice = st.radio("Choose which data to process",
+                           ["Scraped Data", "Uploaded Data", "Stored Scrape", "History Snapshot"])
+
+    # Pick any recorded snapshot by date
+    snapshot = None
+    if data_choice == "History Snapshot":
+        snapshots = get_player_history().snapshots()
+        if snapshots.empty:
+            st.write("No snapshots recorded yet.")
+        else:
+            snapshot_labels = {row.snapshot_id: f"{row.taken_at} - {row.source or 'unknown'} ({row.players} players)"
+                               for row in snapshots.itertuples()}
+            snapshot_id = st.selectbox("Snapshot", list(snapshot_labels), format_func=snapshot_labels.get)
+            snapshot = load_snapshot(int(snapshot_id))
+
+    # Weight profile used for the role composite scores
+    weight_profiles = load_weight_profiles()
+    profile_names = list(weight_profiles)
+    weight_profile = st.selectbox("Role weight profile", profile_names, key='weight_profile',
+                                  index=profile_names.index(DEFAULT_PROFILE) if DEFAULT_PROFILE in profile_names else 0)
 
     # Set the DataFrame to use based on the user's choice
     if data_choice == "Scraped Data":
         players_df = st.session_state.scraped_data
     elif data_choice == "Uploaded Data":
         players_df = st.session_state.uploaded_data
+    elif data_choice == "Stored Scrape" and stage_exists('raw', SCRAPE_DATASET):
+        # The last scrape, already parsed to the schema
+        players_df = load_stored_scrape(os.stat(stage_path('raw', SCRAPE_DATASET)).st_mtime_ns)
     else:
         players_df = None
 
-with tab1:
+    stored = data_choice == "Stored Scrape"
 
-    # Check if players_df is not None before proceeding with data cleaning and processing
-    if players_df is not None:
-        # Display the DataFrame if it exists
-        st.write("Loaded Player Data:")
-        st.write(players_df.head())
+    # A chunked upload is already cleaned and scored on disk
+    ingested = st.session_state.ingested if data_choice == "Uploaded Data" else None
 
-        ### Cleaning
+    show_startup_report()
 
-        # Drop Junk Columns
-        # List of columns to keep based on index (0-based index)
-        columns_to_keep = list(range(0, 32)) + [33, 34, 35, 36, 48] + list(range(58, 63))
-
-        # Select columns
-        players_df_filtered = players_df.iloc[:, columns_to_keep]
-
-        # Define new columns to keep for further analysis
-        new_columns_to_keep = [0, 6, 12] + list(range(14, 21)) + list(range(22, 25)) + list(range(31, 37)) + [38]  # Example indices
-
-        # Filter the DataFrame again
-        players_df_analysis = players_df_filtered.iloc[:, new_columns_to_keep]
-
-        # Define the original order of columns
-        original_columns = players_df_analysis.columns.tolist()
-
-        # Define the indices of columns to move and their new positions
-        columns_to_move = original_columns[13:18]  # Columns 13 to 17
-        remaining_columns = [col for col in original_columns if col not in columns_to_move]
-
-        # Define the new column order
-        new_order = remaining_columns[:1] + columns_to_move + remaining_columns[1:]
-
-        # Rearrange columns
-        players_df_rearranged = players_df_analysis[new_order]
-
-        # Define the columns with percentage data
-        percentage_columns = list(range(8, 11)) + list(range(15, 18)) + [19]
-
-        # Function to extract percentage and convert to decimal
-        def extract_percentage(value):
-            if isinstance(value, str):
-                match = re.search(r'\((\d+)%\)', value)
-                if match:
-                    return float(match.group(1)) / 100
-            return None
-
-        # Apply the function to each relevant column
-        for col_index in percentage_columns:
-            col_name = players_df_rearranged.columns[col_index]
-            # Convert values to string and apply the function
-            players_df_rearranged.loc[:, col_name] = players_df_rearranged[col_name].astype(str).apply(extract_percentage)
-
-
-        # Filter to retain only players with SIN nationality
-        players_df_sin = players_df_rearranged[players_df_rearranged.iloc[:, 1] == 'SIN']
-
-        # Define column indices
-        scale_columns = list(range(6, 13)) + list(range(14, 20))
-        reverse_code_column = 13
-
-        # Convert columns to numeric, errors='coerce' will turn non-convertible values to NaN
-        for col_index in scale_columns:
-            col_name = players_df_sin.columns[col_index]
-            players_df_sin.loc[:, col_name] = pd.to_numeric(players_df_sin[col_name], errors='coerce')
-
-        # Convert reverse coding column to numeric
-        reverse_code_col_name = players_df_sin.columns[reverse_code_column]
-        players_df_sin.loc[:, reverse_code_col_name] = pd.to_numeric(players_df_sin[reverse_code_col_name], errors='coerce')
-
-        # Function to scale values
-        def scale_values(series):
-            min_val = series.min()
-            max_val = series.max()
-            return 25 + ((series - min_val) / (max_val - min_val)) * 75
-
-        # Apply scaling to specified columns
-        for col_index in scale_columns:
-            col_name = players_df_sin.columns[col_index]
-            players_df_sin.loc[:, col_name] = scale_values(players_df_sin[col_name])
-
-        # Function to reverse code values
-        def reverse_code_values(series):
-            min_val = series.min()
-            max_val = series.max()
-            return 25 + ((max_val - series) / (max_val - min_val)) * 75
-
-        # Apply reverse coding to column 13
-        players_df_sin.loc[:, reverse_code_col_name] = reverse_code_values(players_df_sin[reverse_code_col_name])
-
-
-        # Define the column indices
-        columns_to_fill = [18, 19]
-
-        # Fill NaNs with 0 in the specified columns
-        for col_index in columns_to_fill:
-            col_name = players_df_sin.columns[col_index]
-            # Use .loc[] to ensure we are modifying the DataFrame correctly
-            players_df_sin.loc[:, col_name] = players_df_sin[col_name].fillna(0)
-
-
-        # Define weights for each role
-        weights = {
-            'Traditional Keeper': [0.01, 0.01, 0.02, 0.02, 0.02, 0.05, 0.05, 0.05, 0.05, 0.05, 0.1, 0.1, 0.24, 0.23],
-            'Sweeper Keeper': [0.01, 0.01, 0.1, 0.1, 0.03, 0.05, 0.05, 0.05, 0.05, 0.05, 0.1, 0.1, 0.15, 0.15],
-            'Ball-Playing Defender': [0.02, 0.01, 0.15, 0.12, 0.02, 0.12, 0.15, 0.05, 0.1, 0.05, 0.1, 0.11],
-            'No-Nonsense Defender': [0.01, 0.01, 0.02, 0.02, 0.02, 0.18, 0.12, 0.12, 0.18, 0.15, 0.1, 0.07],
-            'Full-Back': [0.02, 0.05, 0.05, 0.05, 0.15, 0.1, 0.1, 0.05, 0.05, 0.15, 0.15, 0.08],
-            'All-Action Midfielder': [0.05, 0.05, 0.08, 0.05, 0.05, 0.15, 0.15, 0.1, 0.08, 0.08, 0.08, 0.08],
-            'Midfield Playmaker': [0.02, 0.2, 0.2, 0.08, 0.08, 0.05, 0.05, 0.05, 0.05, 0.1, 0.08, 0.04],
-            'Traditional Winger': [0.2, 0.15, 0.05, 0.05, 0.2, 0.02, 0.02, 0.02, 0.05, 0.15, 0.05, 0.04],
-            'Inverted Winger': [0.25, 0.15, 0.05, 0.05, 0.05, 0.02, 0.02, 0.02, 0.1, 0.15, 0.15, 0.04],
-            'Goal Poacher': [0.35, 0.05, 0.02, 0.02, 0.02, 0.02, 0.02, 0.02, 0.05, 0.15, 0.15, 0.13],
-            'Target Man': [0.2, 0.05, 0.02, 0.02, 0.02, 0.02, 0.02, 0.02, 0.05, 0.3, 0.2, 0.08]
-        }
-
-        # Define column indices for each role
-        col_indices = {
-            'Traditional Keeper': list(range(6, 20)),
-            'Sweeper Keeper': list(range(6, 20)),
-            'Ball-Playing Defender': list(range(6, 18)),
-            'No-Nonsense Defender': list(range(6, 18)),
-            'Full-Back': list(range(6, 18)),
-            'All-Action Midfielder': list(range(6, 18)),
-            'Midfield Playmaker': list(range(6, 18)),
-            'Traditional Winger': list(range(6, 18)),
-            'Inverted Winger': list(range(6, 18)),
-            'Goal Poacher': list(range(6, 18)),
-            'Target Man': list(range(6, 18))
-        }
-
-        # Make a copy of the DataFrame to avoid SettingWithCopyWarning
-        players_df_sin_scores = players_df_sin.copy()
-
-        # Calculate the score for each role and add it as a new column
-        for role, weights_list in weights.items():
-            if len(weights_list) != len(col_indices[role]):
-                raise ValueError(f"Weight list length for '{role}' does not match the number of columns")
-        
-            weighted_sum = sum(weights_list[i] * players_df_sin_scores.iloc[:, col_index]
-                            for i, col_index in enumerate(col_indices[role]))
-            players_df_sin_scores[role] = weighted_sum
-
-
-        # Define the column indices for the original values and the new classification columns
-        original_columns = list(range(20, 31))  # Columns to classify
-        classification_columns = list(range(31, 42))  # New columns for classifications
-
-        # Function to classify values
-        def classify_value(value):
-            return 1 if value > 50 else 0
+with tab1:
 
-        # Make a copy of the DataFrame to avoid modifying the original DataFrame
-        players_df_sin_reco = players_df_sin_scores.copy()
+    if snapshot is not None:
+        # A recorded snapshot is already cleaned (with the weight profile it was recorded with)
+        players_df_sin_reco = snapshot[0]
+        st.write("Snapshot Data:")
+        players_df_sin_reco
 
-        # Apply the classification to each relevant column and create new columns
-        for orig_col, class_col in zip(original_columns, classification_columns):
-            orig_col_name = players_df_sin_reco.columns[orig_col]
-            class_col_name = f'Class_{orig_col_name}'
-        
-            # Apply classification
-            players_df_sin_reco[class_col_name] = players_df_sin_reco.iloc[:, orig_col].apply(classify_value)
+    elif ingested is not None:
+        st.write(f"Ingested {ingested.rows} rows in {ingested.chunks} chunks, keeping {ingested.players} players.")
 
-        # Display the updated DataFrame
+        # Only the cleaned SIN players are read back, with compact dtypes
+        players_df_sin_reco = read_cleaned(ingested)
         st.write("Final Data after Cleaning:")
         players_df_sin_reco
 
-        players_df_sin_reco.to_csv('players_df_sin_reco.csv', index=False)
+    # Check if players_df is not None before proceeding with data cleaning and processing
+    elif players_df is not None:
+        # Display the DataFrame if it exists
+        st.write("Loaded Player Data:")
+        st.write(players_df.head())
+
+        ### Cleaning
+        # Cleaning only reruns when the data or the cleaning config (weights, rules) changes
+        weights = weight_profiles[weight_profile]
+        clean_key = (cached_frame_fingerprint(players_df), cleaning_config_key(weights), stored)
+        try:
+            if stored:
+                # A stored scrape was checked and parsed when it was saved
+                with diagnostics.stage('cleaning', rows=len(players_df)):
+                    players_df_sin_reco = get_cleaning_cache().get_or_compute(
+                        players_df, clean_key[1:], lambda: clean_parsed(players_df, weights))
+            else:
+                # Check the scrape against the column schema before cleaning it
+                with diagnostics.stage('validation', rows=len(players_df)):
+                    schema_problems = get_cleaning_cache().get_or_compute(
+                        players_df, 'validate', lambda: validate_players(players_df))
+                for column_name, count in schema_problems.items():
+                    st.warning(f"{count} value(s) in '{column_name}' could not be read and were treated as missing.")
+
+                with diagnostics.stage('cleaning', rows=len(players_df)):
+                    players_df_sin_reco = get_cleaning_cache().get_or_compute(
+                        players_df, clean_key[1:], lambda: clean_players(players_df, weights))
+        except SchemaError as e:
+            st.error(str(e))
+        else:
+            # Display the updated DataFrame
+            st.write("Final Data after Cleaning:")
+            players_df_sin_reco
+
+            persist_cleaned(players_df_sin_reco, clean_key)
+            st.download_button("Download Cleaned Data (CSV)", cleaned_csv(clean_key, players_df_sin_reco),
+                               'players_df_sin_reco.csv', 'text/csv')
 
     else:
         st.write("No data available. Please scrape or upload data.")
@@ -518,41 +431,27 @@ with tab1:
 with tab2:
     models = load_all_models()
 
-    # Dictionary mapping model names to their score column names
-    score_column_map = {
-        "Traditional Keeper": "Traditional Keeper",
-        "Sweeper Keeper": "Sweeper Keeper",
-        "Ball-Playing Defender": "Ball-Playing Defender",
-        "No-Nonsense Defender": "No-Nonsense Defender",
-        "Full-Back": "Full-Back",
-        "All-Action Midfielder": "All-Action Midfielder",
-        "Midfield Playmaker": "Midfield Playmaker",
-        "Traditional Winger": "Traditional Winger",
-        "Inverted Winger": "Inverted Winger",
-        "Goal Poacher": "Goal Poacher",
-        "Target Man": "Target Man"
-    }
-
     if 'players_df_sin_reco' in locals():
-        # Make predictions for each model
-        predictions = []
-        for model_name, model in models.items():
-            if model is not None:
-                # Make prediction for the current model
-                prediction = predict_model(model, data=players_df_sin_reco)
-                # Add a new column to identify the model/role
-                prediction['model_names'] = model_name
-                predictions.append(prediction)
-
-        if predictions:
-            # Combine predictions from all models
-            combined_predictions = pd.concat(predictions, ignore_index=True)
-
+        # A chunked upload was scored as it was ingested, and a snapshot may hold its scores
+        role_scores = read_role_scores(ingested) if ingested is not None else None
+        if snapshot is not None and snapshot[1] is not None:
+            role_scores = RoleScores(probabilities=snapshot[1], labels=snapshot[2])
+
+        # Score every player for every role in one pass, reusing cached scores while the data and models are unchanged
+        if role_scores is None:
+            with diagnostics.stage('prediction', rows=len(players_df_sin_reco), models=len(models)):
+                role_scores = get_prediction_cache().get_or_compute(
+                    players_df_sin_reco,
+                    get_model_registry().version_id(),
+                    lambda: store_role_scores(score_players(models, players_df_sin_reco))
+                )
+
+        if not role_scores.probabilities.empty:
             # Display predictions
             st.write("Predictions:")
 
             # Create checkboxes for each model
-            model_checkboxes = st.multiselect("Select a Position/Role:", list(models.keys()))
+            model_checkboxes = st.multiselect("Select a Position/Role:", list(role_scores.probabilities.columns))
 
             # Create a slider for the prediction threshold
             threshold = st.slider("Prediction Threshold:", 0.0, 1.0, 0.5)
@@ -561,36 +460,46 @@ with tab2:
             show_recommended = st.checkbox("Show Recommended")
             show_not_recommended = st.checkbox("Show Not Recommended")
 
-            for model_name in models.keys():
+            for model_name in role_scores.probabilities.columns:
                 if model_name in model_checkboxes:
-                    # Access the correct score column based on the model name
-                    score_column = score_column_map.get(model_name, "prediction_score")
-
-                    # Filter predictions for the selected model/role
-                    filtered_prediction = combined_predictions[combined_predictions['model_names'] == model_name]
-
-                    # Ensure the score_column is numeric
-                    if pd.api.types.is_categorical_dtype(filtered_prediction[score_column]):
-                        filtered_prediction[score_column] = filtered_prediction[score_column].astype(float)
-
-                    filtered_prediction = filtered_prediction[filtered_prediction[score_column] >= threshold]
+                    # Read the role's column from the score matrix
+                    scores = role_scores.probabilities[model_name].to_numpy()
+                    labels = role_scores.labels[model_name].to_numpy()
 
-                    # Filter predictions based on prediction_label
+                    # Filter predictions based on the threshold and prediction label
+                    mask = scores >= threshold
                     if show_recommended and not show_not_recommended:
-                        filtered_prediction = filtered_prediction[filtered_prediction['prediction_label'] == 1]
+                        mask &= labels == 1
                     elif show_not_recommended and not show_recommended:
-                        filtered_prediction = filtered_prediction[filtered_prediction['prediction_label'] == 0]
+                        mask &= labels == 0
 
-                    # Rename the 'prediction_label' column to 'Recommended' and convert values
-                    filtered_prediction['Recommended'] = filtered_prediction['prediction_label'].apply(lambda x: "Recommended" if x == 1 else "Not Recommended")
-                    filtered_prediction.drop('prediction_label', axis=1, inplace=True)
-
-                    # Rename the score column to the corresponding model name
-                    filtered_prediction.rename(columns={score_column: model_name}, inplace=True)
+                    filtered_prediction = pd.DataFrame({
+                        'Player Name': role_scores.probabilities.index[mask],
+                        model_name: scores[mask],
+                        'Recommended': np.where(labels[mask] == 1, "Recommended", "Not Recommended")
+                    })
 
                     # Display model name and filtered prediction results
                     st.header(f"{model_name}")
-                    st.write(filtered_prediction[['Player Name', model_name, 'Recommended']])
+                    st.write(filtered_prediction)
+
+        ### Player History
+        with st.expander("Player History"):
+            if snapshot is None and st.button("Record Snapshot"):
+                # Recording the same data twice keeps the first snapshot
+                snapshot_id = get_player_history().record_snapshot(players_df_sin_reco, role_scores, source=data_choice,
+                                                                   profile=weight_profile)
+                st.write(f"Recorded as snapshot {snapshot_id}.")
+
+            history_role = st.selectbox("Role:", list(role_scores.probabilities.columns))
+            since = st.date_input("Since:", value=pd.Timestamp.now() - pd.Timedelta(days=30))
+            st.write(f"Biggest {history_role} score rises since {since}:")
+            st.write(get_player_history().risers(history_role, since.isoformat()))
+
+            form_player = st.selectbox("Player form:", list(players_df_sin_reco['Player Name']))
+            if form_player:
+                row = players_df_sin_reco[players_df_sin_reco['Player Name'] == form_player].iloc[0]
+                st.write(get_player_history().player_form(player_id(row['Player Name'], row['NATIONALITY']), last=5))
 
 with tab3:
             # Squad generation section
@@ -661,8 +570,37 @@ with tab3:
                         "Target Man": num_target_men
                     }
 
+            # Optimal finds the highest total score; Greedy is kept for comparison
+            squad_method = st.radio("Squad Selection:", list(SQUAD_METHODS), horizontal=True)
+
             # Button to generate squad
             if st.button("Generate Squad"):
-                # Assuming generate_squad() and display_squad() are defined elsewhere
-                squad = generate_squad(combined_predictions, num_players_per_role)
+                with diagnostics.stage('generate_squad', rows=len(role_scores.probabilities), method=squad_method):
+                    squad = SQUAD_METHODS[squad_method](role_scores.probabilities, players_df_sin_reco['POSITION'],
+                                                        num_players_per_role, num_players_per_position)
+                save_stage(squad, 'squads')
                 display_squad(squad)
+
+            # Batch mode: solve many quota configurations from the same scores and compare them
+            st.subheader("Compare Squad Configurations")
+            configs_file = st.file_uploader("Upload a CSV of quota configurations (defaults to squad_configs.csv)",
+                                            type="csv")
+
+            if st.button("Compare Configurations"):
+                try:
+                    configs = load_squad_configs(configs_file) if configs_file else load_squad_configs()
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    with diagnostics.stage('batch_squads', rows=len(configs), method=squad_method):
+                        comparison, overlap, squads = batch_squads(role_scores.probabilities,
+                                                                   players_df_sin_reco['POSITION'].to_numpy(),
+                                                                   configs, method=SQUAD_METHODS[squad_method])
+                    st.write("Comparison:")
+                    st.write(comparison)
+                    st.write("Players shared between squads:")
+                    st.write(overlap)
+
+# Shown last so it includes the stages of this run
+with st.sidebar:
+    show_diagnostics()
@@ -0,0 +1,174 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_import
+
+# Folder holding the exported artifacts, named after the sha256 of the model they were exported from
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exported_models')
+
+EXPORT_EXTENSION = '.joblib'
+
+# Bumped whenever the layout of ExportedModel changes
+EXPORT_FORMAT_VERSION = 1
+
+# pycaret rounds prediction_score to this many decimals
+SCORE_DECIMALS = 4
+
+
+class MeanImputer:
+    """The fitted numeric imputer of a pycaret pipeline, as plain column -> fill value pairs.
+
+    Also renames the columns the way pycaret's clean_column_names step did, so the
+    estimator gets the exact column names it was fitted on.
+    """
+
+    def __init__(self, fill_values, renames):
+        self.fill_values = dict(fill_values)
+        self.renames = dict(renames)
+
+    def transform(self, data):
+        data = data.fillna({column: value for column, value in self.fill_values.items() if column in data.columns})
+        return data.rename(columns=self.renames) if self.renames else data
+
+
+class ExportedModel:
+    """A role model without pycaret: the fitted imputer values and the bare estimator.
+
+    Keeps pycaret's (name, step) steps layout so scoring.split_pipeline treats it like
+    the original pipeline, and predict reproduces pycaret's predict_model columns.
+    """
+
+    def __init__(self, role, imputer, estimator, source=None):
+        self.role = role
+        self.steps = [('numerical_imputer', imputer), ('actual_estimator', estimator)]
+        self.source = source
+        self.format_version = EXPORT_FORMAT_VERSION
+
+    @property
+    def imputer(self):
+        return self.steps[0][1]
+
+    @property
+    def estimator(self):
+        return self.steps[-1][1]
+
+    @property
+    def feature_names_in_(self):
+        return self.estimator.feature_names_in_
+
+    def features(self, data):
+        """Returns the estimator's feature frame for raw (cleaned) player data."""
+        return self.imputer.transform(data)[list(self.feature_names_in_)]
+
+    def predict(self, data):
+        """Returns prediction_label, and prediction_score when the estimator has probabilities, like predict_model."""
+        features = self.features(data)
+        labels = self.estimator.predict(features)
+        result = pd.DataFrame({'prediction_label': labels}, index=data.index)
+
+        if hasattr(self.estimator, 'predict_proba'):
+            # The score is the probability of the predicted label
+            proba = self.estimator.predict_proba(features)
+            label_columns = np.searchsorted(self.estimator.classes_, labels)
+            result['prediction_score'] = np.round(proba[np.arange(len(labels)), label_columns], SCORE_DECIMALS)
+
+        return result
+
+
+def export_model(role, model, source=None):
+    """Builds the ExportedModel of a fitted pycaret pipeline.
+
+    Only pipelines made of a mean/median/constant numeric imputer, pycaret's column
+    name cleaning and the estimator are supported; anything else raises ValueError
+    rather than export a model that would predict differently.
+    """
+    fill_values, renames = {}, {}
+    steps = model.steps[:-1]
+    estimator = model.steps[-1][1]
+
+    for name, step in steps:
+        transformer = getattr(step, 'transformer', step)
+        include = list(getattr(step, 'include', None) or [])
+
+        if name == 'numerical_imputer':
+            fill_values.update(zip(include, transformer.statistics_))
+        elif name == 'categorical_imputer':
+            if set(include) & set(estimator.feature_names_in_):
+                raise ValueError(f"'{role}' uses categorical features, which the export does not support")
+        elif name == 'clean_column_names':
+            # Map each numeric column to the estimator's name for it (same position, cleaned)
+            cleaned = step.transform(pd.DataFrame(columns=list(fill_values))).columns
+            renames.update({old: new for old, new in zip(fill_values, cleaned) if old != new})
+        else:
+            raise ValueError(f"'{role}' has a '{name}' step, which the export does not support")
+
+    missing = set(estimator.feature_names_in_) - {renames.get(column, column) for column in fill_values}
+    if missing:
+        raise ValueError(f"'{role}' uses features the imputer does not cover: {', '.join(sorted(missing))}")
+
+    return ExportedModel(role, MeanImputer(fill_values, renames), estimator, source)
+
+
+def verify_export(model, exported, data):
+    """Checks that the export gives the same prediction_label and prediction_score as pycaret on the data."""
+    predict_model = lazy_import('pycaret.classification').predict_model
+
+    expected = predict_model(model, data=data, verbose=False)
+    actual = exported.predict(data)
+
+    if not np.array_equal(expected['prediction_label'].to_numpy(), actual['prediction_label'].to_numpy()):
+        raise ValueError(f"Exported '{exported.role}' model predicts different labels")
+    if 'prediction_score' in expected.columns:
+        if not np.array_equal(expected['prediction_score'].to_numpy(), actual['prediction_score'].to_numpy()):
+            raise ValueError(f"Exported '{exported.role}' model predicts different scores")
+
+
+def export_path(source_digest, export_dir=EXPORT_DIR):
+    return os.path.join(export_dir, source_digest + EXPORT_EXTENSION)
+
+
+def save_exported_model(exported, export_dir=EXPORT_DIR):
+    os.makedirs(export_dir, exist_ok=True)
+    path = export_path(exported.source, export_dir)
+    tmp_path = path + '.tmp'
+    lazy_import('joblib').dump(exported, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_exported_model(path):
+    """Loads an exported model; needs scikit-learn (and lightgbm for LightGBM models) but not pycaret."""
+    exported = lazy_import('joblib').load(path)
+    if getattr(exported, 'format_version', None) != EXPORT_FORMAT_VERSION:
+        raise ValueError(f"{path} was exported in an unsupported format; export the models again")
+    return exported
+
+
+def export_all(registry, export_dir=EXPORT_DIR, check_data=None):
+    """Exports every role model of a ModelRegistry and returns {role: artifact path}.
+
+    If check_data is given, every export is verified against pycaret's predictions first.
+    """
+    paths = {}
+    for role in registry.roles:
+        model = registry.load_pycaret(role)
+        exported = export_model(role, model, source=registry.resolve(role)["sha256"])
+        if check_data is not None:
+            verify_export(model, exported, check_data)
+        paths[role] = save_exported_model(exported, export_dir)
+    return paths
+
+
+if __name__ == '__main__':
+    # Usage: python model_export.py [players_df_sin_reco.csv]
+    # Export through the imported module, so the artifacts pickle model_export.ExportedModel
+    # rather than __main__.ExportedModel, which the app and pipeline could not load
+    import model_export
+    from model_registry import ModelRegistry
+
+    check_data = pd.read_csv(sys.argv[1]) if len(sys.argv) > 1 else None
+    for role, path in model_export.export_all(ModelRegistry(), check_data=check_data).items():
+        print(f"{role:<24} -> {path}")
@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+
+from lazy_imports import lazy_import
+from model_export import EXPORT_DIR, EXPORT_EXTENSION, export_path, load_exported_model
+
+# The shared model store ("8. Model Registry") holding every model version once, by content hash
+MODEL_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '8. Model Registry')
+if MODEL_STORE_DIR not in sys.path:
+    sys.path.append(MODEL_STORE_DIR)
+
+from model_store import FINAL_TRACK, ModelStore
+
+
+class ModelRegistry:
+    """Loads the current model of each role from the model store, once per process.
+
+    A model is loaded again when the store's manifest points the role at another
+    version. When an export of that version exists (see model_export.py) it is loaded
+    instead of the pycaret pickle, so scoring does not import pycaret.
+    """
+
+    def __init__(self, store=None, track=FINAL_TRACK, roles=None, export_dir=EXPORT_DIR, prefer_exported=True):
+        self.store = store or ModelStore()
+        self.track = track
+        self.roles = list(roles or self.store.roles(track))
+        self.export_dir = export_dir
+        self.prefer_exported = prefer_exported
+
+        # role -> (file signature, loaded model)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, role):
+        """Returns the store's manifest entry of a role's current model."""
+        self.store.refresh()
+        return self.store.resolve(role, self.track)
+
+    def model_path(self, role):
+        """Returns the pycaret model path (without the .pkl extension) of a role's current model."""
+        return os.path.splitext(self.store.object_path(self.resolve(role)["sha256"]))[0]
+
+    def artifact_path(self, role):
+        """Returns the file a role's model is loaded from: the export of its current version, or else its pickle."""
+        digest = self.resolve(role)["sha256"]
+        exported_path = export_path(digest, self.export_dir)
+
+        if self.prefer_exported and os.path.exists(exported_path):
+            return exported_path
+        return self.store.object_path(digest)
+
+    def file_signature(self, role):
+        """Returns the path, modification time and size of the file a role's model is loaded from."""
+        path = self.artifact_path(role)
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def load_pycaret(self, role):
+        """Loads a role's pycaret pipeline from its pickle, bypassing the cache and any export."""
+        # pycaret is only imported once a pickle actually has to be read
+        load_model = lazy_import('pycaret.classification').load_model
+        return load_model(self.model_path(role), verbose=False)
+
+    def get(self, role):
+        """Returns the model for a role, loading it only if it is new or the role's current model changed."""
+        signature = self.file_signature(role)
+        entry = self._entries.get(role)
+
+        if entry is None or entry[0] != signature:
+            # Only one session deserializes a given file; the others wait and reuse it
+            with self._lock:
+                entry = self._entries.get(role)
+                if entry is None or entry[0] != signature:
+                    path = signature[0]
+                    model = load_exported_model(path) if path.endswith(EXPORT_EXTENSION) else self.load_pycaret(role)
+                    entry = (signature, model)
+                    self._entries[role] = entry
+
+        return entry[1]
+
+    def get_all(self):
+        """Returns a dictionary of role -> model for every registered role."""
+        return {role: self.get(role) for role in self.roles}
+
+    def version_id(self):
+        """Returns an id that changes whenever any role's current model (or its export) changes."""
+        parts = []
+        for role in self.roles:
+            path, mtime, size = self.file_signature(role)
+            parts.append(f"{role}:{os.path.basename(path)}:{mtime}:{size}")
+        return "|".join(parts)
@@ -0,0 +1,161 @@
+"""Parses saved SofaScore pages (league, squad and player) into team links, player links and stats.
+
+The scraper takes one driver.page_source snapshot per page and hands it here, so a
+page costs a single WebDriver round-trip however many links and stats it has. The
+functions only need the HTML, so they also run offline against saved pages:
+
+    python page_parser.py player saved/player.html https://www.sofascore.com/player/boris-kopitovic/123456
+    python page_parser.py links saved/league.html
+"""
+import logging
+import re
+import sys
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from schema import PLAYER_COLUMNS
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# SofaScore page listing the Singapore Premier League teams
+LEAGUE_URL = 'https://www.sofascore.com/tournament/football/singapore/premier-league/634'
+
+# Season a player must have stats for to be kept
+CURRENT_SEASON = "2024"
+
+# CSS selectors of the elements the scraper reads
+TEAM_LIST_SELECTOR = "div.Box.eHXJll"
+SQUAD_LIST_SELECTOR = "div.Box.dflyPx"
+SEASON_SELECTOR = "bdi.Text.jFxLbA"
+
+# CSS selectors of the boxes holding the player's stat label/value pairs
+STAT_SELECTORS = [
+    "div.Box.Flex.dlyXLO.bnpRyo",
+    "div.Box.fGLgkO",
+    "div.Box.jwDcoO"
+]
+
+# Labels shown on a player page besides the schema's, as found in players_raw.csv
+OTHER_STAT_LABELS = [
+    'Total played', 'Started', 'Minutes per game', 'Goals', 'Scoring frequency', 'Shots per game',
+    'Shots on target per game', 'Goal conversion', 'Penalty goals', 'Penalty conversion', 'Key passes',
+    'Error led to shot', 'Fouls', 'Was fouled', 'Offsides', 'Yellow', 'Yellow-Red', 'Red cards',
+    'Goals conceded per game', 'Goals conceded', 'Saves made', 'Goal kicks per game'
+]
+
+# Every label a stat box is read by; other labels are kept too but logged
+STAT_LABELS = {column.label for column in PLAYER_COLUMNS} | set(OTHER_STAT_LABELS)
+
+# Text that can follow a stat label as (part of) its value: numbers, percentages, ratios,
+# "101 min", "189 cm", "29 yrs", and the short codes and words of the player details
+VALUE_PATTERN = re.compile(r'^([\d.,/%()\s-]*\d[\d.,/%()\s-]*( (min|cm|yrs))?|[A-Z]{1,3}|Right|Left|Both|-)$')
+
+# The date of birth box has no label: it shows the date ("27 APR 1995") over the age ("29 yrs")
+BIRTH_DATE_PATTERN = re.compile(r'^\d{1,2} [A-Z]{3,4} \d{4}$')
+BIRTH_DATE_LABEL = 'DATE OF BIRTH'
+AGE_LABEL = 'AGE'
+
+
+logger = logging.getLogger(__name__)
+
+
+def make_soup(html):
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def parse_links(html, selector, base_url=''):
+    """Returns the absolute hrefs of the links inside the elements matching selector, in page order."""
+    soup = make_soup(html)
+    return [urljoin(base_url, link['href']) for element in soup.select(selector)
+            for link in element.select('a[href]')]
+
+
+def parse_team_urls(html, base_url=''):
+    """Returns the team page URLs listed on a league page."""
+    return parse_links(html, TEAM_LIST_SELECTOR, base_url)
+
+
+def parse_squad_urls(html, base_url=''):
+    """Returns the player page URLs listed on a team's squad tab."""
+    return parse_links(html, SQUAD_LIST_SELECTOR, base_url)
+
+
+def parse_season(soup):
+    element = soup.select_one(SEASON_SELECTOR)
+    return element.get_text(strip=True) if element is not None else None
+
+
+def parse_stat_box(strings):
+    """Pairs the text of one stat box into {label: value}, keyed by the known stat labels.
+
+    A value is the value-like text right after its label, so values split over several
+    elements ("12.8", "(80%)") are joined back together. Any other text ends the value:
+    an unknown label is kept under its own name (with the value-like text after it) and
+    logged, so a stat SofaScore adds shows up as a new column instead of corrupting the
+    previous one. The unlabelled date of birth box becomes DATE OF BIRTH and AGE.
+    """
+    if strings and BIRTH_DATE_PATTERN.match(strings[0]):
+        stats = {BIRTH_DATE_LABEL: strings[0]}
+        if len(strings) > 1:
+            stats[AGE_LABEL] = ' '.join(strings[1:])
+        return stats
+
+    stats = {}
+    label = None
+    for string in strings:
+        if label is not None and VALUE_PATTERN.match(string):
+            stats[label] = string if stats[label] is None else f'{stats[label]} {string}'
+            continue
+
+        if string not in STAT_LABELS:
+            logger.warning("Unknown stat label %r", string)
+        label = string
+        stats[label] = None
+
+    return {label: value for label, value in stats.items() if value is not None}
+
+
+def parse_player_stats(soup):
+    """Returns {label: value} of every stat box on a player page."""
+    stats = {}
+    for selector in STAT_SELECTORS:
+        for box in soup.select(selector):
+            stats.update(parse_stat_box(list(box.stripped_strings)))
+    return stats
+
+
+def player_name_from_url(player_url):
+    """Returns the player's name from the slug in their SofaScore URL."""
+    # Extract the string between the last two backslashes and remove any hyphens
+    return player_url.rstrip('/').split('/')[-2].replace('-', ' ')
+
+
+def parse_player_page(html, player_url):
+    """Returns the player's row ({"Player Name": ..., label: value}) or None if the page has no current season stats."""
+    soup = make_soup(html)
+    if parse_season(soup) != CURRENT_SEASON:
+        return None
+
+    player_dict = {"Player Name": player_name_from_url(player_url)}
+    player_dict.update(parse_player_stats(soup))
+    return player_dict
+
+
+if __name__ == '__main__':
+    # Usage: python page_parser.py player <page.html> <player url> | links <page.html> [base url]
+    command, path = sys.argv[1], sys.argv[2]
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+
+    if command == 'player':
+        for label, value in (parse_player_page(html, sys.argv[3]) or {}).items():
+            print(f"{label}: {value}")
+    else:
+        base_url = sys.argv[3] if len(sys.argv) > 3 else ''
+        for url in parse_team_urls(html, base_url) + parse_squad_urls(html, base_url):
+            print(url)
@@ -0,0 +1,213 @@
+"""Runs the app's scrape -> clean -> predict -> squad pipeline without Streamlit.
+
+Examples:
+    python pipeline.py --input players_raw.csv --until clean
+    python pipeline.py --input players_raw.csv --output-dir out --configs squad_configs.csv
+    python pipeline.py --scrape --workers 4 --output-dir nightly
+    python pipeline.py --input multi_season.csv --chunksize 5000 --output-dir out
+
+Each stage is stored as Parquet under <output-dir>/<stage>/ (see dataset_store.py);
+--csv also exports the stages as the CSVs the app used to write.
+
+Each stage imports its own dependencies, so selenium is only loaded when scraping
+and pycaret only when predicting.
+"""
+import argparse
+import os
+import sys
+import time
+
+STAGES = ['scrape', 'clean', 'predict', 'squad']
+
+
+def log(message):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+def run_scrape(args):
+    """Scrapes SofaScore like the app's "Confirm Scrape" button and returns players_df."""
+    from background_scrape import BackgroundScrape
+
+    scrape = BackgroundScrape(max_workers=args.workers, incremental=not args.full)
+    players_df = scrape.run()
+    log(f"Scraped {len(players_df)} players ({scrape.stats.get('ready', 0)}/{scrape.stats.get('pages', 0)} pages ready)")
+    return players_df
+
+
+def run_clean(args, players_df):
+    from cleaning import clean_players
+    from role_weights import load_weight_profiles
+    from schema import validate_players
+
+    for column_name, count in validate_players(players_df).items():
+        log(f"Warning: {count} value(s) in '{column_name}' could not be read and were treated as missing")
+
+    players_df_sin_reco = clean_players(players_df, load_weight_profiles()[args.profile])
+    log(f"Cleaned {len(players_df_sin_reco)} players")
+    return players_df_sin_reco
+
+
+def run_predict(players_df_sin_reco):
+    from model_registry import ModelRegistry
+    from scoring import score_players
+
+    models = ModelRegistry().get_all()
+    role_scores = score_players(models, players_df_sin_reco)
+    log(f"Scored {len(role_scores.probabilities)} players for {len(models)} roles")
+    return role_scores
+
+
+def run_ingest(args, last_stage):
+    """Cleans (and scores) --input in chunks, streaming the stages to --output-dir, and reads them back."""
+    from ingest import ingest_players, read_cleaned, read_role_scores
+    from role_weights import load_weight_profiles
+
+    models = None
+    if last_stage >= STAGES.index('predict'):
+        from model_registry import ModelRegistry
+        models = ModelRegistry().get_all()
+
+    # The CSV is written from the chunks before they are stored as float32, like an in-memory run
+    csv_path = os.path.join(args.output_dir, 'players_df_sin_reco.csv') if args.csv else None
+    result = ingest_players(args.input, args.name, load_weight_profiles()[args.profile], models, args.chunksize,
+                            root=args.output_dir, csv_path=csv_path)
+    log(f"Read {result.rows} rows in {result.chunks} chunks and kept {result.players} players")
+    for path in result.paths.values():
+        log(f"Wrote {path}")
+    if csv_path is not None and 'cleaned' in result.paths:
+        log(f"Wrote {csv_path}")
+    return read_cleaned(result), read_role_scores(result)
+
+
+def run_squad(args, role_scores, positions):
+    """Builds the default squad, or every configuration of --configs, and returns {file name: frame}."""
+    from squad import DEFAULT_NUM_PLAYERS_PER_POSITION, DEFAULT_NUM_PLAYERS_PER_ROLE, SQUAD_METHODS
+
+    method = SQUAD_METHODS[args.method]
+
+    if not args.configs:
+        squad = method(role_scores.probabilities, positions, DEFAULT_NUM_PLAYERS_PER_ROLE,
+                       DEFAULT_NUM_PLAYERS_PER_POSITION)
+        log(f"Selected a squad of {len(squad)} players")
+        return {'squad.csv': squad}
+
+    from squad_batch import batch_squads, load_squad_configs
+
+    # One worker process per CPU; the app solves its batches in-process instead
+    comparison, overlap, squads = batch_squads(role_scores.probabilities, positions,
+                                               load_squad_configs(args.configs), method=method, max_workers=None)
+    log(f"Solved {len(squads)} squad configurations")
+
+    outputs = {'squad_comparison.csv': comparison, 'squad_overlap.csv': overlap}
+    for name, squad in squads.items():
+        outputs[f"squad_{name.replace(' ', '_').replace('/', '-')}.csv"] = squad
+    return outputs
+
+
+def write_stage(frame, args, stage, name, csv_name=None, index=False):
+    """Stores a stage dataset under --output-dir, and exports it to CSV as well with --csv."""
+    from dataset_store import save_stage
+
+    log(f"Wrote {save_stage(frame.reset_index() if index else frame, stage, name, args.output_dir)}")
+
+    if args.csv and csv_name:
+        path = os.path.join(args.output_dir, csv_name)
+        frame.to_csv(path, index=index)
+        log(f"Wrote {path}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Goal 2030 pipeline headless and store every stage as Parquet.")
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help="raw players CSV to start from (e.g. players_raw.csv)")
+    source.add_argument('--scrape', action='store_true', help="scrape SofaScore instead of reading a CSV")
+
+    parser.add_argument('--until', choices=STAGES, default='squad', help="last stage to run (default: squad)")
+    parser.add_argument('--output-dir', default='datasets', help="dataset store folder the stages are written to")
+    parser.add_argument('--name', default='latest', help="dataset name the stages are stored under")
+    parser.add_argument('--csv', action='store_true', help="also export every stage as CSV into --output-dir")
+    parser.add_argument('--workers', type=int, default=4, help="browsers used when scraping")
+    parser.add_argument('--full', action='store_true', help="scrape every player instead of an incremental refresh")
+    parser.add_argument('--profile', default='Default', help="role weight profile from weight_profiles.json")
+    parser.add_argument('--method', choices=['Optimal', 'Greedy'], default='Optimal', help="squad selection method")
+    parser.add_argument('--configs', help="CSV of squad quota configurations to solve and compare")
+    parser.add_argument('--history', action='store_true', help="record the cleaned and scored players as a snapshot "
+                                                               "in player_history.db")
+    parser.add_argument('--metrics', help="append per-stage timing and memory records to this JSON lines file")
+    parser.add_argument('--chunksize', type=int,
+                        help="clean and score --input this many rows at a time, for files too large for memory")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    last_stage = STAGES.index(args.until)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    import pandas as pd
+    from instrumentation import Diagnostics
+
+    # Stage timings are only measured when they are written somewhere
+    diagnostics = Diagnostics(enabled=bool(args.metrics))
+    start = time.perf_counter()
+
+    if args.input and args.chunksize and last_stage >= STAGES.index('clean'):
+        # The raw file is never loaded whole; the clean and predict outputs are streamed to disk
+        with diagnostics.stage('chunked_ingest'):
+            players_df_sin_reco, role_scores = run_ingest(args, last_stage)
+    else:
+        from schema import parse_players
+
+        if args.scrape:
+            with diagnostics.stage('scrape') as stage:
+                players_df = run_scrape(args)
+                stage.set_rows(len(players_df))
+            if args.csv:
+                players_df.to_csv(os.path.join(args.output_dir, 'livescrape.csv'), index=False)
+        else:
+            players_df = pd.read_csv(args.input)
+            log(f"Read {len(players_df)} players from {args.input}")
+
+        # The raw stage keeps the parsed schema columns, so reloading it skips the text parsing
+        write_stage(parse_players(players_df), args, 'raw', args.name)
+
+        if last_stage >= STAGES.index('clean'):
+            with diagnostics.stage('cleaning', rows=len(players_df)):
+                players_df_sin_reco = run_clean(args, players_df)
+            write_stage(players_df_sin_reco, args, 'cleaned', args.name, 'players_df_sin_reco.csv')
+
+        if last_stage >= STAGES.index('predict'):
+            from dataset_store import role_scores_frame
+
+            with diagnostics.stage('prediction', rows=len(players_df_sin_reco)):
+                role_scores = run_predict(players_df_sin_reco)
+            write_stage(role_scores_frame(role_scores), args, 'scored', args.name)
+            if args.csv:
+                role_scores.probabilities.to_csv(os.path.join(args.output_dir, 'role_probabilities.csv'))
+                role_scores.labels.to_csv(os.path.join(args.output_dir, 'role_labels.csv'))
+
+    if args.history and last_stage >= STAGES.index('clean'):
+        from player_history import PlayerHistory
+
+        scores = role_scores if last_stage >= STAGES.index('predict') else None
+        snapshot_id = PlayerHistory().record_snapshot(players_df_sin_reco, scores, source=args.input or 'scrape',
+                                                      profile=args.profile)
+        log(f"Recorded history snapshot {snapshot_id}")
+
+    if last_stage >= STAGES.index('squad'):
+        positions = players_df_sin_reco['POSITION'].to_numpy()
+        with diagnostics.stage('squad', rows=len(positions)):
+            outputs = run_squad(args, role_scores, positions)
+        for file_name, frame in outputs.items():
+            is_table = file_name in ('squad_comparison.csv', 'squad_overlap.csv')
+            write_stage(frame, args, 'squads', f"{args.name}_{file_name[:-len('.csv')]}", file_name, index=is_table)
+
+    if args.metrics:
+        log(f"Wrote {diagnostics.export(args.metrics)}")
+    log(f"Finished in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,284 @@
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from cleaning import CLASSIFICATION_THRESHOLD
+from schema import INFO_NAMES, ROLES, STAT_NAMES
+
+# SQLite file holding every recorded snapshot
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'player_history.db')
+
+# Bumped whenever the tables change
+HISTORY_VERSION = 1
+
+# Info columns that can change between snapshots (the name and nationality make up the player id)
+SNAPSHOT_INFO_NAMES = [name for name in INFO_NAMES if name not in ('Player Name', 'NATIONALITY')]
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id INTEGER PRIMARY KEY,
+    taken_at TEXT NOT NULL,
+    source TEXT,
+    profile TEXT,
+    players INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    nationality TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshot_players (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots,
+    player_id TEXT NOT NULL REFERENCES players,
+    taken_at TEXT NOT NULL,
+    row_number INTEGER NOT NULL,
+    height TEXT,
+    preferred_foot TEXT,
+    shirt_number REAL,
+    position TEXT,
+    PRIMARY KEY (snapshot_id, player_id)
+);
+CREATE TABLE IF NOT EXISTS player_stats (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots,
+    player_id TEXT NOT NULL,
+    taken_at TEXT NOT NULL,
+    stat TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (snapshot_id, player_id, stat)
+);
+CREATE TABLE IF NOT EXISTS role_scores (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots,
+    player_id TEXT NOT NULL,
+    taken_at TEXT NOT NULL,
+    role TEXT NOT NULL,
+    score REAL,
+    probability REAL,
+    label INTEGER,
+    PRIMARY KEY (snapshot_id, player_id, role)
+);
+CREATE INDEX IF NOT EXISTS snapshot_players_player_date ON snapshot_players (player_id, taken_at);
+CREATE INDEX IF NOT EXISTS player_stats_player_date ON player_stats (player_id, taken_at);
+CREATE INDEX IF NOT EXISTS role_scores_player_date ON role_scores (player_id, taken_at);
+CREATE INDEX IF NOT EXISTS role_scores_role_score ON role_scores (role, score);
+CREATE INDEX IF NOT EXISTS role_scores_role_date ON role_scores (role, taken_at);
+"""
+
+# Change in a role's score between each player's first and last snapshot in a period; snapshots taken
+# in the same second are ordered by snapshot_id, as in top_players
+RISERS_SQL = """
+SELECT player_id, name, first_score, last_score, last_score - first_score AS change, snapshots
+FROM (
+    SELECT player_id,
+           FIRST_VALUE(score) OVER (PARTITION BY player_id ORDER BY taken_at, snapshot_id) AS first_score,
+           FIRST_VALUE(score) OVER (PARTITION BY player_id ORDER BY taken_at DESC, snapshot_id DESC) AS last_score,
+           COUNT(*) OVER (PARTITION BY player_id) AS snapshots
+    FROM role_scores
+    WHERE role = ? AND taken_at >= ? AND taken_at <= ? AND score IS NOT NULL
+)
+JOIN players USING (player_id)
+WHERE snapshots > 1
+GROUP BY player_id
+ORDER BY change DESC
+LIMIT ?
+"""
+
+
+def player_id(name, nationality):
+    """Returns the stable id of a player across scrapes: nationality and name slug, e.g. "sin/hariss-harun".
+
+    The scrape has no SofaScore id column, so this is the same slug the player's URL ends with.
+    """
+    slug = re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-')
+    return f"{str(nationality).lower()}/{slug}"
+
+
+def snapshot_fingerprint(players_df_sin_reco, role_scores=None):
+    """Returns a hash of a snapshot's content, so recording the same data twice adds nothing."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(players_df_sin_reco, index=False).values.tobytes())
+    digest.update(repr(list(players_df_sin_reco.columns)).encode())
+    if role_scores is not None:
+        digest.update(pd.util.hash_pandas_object(role_scores.probabilities, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+class PlayerHistory:
+    """SQLite store of dated player snapshots: info, stats, role scores and model probabilities.
+
+    Each recorded players_df_sin_reco becomes one snapshot. Rows are keyed by a stable
+    player id and denormalize the snapshot date, so per-player time series and per-role
+    score queries are answered from the (player, date) and (role, score) indexes.
+    """
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # Streamlit runs each session on its own thread
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript(SCHEMA_SQL)
+            version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+            if version == 0:
+                self.connection.execute(f'PRAGMA user_version = {HISTORY_VERSION}')
+            elif version != HISTORY_VERSION:
+                raise ValueError(f"{path} was written by another history version")
+
+    def close(self):
+        self.connection.close()
+
+    def query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self.connection, params=params)
+
+    def record_snapshot(self, players_df_sin_reco, role_scores=None, taken_at=None, source=None, profile=None):
+        """Records a cleaned dataset (and optionally its model scores) as a snapshot and returns its id.
+
+        taken_at defaults to now, as an ISO "YYYY-MM-DDTHH:MM:SS" string. A snapshot whose
+        content was already recorded is not stored again; its existing id is returned.
+        """
+        taken_at = taken_at or time.strftime('%Y-%m-%dT%H:%M:%S')
+        fingerprint = snapshot_fingerprint(players_df_sin_reco, role_scores)
+        ids = [player_id(name, nationality) for name, nationality
+               in zip(players_df_sin_reco['Player Name'], players_df_sin_reco['NATIONALITY'])]
+        roles = [name for name in players_df_sin_reco.columns if f'Class_{name}' in players_df_sin_reco.columns]
+
+        with self._lock, self.connection:
+            existing = self.connection.execute('SELECT snapshot_id FROM snapshots WHERE fingerprint = ?',
+                                               (fingerprint,)).fetchone()
+            if existing:
+                return existing[0]
+
+            snapshot_id = self.connection.execute(
+                'INSERT INTO snapshots (taken_at, source, profile, players, fingerprint) VALUES (?, ?, ?, ?, ?)',
+                (taken_at, source, profile, len(ids), fingerprint)
+            ).lastrowid
+
+            self.connection.executemany(
+                'INSERT INTO players (player_id, name, nationality) VALUES (?, ?, ?) '
+                'ON CONFLICT (player_id) DO UPDATE SET name = excluded.name',
+                zip(ids, players_df_sin_reco['Player Name'], players_df_sin_reco['NATIONALITY'])
+            )
+
+            info = players_df_sin_reco[SNAPSHOT_INFO_NAMES].astype(object).where(
+                players_df_sin_reco[SNAPSHOT_INFO_NAMES].notna(), None)
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO snapshot_players VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                ((snapshot_id, pid, taken_at, row_number, *values)
+                 for row_number, (pid, values) in enumerate(zip(ids, info.itertuples(index=False, name=None))))
+            )
+
+            # One row per (player, stat) and per (player, role); missing values are stored as NULL
+            stats = players_df_sin_reco[STAT_NAMES].astype(object).where(players_df_sin_reco[STAT_NAMES].notna(), None)
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO player_stats VALUES (?, ?, ?, ?, ?)',
+                ((snapshot_id, pid, taken_at, stat, value)
+                 for pid, values in zip(ids, stats.itertuples(index=False, name=None))
+                 for stat, value in zip(STAT_NAMES, values))
+            )
+
+            scores = players_df_sin_reco[roles].astype(object).where(players_df_sin_reco[roles].notna(), None)
+            probabilities = labels = None
+            if role_scores is not None:
+                probabilities = role_scores.probabilities.reindex(columns=roles).to_numpy()
+                labels = role_scores.labels.reindex(columns=roles).to_numpy()
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO role_scores VALUES (?, ?, ?, ?, ?, ?, ?)',
+                ((snapshot_id, pid, taken_at, role, values[j],
+                  None if probabilities is None or pd.isna(probabilities[i, j]) else float(probabilities[i, j]),
+                  None if labels is None or pd.isna(labels[i, j]) else int(labels[i, j]))
+                 for i, (pid, values) in enumerate(zip(ids, scores.itertuples(index=False, name=None)))
+                 for j, role in enumerate(roles))
+            )
+        return snapshot_id
+
+    def snapshots(self):
+        """Returns every snapshot (id, date, source, weight profile, number of players), newest first."""
+        return self.query('SELECT snapshot_id, taken_at, source, profile, players FROM snapshots '
+                          'ORDER BY taken_at DESC, snapshot_id DESC')
+
+    def snapshot(self, snapshot_id):
+        """Returns a snapshot as players_df_sin_reco (and its RoleScores matrices if it was recorded with them).
+
+        Returns (players_df_sin_reco, probabilities, labels); the last two are None for
+        snapshots recorded without model scores.
+        """
+        info = self.query(
+            'SELECT player_id, name, nationality, height, preferred_foot, shirt_number, position '
+            'FROM snapshot_players JOIN players USING (player_id) WHERE snapshot_id = ? ORDER BY row_number',
+            (snapshot_id,)
+        ).set_index('player_id')
+        info.columns = INFO_NAMES
+
+        stats = self.query('SELECT player_id, stat, value FROM player_stats WHERE snapshot_id = ?', (snapshot_id,))
+        stats = stats.pivot(index='player_id', columns='stat', values='value').reindex(index=info.index,
+                                                                                     columns=STAT_NAMES)
+
+        scores = self.query('SELECT player_id, role, score, probability, label FROM role_scores WHERE snapshot_id = ?',
+                            (snapshot_id,))
+        recorded = set(scores['role'])
+        roles = [role for role in ROLES if role in recorded] + sorted(recorded - set(ROLES))
+        role_scores = scores.pivot(index='player_id', columns='role', values='score').reindex(index=info.index,
+                                                                                            columns=roles)
+        classes = (role_scores > CLASSIFICATION_THRESHOLD).astype(int).add_prefix('Class_')
+
+        players_df_sin_reco = pd.concat([info, stats, role_scores, classes], axis=1).reset_index(drop=True)
+
+        if scores['probability'].isna().all():
+            return players_df_sin_reco, None, None
+
+        def matrix(values, dtype):
+            frame = scores.pivot(index='player_id', columns='role', values=values).reindex(index=info.index,
+                                                                                         columns=roles)
+            frame.index = pd.Index(info['Player Name'], name='Player Name')
+            return frame.astype(dtype)
+
+        return players_df_sin_reco, matrix('probability', 'float32'), matrix('label', 'int8')
+
+    def player_form(self, pid, last=5):
+        """Returns a player's role scores and probabilities over their last N snapshots, oldest first."""
+        return self.query(
+            'SELECT taken_at, role, score, probability, label FROM role_scores '
+            'WHERE player_id = ? AND snapshot_id IN ('
+            '    SELECT snapshot_id FROM snapshot_players WHERE player_id = ? ORDER BY taken_at DESC, snapshot_id DESC LIMIT ?'
+            ') ORDER BY taken_at, snapshot_id, role',
+            (pid, pid, last)
+        )
+
+    def risers(self, role, since, until='9999', top=10):
+        """Returns the players whose score for a role rose most between their first and last snapshot in a period.
+
+        since and until are ISO dates or date-times, e.g. risers('Target Man', '2024-06-01').
+        """
+        return self.query(RISERS_SQL, (role, since, until, top))
+
+    def top_players(self, role, snapshot_id=None, top=10):
+        """Returns the best scored players for a role in a snapshot (the latest by default)."""
+        return self.query(
+            'SELECT name, score, probability, label FROM role_scores JOIN players USING (player_id) '
+            'WHERE role = ? AND snapshot_id = COALESCE(?, ('
+            '    SELECT snapshot_id FROM snapshots ORDER BY taken_at DESC, snapshot_id DESC LIMIT 1'
+            ')) ORDER BY score DESC LIMIT ?',
+            (role, None if snapshot_id is None else int(snapshot_id), top)
+        )
+
+
+if __name__ == '__main__':
+    # Usage: python player_history.py record <players_df_sin_reco.csv> [taken_at] | list | risers <role> <since>
+    history = PlayerHistory()
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+
+    if command == 'record':
+        taken_at = sys.argv[3] if len(sys.argv) > 3 else None
+        snapshot_id = history.record_snapshot(pd.read_csv(sys.argv[2]), taken_at=taken_at, source=sys.argv[2])
+        print(f"Recorded snapshot {snapshot_id}")
+    elif command == 'risers':
+        print(history.risers(sys.argv[2], sys.argv[3]).to_string(index=False))
+    else:
+        print(history.snapshots().to_string(index=False))
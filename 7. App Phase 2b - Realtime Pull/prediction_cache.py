@@ -0,0 +1,122 @@
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def frame_fingerprint(df):
+    """Returns a content hash of a DataFrame covering its values, index, column names and dtypes."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(repr([str(dtype) for dtype in df.dtypes]).encode())
+    return digest.hexdigest()
+
+
+# id(frame) -> (weak reference to the frame, fingerprint) of the most recently fingerprinted frames
+_fingerprints = OrderedDict()
+_fingerprints_lock = threading.Lock()
+MAX_REMEMBERED_FINGERPRINTS = 32
+
+
+def cached_frame_fingerprint(df):
+    """Returns frame_fingerprint(df), hashing each frame object only once.
+
+    Only for frames that are never modified in place, like the app's session data and
+    cached results: a rerun that passes the same frame again gets its fingerprint back
+    without hashing the values.
+    """
+    with _fingerprints_lock:
+        entry = _fingerprints.get(id(df))
+        # The weak reference tells a live frame from a new one that reused its id
+        if entry is not None and entry[0]() is df:
+            _fingerprints.move_to_end(id(df))
+            return entry[1]
+
+    fingerprint = frame_fingerprint(df)
+    with _fingerprints_lock:
+        _fingerprints[id(df)] = (weakref.ref(df), fingerprint)
+        while len(_fingerprints) > MAX_REMEMBERED_FINGERPRINTS:
+            _fingerprints.popitem(last=False)
+    return fingerprint
+
+
+def _result_size(result):
+    """Returns the approximate in-memory size of a cached result in bytes."""
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(deep=True).sum())
+    if isinstance(result, pd.Series):
+        return int(result.memory_usage(deep=True))
+    if isinstance(result, tuple):
+        return sum(_result_size(part) for part in result)
+    return 0
+
+
+class PredictionCache:
+    """Bounded LRU cache of results keyed by (data fingerprint, version id).
+
+    The version id is the model version for predictions and the cleaning config for
+    cleaned data. Cached results are shared between sessions, so callers must treat
+    them (and the data passed in) as read-only.
+    """
+
+    def __init__(self, max_entries=16, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # (fingerprint, model version) -> (result, size in bytes), oldest first
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, key):
+        """Returns the cached result for a key (marking it as recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, result):
+        """Stores a result and evicts the least recently used entries beyond the limits."""
+        size = _result_size(result)
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (result, size)
+            self._total_bytes += size
+
+            # Always keep the newest entry, even if it alone is over the byte budget
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or
+                                              self._total_bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def get_or_compute(self, data, version, compute):
+        """Returns the cached result for this data and version, calling compute() on a miss."""
+        key = (cached_frame_fingerprint(data), version)
+
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            if result is not None:
+                self.put(key, result)
+
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
@@ -0,0 +1,69 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from schema import ROLES, STAT_NAMES
+
+# File of named weight profiles: {profile: {role: {stat: weight}}}; stats left out weigh 0
+WEIGHT_PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weight_profiles.json')
+
+DEFAULT_PROFILE = 'Default'
+
+
+def weight_matrix(role_weights, roles=ROLES, stat_names=STAT_NAMES):
+    """Builds the role x stat weight matrix of one profile, checking it only uses known roles and stats."""
+    unknown_roles = [role for role in role_weights if role not in roles]
+    if unknown_roles:
+        raise ValueError(f"Unknown roles in weight profile: {', '.join(unknown_roles)}")
+
+    matrix = pd.DataFrame(0.0, index=list(roles), columns=list(stat_names))
+    for role, stat_weights in role_weights.items():
+        unknown_stats = [stat for stat in stat_weights if stat not in matrix.columns]
+        if unknown_stats:
+            raise ValueError(f"Unknown stats in the weights for '{role}': {', '.join(unknown_stats)}")
+        matrix.loc[role, list(stat_weights)] = list(stat_weights.values())
+    return matrix
+
+
+def load_weight_profiles(path=WEIGHT_PROFILES_PATH):
+    """Returns {profile name: weight matrix} for every profile in the file."""
+    with open(path) as f:
+        profiles = json.load(f)
+    return {name: weight_matrix(role_weights) for name, role_weights in profiles.items()}
+
+
+def composite_scores(features, weights):
+    """Returns the players x roles composite scores of a players x stats array in one matrix multiply.
+
+    A player's score for a role is NaN when a stat the role uses is missing, like the
+    original per-role sum; missing stats a role does not use are ignored.
+    """
+    weights = np.asarray(weights, dtype=float)
+    missing = np.isnan(features)
+
+    scores = np.where(missing, 0.0, features) @ weights.T
+    scores[missing.astype(float) @ (weights != 0).T > 0] = np.nan
+    return scores
+
+
+def score_profiles(features, profiles, index=None):
+    """Scores the players under every profile at once and returns {profile name: players x roles DataFrame}.
+
+    All profiles are stacked into one (profiles x roles) x stats matrix, so adding
+    profiles only widens a single matrix multiply.
+    """
+    names = list(profiles)
+    if not names:
+        return {}
+
+    stacked = np.vstack([profiles[name].to_numpy() for name in names])
+    scores = composite_scores(features, stacked)
+
+    results = {}
+    for i, name in enumerate(names):
+        roles = profiles[name].index
+        block = scores[:, i * len(roles):(i + 1) * len(roles)]
+        results[name] = pd.DataFrame(block, index=index, columns=roles)
+    return results
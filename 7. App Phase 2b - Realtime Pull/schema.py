@@ -0,0 +1,141 @@
+from collections import namedtuple
+
+import pandas as pd
+
+# One canonical column: its name in the cleaned data, the SofaScore label it is read from,
+# how the raw text is parsed, the dtype it ends up with, and whether a scrape must have it
+Column = namedtuple('Column', ['name', 'label', 'parse', 'dtype', 'required'], defaults=(True,))
+
+PERCENTAGE_PATTERN = r'\((\d+)%\)'
+
+### Player Schema
+
+# Player details, kept as they are apart from the shirt number
+INFO_COLUMNS = [
+    Column('Player Name', 'Player Name', 'text', 'object'),
+    Column('NATIONALITY', 'NATIONALITY', 'text', 'object'),
+    Column('HEIGHT', 'HEIGHT', 'text', 'object'),
+    Column('PREFERRED FOOT', 'PREFERRED FOOT', 'text', 'object'),
+    Column('SHIRT NUMBER', 'SHIRT NUMBER', 'number', 'float64'),
+    Column('POSITION', 'POSITION', 'text', 'object')
+]
+
+# Stats used for scaling, role scores and the models. "percentage" stats are shown by
+# SofaScore as "12.8 (80%)" and only the percentage is kept, as a decimal
+STAT_COLUMNS = [
+    Column('Goals per game', 'Goals per game', 'number', 'float64'),
+    Column('Assists', 'Assists', 'number', 'float64'),
+    Column('Accurate per game', 'Accurate per game', 'percentage', 'float64'),
+    Column('Acc. long balls', 'Acc. long balls', 'percentage', 'float64'),
+    Column('Acc. crosses', 'Acc. crosses', 'percentage', 'float64'),
+    Column('Interceptions per game', 'Interceptions per game', 'number', 'float64'),
+    Column('Balls recovered per game', 'Balls recovered per game', 'number', 'float64'),
+    Column('Dribbled past per game', 'Dribbled past per game', 'number', 'float64'),
+    Column('Clearances per game', 'Clearances per game', 'number', 'float64'),
+    Column('Succ. dribbles', 'Succ. dribbles', 'percentage', 'float64'),
+    Column('Total duels won', 'Total duels won', 'percentage', 'float64'),
+    Column('Aerial duels won', 'Aerial duels won', 'percentage', 'float64'),
+    Column('Clean sheets', 'Clean sheets', 'number', 'float64', required=False),
+    Column('Saves per game', 'Saves per game', 'percentage', 'float64', required=False)
+]
+
+PLAYER_COLUMNS = INFO_COLUMNS + STAT_COLUMNS
+
+INFO_NAMES = [column.name for column in INFO_COLUMNS]
+STAT_NAMES = [column.name for column in STAT_COLUMNS]
+PLAYER_NAMES = INFO_NAMES + STAT_NAMES
+
+# Goalkeeping stats, only recorded for keepers (so a scrape without keepers has no such columns)
+KEEPER_STAT_NAMES = ['Clean sheets', 'Saves per game']
+
+# Outfield stats, i.e. every stat but the goalkeeping ones
+OUTFIELD_STAT_NAMES = [name for name in STAT_NAMES if name not in KEEPER_STAT_NAMES]
+
+ROLES = [
+    'Traditional Keeper',
+    'Sweeper Keeper',
+    'Ball-Playing Defender',
+    'No-Nonsense Defender',
+    'Full-Back',
+    'All-Action Midfielder',
+    'Midfield Playmaker',
+    'Traditional Winger',
+    'Inverted Winger',
+    'Goal Poacher',
+    'Target Man'
+]
+
+CLASS_NAMES = [f'Class_{role}' for role in ROLES]
+
+# Layout of players_df_sin_reco: player columns, then a score and a class per role
+CLEANED_NAMES = PLAYER_NAMES + ROLES + CLASS_NAMES
+
+
+class SchemaError(ValueError):
+    """Raised when a scrape is missing columns the schema needs."""
+
+
+def parse_text(values):
+    return values
+
+
+def parse_number(values):
+    """Turns the values into floats; anything that is not a number becomes NaN."""
+    return pd.to_numeric(values, errors='coerce').astype(float)
+
+
+def parse_percentage(values):
+    """Turns "12.8 (80%)" style values into the percentage as a decimal (0.8); anything else becomes NaN."""
+    return values.astype(str).str.extract(PERCENTAGE_PATTERN, expand=False).astype(float) / 100
+
+
+PARSERS = {
+    'text': parse_text,
+    'number': parse_number,
+    'percentage': parse_percentage
+}
+
+
+def require_columns(players_df, columns=PLAYER_COLUMNS):
+    """Raises SchemaError if any of the schema's required labels is missing from a raw scrape."""
+    missing = [column.label for column in columns if column.required and column.label not in players_df.columns]
+    if missing:
+        raise SchemaError(f"Scraped data is missing columns: {', '.join(missing)}")
+
+
+def validate_players(players_df, columns=PLAYER_COLUMNS):
+    """Checks a raw scrape against the schema and returns {column name: number of unparseable values}.
+
+    Blank values are not counted, since SofaScore leaves stats empty for players
+    they do not apply to.
+    """
+    require_columns(players_df, columns)
+
+    problems = {}
+    for column in columns:
+        if column.parse == 'text' or column.label not in players_df.columns:
+            continue
+        raw = players_df[column.label]
+        present = raw.notna() & (raw.astype(str).str.strip() != '')
+        unparsed = int((present & PARSERS[column.parse](raw).isna()).sum())
+        if unparsed:
+            problems[column.name] = unparsed
+    return problems
+
+
+def parse_players(players_df, columns=PLAYER_COLUMNS):
+    """Returns the schema columns of a raw scrape, renamed, parsed and in the schema's order.
+
+    Columns are found by their SofaScore label, so the date-of-birth headers and other
+    extra columns of the scrape can be anywhere without shifting anything.
+    """
+    require_columns(players_df, columns)
+
+    parsed = {}
+    for column in columns:
+        if column.label in players_df.columns:
+            parsed[column.name] = PARSERS[column.parse](players_df[column.label]).astype(column.dtype)
+        else:
+            # Optional columns missing from the scrape are left empty
+            parsed[column.name] = pd.Series(float('nan'), index=players_df.index, dtype=column.dtype)
+    return pd.DataFrame(parsed, index=players_df.index)
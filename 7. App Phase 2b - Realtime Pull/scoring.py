@@ -0,0 +1,95 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_import
+
+# Player x role matrices produced by one scoring pass:
+#   probabilities - float32 probability that the player suits each role
+#   labels        - int8 predicted label (1 = Recommended) for each role
+RoleScores = namedtuple('RoleScores', ['probabilities', 'labels'])
+
+
+def split_pipeline(model):
+    """Returns the preprocessing steps and the final estimator of a pycaret pipeline."""
+    steps = getattr(model, 'steps', None)
+    if not steps:
+        return [], model
+    return [step for _, step in steps[:-1]], steps[-1][1]
+
+
+def preprocessing_key(steps):
+    """Returns a hash identifying a list of fitted preprocessing steps.
+
+    Wrapped transformers are hashed without the pycaret wrapper, which also stores the
+    target name, so role models fitted on the same features share the same key.
+    """
+    return lazy_import('joblib').hash([
+        (type(step).__name__, getattr(step, 'transformer', step), getattr(step, 'include', None))
+        for step in steps
+    ])
+
+
+def apply_preprocessing(steps, data):
+    """Runs the data through the fitted preprocessing steps of a pipeline."""
+    for step in steps:
+        data = step.transform(data)
+    return data
+
+
+def positive_probability(estimator, features):
+    """Returns the probability of the positive (1) class for each row."""
+    if hasattr(estimator, 'predict_proba'):
+        proba = estimator.predict_proba(features)
+        classes = list(estimator.classes_)
+        return proba[:, classes.index(1) if 1 in classes else -1]
+
+    # Models without probabilities (e.g. RidgeClassifier) map the decision function through a sigmoid
+    return 1.0 / (1.0 + np.exp(-estimator.decision_function(features)))
+
+
+def score_players(models, data, id_column='Player Name'):
+    """Scores every player for every role in one pass and returns a RoleScores pair.
+
+    Models whose preprocessing is identical are grouped so the data is only transformed
+    once per group, and each estimator then runs on the shared feature frame.
+    """
+    # Index the matrices by player
+    if id_column in data.columns:
+        index = pd.Index(data[id_column], name=id_column)
+    else:
+        index = data.index
+
+    # Group the estimators by their preprocessing so each distinct pipeline prefix runs once
+    groups = {}
+    for role, model in models.items():
+        if model is None:
+            continue
+        steps, estimator = split_pipeline(model)
+        key = preprocessing_key(steps)
+        groups.setdefault(key, (steps, []))[1].append((role, estimator))
+
+    probabilities = {}
+    for steps, estimators in groups.values():
+        transformed = apply_preprocessing(steps, data)
+
+        # Reuse the same feature frame for every estimator trained on the same columns
+        feature_frames = {}
+        for role, estimator in estimators:
+            feature_names = tuple(getattr(estimator, 'feature_names_in_', transformed.columns))
+            if feature_names not in feature_frames:
+                feature_frames[feature_names] = transformed[list(feature_names)]
+            probabilities[role] = positive_probability(estimator, feature_frames[feature_names])
+
+    # Keep the caller's role order
+    roles = [role for role in models if role in probabilities]
+    matrix = np.column_stack([probabilities[role] for role in roles]) if roles else np.empty((len(index), 0))
+
+    # Labels follow the classifiers' own rule: positive when the probability is above one half
+    labels = (matrix > 0.5).astype(np.int8)
+
+    return RoleScores(
+        probabilities=pd.DataFrame(matrix.astype(np.float32), index=index, columns=roles),
+        labels=pd.DataFrame(labels, index=index, columns=roles)
+    )
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from scrape_jobs import JOBS_DIR, ScrapeJournal, run_scrape_job, unfinished_jobs
+from scraper import LEAGUE_URL, PAGE_TIMEOUT, make_headless_driver, scrape_squad_urls, scrape_team_urls
+
+# File holding the cached team lists, squad lists and player stat snapshots
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrape_cache.json')
+
+# Default ages in seconds after which cached pages are fetched again
+TEAM_TTL = 7 * 24 * 3600
+SQUAD_TTL = 24 * 3600
+PLAYER_TTL = 24 * 3600
+
+# Players who did not play since the previous pull are only re-checked after this long
+IDLE_TTL = 7 * 24 * 3600
+
+
+def squad_signature(player_urls):
+    """Returns a hash of a squad's player URLs that changes whenever a player joins or leaves."""
+    return hashlib.sha1("\n".join(sorted(player_urls)).encode()).hexdigest()
+
+
+class ScrapeCache:
+    """On-disk cache of team URL lists, squad URL lists and per-player stat snapshots, each with a fetched-at time."""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+
+        # league url -> {"fetched_at", "team_urls"}
+        self.teams = {}
+        # team url -> {"fetched_at", "changed_at", "signature", "player_urls"}
+        self.squads = {}
+        # player url -> {"fetched_at", "team_url", "data", "idle"}
+        self.players = {}
+
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                cached = json.load(f)
+            self.teams = cached.get("teams", {})
+            self.squads = cached.get("squads", {})
+            self.players = cached.get("players", {})
+
+    def save(self):
+        """Writes the cache to a temporary file first so a crash never leaves it half written."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({"teams": self.teams, "squads": self.squads, "players": self.players}, f)
+        os.replace(tmp_path, self.path)
+
+    def store_teams(self, league_url, team_urls, now):
+        self.teams[league_url] = {"fetched_at": now, "team_urls": list(team_urls)}
+
+    def store_squad(self, team_url, player_urls, now):
+        """Stores a team's squad, remembering when its player list last changed."""
+        signature = squad_signature(player_urls)
+        previous = self.squads.get(team_url)
+        changed = previous is None or previous["signature"] != signature
+
+        self.squads[team_url] = {
+            "fetched_at": now,
+            "changed_at": now if changed else previous["changed_at"],
+            "signature": signature,
+            "player_urls": list(player_urls)
+        }
+
+    def store_player(self, player_url, team_url, data, now):
+        """Stores a player's stats; a player is idle if they have no current-season stats or no new appearances."""
+        previous = self.players.get(player_url)
+        previous_data = previous["data"] if previous else None
+
+        idle = data is None or (previous_data is not None and
+                                previous_data.get("Total played") == data.get("Total played"))
+
+        self.players[player_url] = {"fetched_at": now, "team_url": team_url, "data": data, "idle": idle}
+
+    def player_needs_refresh(self, player_url, team_url, now, player_ttl=PLAYER_TTL, idle_ttl=IDLE_TTL):
+        snapshot = self.players.get(player_url)
+        if snapshot is None:
+            return True
+
+        # Re-fetch everyone on a team whose page changed since this player was last pulled
+        squad = self.squads.get(team_url)
+        if squad is not None and squad["changed_at"] > snapshot["fetched_at"]:
+            return True
+
+        age = now - snapshot["fetched_at"]
+        return age > (idle_ttl if snapshot["idle"] else player_ttl)
+
+    def players_df(self, player_urls):
+        """Builds the players_df of scrape_player_data from the cached snapshots of the given players."""
+        players_list = [self.players[url]["data"] for url in player_urls
+                        if url in self.players and self.players[url]["data"] is not None]
+        return pd.DataFrame(players_list)
+
+
+def incremental_scrape(cache, league_url=LEAGUE_URL, max_workers=1, timeout=PAGE_TIMEOUT, timings=None,
+                       team_ttl=TEAM_TTL, squad_ttl=SQUAD_TTL, player_ttl=PLAYER_TTL, idle_ttl=IDLE_TTL,
+                       jobs_dir=JOBS_DIR, on_progress=None, on_team_progress=None, on_error=None,
+                       cancel_event=None, driver_factory=make_headless_driver):
+    """Refreshes only the stale parts of the cache and returns (players_df, stats).
+
+    Team and squad lists are re-fetched once older than their TTL. Players are re-fetched
+    when they are new, their team's squad changed, or their snapshot is older than the
+    TTL (the longer idle TTL for players who did not play since the previous pull).
+    Player pages are fetched as a journaled scrape job, and players finished by an
+    interrupted earlier run are replayed from its journal instead of fetched again.
+    Setting cancel_event stops the refresh after the page in progress.
+    """
+    now = time.time()
+    stats = {"teams_fetched": 0, "squads_fetched": 0, "players_fetched": 0, "players_skipped": 0, "errors": 0}
+
+    # Team list
+    cached_teams = cache.teams.get(league_url)
+    if cached_teams is None or now - cached_teams["fetched_at"] > team_ttl:
+        team_urls = scrape_team_urls(league_url, driver_factory, timeout=timeout, timings=timings,
+                                     cancel_event=cancel_event)
+        # Keep the previous list if the page could not be read
+        if team_urls:
+            cache.store_teams(league_url, team_urls, now)
+            stats["teams_fetched"] = 1
+    team_urls = cache.teams.get(league_url, {}).get("team_urls", [])
+
+    # Squad lists
+    stale_teams = [team_url for team_url in team_urls
+                   if team_url not in cache.squads or now - cache.squads[team_url]["fetched_at"] > squad_ttl]
+    if stale_teams:
+        squad_urls = scrape_squad_urls(stale_teams, driver_factory, timeout=timeout, timings=timings,
+                                       on_progress=on_team_progress, cancel_event=cancel_event)
+        for team_url, player_urls in squad_urls.items():
+            cache.store_squad(team_url, player_urls, now)
+            stats["squads_fetched"] += 1
+    cache.save()
+
+    # Replay players finished by an interrupted run into the cache
+    for journal in unfinished_jobs(jobs_dir, kind='incremental'):
+        journal_teams = journal.meta["extra"].get("player_teams", {})
+        for player_url, entry in journal.completed_entries().items():
+            cache.store_player(player_url, journal_teams.get(player_url), entry["data"], entry["finished_at"])
+        journal.mark_finished()
+    cache.save()
+
+    # Player pages
+    player_teams = {}
+    for team_url in team_urls:
+        for player_url in cache.squads.get(team_url, {}).get("player_urls", []):
+            player_teams.setdefault(player_url, team_url)
+
+    to_fetch = [player_url for player_url, team_url in player_teams.items()
+                if cache.player_needs_refresh(player_url, team_url, now, player_ttl, idle_ttl)]
+    stats["players_skipped"] = len(player_teams) - len(to_fetch)
+
+    if to_fetch:
+        def store(player_url, player_dict):
+            cache.store_player(player_url, player_teams[player_url], player_dict, time.time())
+            stats["players_fetched"] += 1
+
+        def count_error(player_url, error):
+            stats["errors"] += 1
+            if on_error is not None:
+                on_error(player_url, error)
+
+        journal = ScrapeJournal.create(to_fetch, kind='incremental', root=jobs_dir,
+                                       extra={"player_teams": {url: player_teams[url] for url in to_fetch}})
+        run_scrape_job(journal, max_workers, timeout, timings, on_result=store, on_progress=on_progress,
+                       on_error=count_error, cancel_event=cancel_event, driver_factory=driver_factory)
+    cache.save()
+
+    return cache.players_df(player_teams), stats
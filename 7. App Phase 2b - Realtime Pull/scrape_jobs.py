@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+from scraper import PAGE_TIMEOUT, ScrapeCancelled, is_cancelled, iter_player_pages, make_headless_driver
+
+# Folder holding one sub-folder per scrape job
+JOBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrape_jobs')
+
+
+class ScrapeJournal:
+    """Durable record of one scrape job: its queue of player URLs and a JSONL journal of finished URLs.
+
+    Every result is appended and flushed to disk as soon as the page is done, so a crashed
+    browser or a restarted Streamlit server only loses the pages that were in flight.
+    """
+
+    def __init__(self, job_dir):
+        self.job_dir = job_dir
+        self.job_id = os.path.basename(job_dir)
+        self.meta_path = os.path.join(job_dir, 'job.json')
+        self.results_path = os.path.join(job_dir, 'results.jsonl')
+        self._lock = threading.Lock()
+        self._tail_checked = False
+
+        with open(self.meta_path) as f:
+            self.meta = json.load(f)
+
+    @classmethod
+    def create(cls, player_urls, kind='full', extra=None, root=JOBS_DIR):
+        """Creates a new job for the given player URLs."""
+        job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        job_dir = os.path.join(root, job_id)
+        os.makedirs(job_dir)
+
+        meta = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": "running",
+            "created_at": time.time(),
+            "urls": list(player_urls),
+            "extra": extra or {}
+        }
+        _write_json_atomic(os.path.join(job_dir, 'job.json'), meta)
+        open(os.path.join(job_dir, 'results.jsonl'), 'a').close()
+
+        return cls(job_dir)
+
+    @property
+    def urls(self):
+        return self.meta["urls"]
+
+    @property
+    def finished(self):
+        """True once the job ran to the end; running (interrupted) and cancelled jobs can be resumed."""
+        return self.meta["status"] == "finished"
+
+    def entries(self):
+        """Returns the journal entries written so far, skipping any line cut off by a crash."""
+        entries = []
+        with open(self.results_path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+
+    def _truncate_torn_tail(self):
+        """Cuts off a last line left half written by a crash, so new entries start on a line of their own."""
+        with open(self.results_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def completed_entries(self):
+        """Returns the latest successful entry for each URL (failed pages are retried on resume)."""
+        completed = {}
+        for entry in self.entries():
+            if entry["error"] is None:
+                completed[entry["url"]] = entry
+        return completed
+
+    def pending_urls(self):
+        completed = self.completed_entries()
+        return [url for url in self.urls if url not in completed]
+
+    def record(self, player_url, data, error, seconds):
+        """Appends one finished URL to the journal and forces it to disk."""
+        entry = {
+            "url": player_url,
+            "data": data,
+            "error": None if error is None else str(error),
+            "seconds": seconds,
+            "finished_at": time.time()
+        }
+        with self._lock:
+            if not self._tail_checked:
+                self._truncate_torn_tail()
+                self._tail_checked = True
+
+            with open(self.results_path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def mark_finished(self, status="finished"):
+        self.meta["status"] = status
+        self.meta["finished_at"] = time.time()
+        _write_json_atomic(self.meta_path, self.meta)
+
+    def players_df(self):
+        """Builds the players_df of scrape_player_data from the journal, in the job's URL order."""
+        completed = self.completed_entries()
+        players_list = [completed[url]["data"] for url in self.urls
+                        if url in completed and completed[url]["data"] is not None]
+        return pd.DataFrame(players_list)
+
+
+def _write_json_atomic(path, obj):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def list_jobs(root=JOBS_DIR, kind=None):
+    """Returns the journals of all jobs under root, oldest first."""
+    if not os.path.isdir(root):
+        return []
+
+    journals = []
+    for job_id in sorted(os.listdir(root)):
+        job_dir = os.path.join(root, job_id)
+        if os.path.exists(os.path.join(job_dir, 'job.json')):
+            journal = ScrapeJournal(job_dir)
+            if kind is None or journal.meta["kind"] == kind:
+                journals.append(journal)
+    return journals
+
+
+def unfinished_jobs(root=JOBS_DIR, kind=None):
+    return [journal for journal in list_jobs(root, kind) if not journal.finished]
+
+
+def run_scrape_job(journal, max_workers=1, timeout=PAGE_TIMEOUT, timings=None, on_result=None, on_progress=None,
+                   on_error=None, cancel_event=None, driver_factory=make_headless_driver):
+    """Scrapes the job's pending URLs, journaling each page as it finishes, and returns the job's players_df.
+
+    Calling this again on an interrupted job skips every URL already in the journal. If
+    cancel_event is set the job stops early and is marked as cancelled; its unfetched
+    pages stay pending, so the next full scrape resumes it.
+    """
+    pending = journal.pending_urls()
+    done_before = len(journal.urls) - len(pending)
+
+    for done, (_, player_url, player_dict, error, seconds) in enumerate(
+            iter_player_pages(pending, max_workers, timeout, cancel_event, driver_factory=driver_factory), start=1):
+        # Pages skipped by a cancel were never fetched, so they stay pending
+        if isinstance(error, ScrapeCancelled):
+            continue
+
+        journal.record(player_url, player_dict, error, seconds)
+
+        if timings is not None:
+            timings.append((player_url, seconds, error is None))
+        if error is not None:
+            print(f"Error processing {player_url}: {error}")
+            if on_error is not None:
+                on_error(player_url, error)
+        elif on_result is not None:
+            on_result(player_url, player_dict)
+        if on_progress is not None:
+            on_progress(done_before + done, len(journal.urls))
+
+    journal.mark_finished("cancelled" if is_cancelled(cancel_event) else "finished")
+    return journal.players_df()
@@ -0,0 +1,410 @@
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import pandas as pd
+from selenium import webdriver
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from page_parser import (CURRENT_SEASON, LEAGUE_URL, SEASON_SELECTOR, SQUAD_LIST_SELECTOR, STAT_SELECTORS,
+                         TEAM_LIST_SELECTOR, parse_player_page, parse_squad_urls, parse_team_urls)
+
+# XPath of the squad tab on a team page
+SQUAD_TAB_XPATH = "/html/body/div[1]/main/div[1]/div[3]/div[1]/div/div/div/h2[4]/a"
+
+# Seconds to wait for a page's content before giving up on it
+PAGE_TIMEOUT = 10
+
+# Seconds each browser waits between two pages of the same host, plus a little jitter
+PAGE_INTERVAL = 1.0
+
+# Requests the browser never needs to make: images, fonts and ad/tracking scripts
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*adservice.google*", "*amazon-adsystem.com*"
+]
+
+
+class ScrapeCancelled(Exception):
+    """Raised for pages skipped because the scrape was cancelled."""
+
+
+def is_cancelled(cancel_event):
+    return cancel_event is not None and cancel_event.is_set()
+
+
+def make_driver(headless=False, block_resources=True, page_load_timeout=30):
+    """Creates a Chrome WebDriver (Make sure you have the appropriate driver installed, e.g., chromedriver for Chrome).
+
+    Pages are considered loaded once the DOM is ready; the scraper then waits for the
+    specific elements it needs instead of for every image and script.
+    """
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = 'eager'
+    if headless:
+        options.add_argument('--headless=new')
+    if block_resources:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(page_load_timeout)
+
+    if block_resources:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+    return driver
+
+
+def make_headless_driver():
+    """Creates a headless Chrome WebDriver, for scrapes that run on a server without a display."""
+    return make_driver(headless=True)
+
+
+def wait_for(driver, condition, timeout=PAGE_TIMEOUT):
+    """Waits for an expected condition and returns its result, or None if it times out."""
+    try:
+        # The page re-renders while loading, so elements found a moment ago may have gone stale
+        return WebDriverWait(driver, timeout, ignored_exceptions=(StaleElementReferenceException,)).until(condition)
+    except TimeoutException:
+        return None
+
+
+def load_page(driver, url, condition, timeout=PAGE_TIMEOUT, timings=None):
+    """Navigates to a URL and waits until the condition holds.
+
+    Returns the condition's result (None on timeout) and appends (url, seconds, ready)
+    to timings if a list is given.
+    """
+    start = time.perf_counter()
+    driver.get(url)
+    result = wait_for(driver, condition, timeout)
+
+    if timings is not None:
+        timings.append((url, time.perf_counter() - start, result is not None))
+
+    return result
+
+
+def player_page_ready(driver):
+    """Condition for a player page: the season label is shown and, for the current season, the stat boxes too."""
+    season = driver.find_elements(By.CSS_SELECTOR, SEASON_SELECTOR)
+    if not season:
+        return False
+    if season[0].text != CURRENT_SEASON:
+        return True
+    return any(driver.find_elements(By.CSS_SELECTOR, selector) for selector in STAT_SELECTORS)
+
+
+def summarize_timings(timings):
+    """Returns the page count, ready count and mean/max load latency in seconds of recorded timings."""
+    if not timings:
+        return {"pages": 0, "ready": 0, "mean_seconds": 0.0, "max_seconds": 0.0}
+
+    seconds = [elapsed for _, elapsed, _ in timings]
+    return {
+        "pages": len(timings),
+        "ready": sum(1 for _, _, ready in timings if ready),
+        "mean_seconds": sum(seconds) / len(seconds),
+        "max_seconds": max(seconds)
+    }
+
+
+## Rate Limiting
+
+class HostRateLimiter:
+    """Spaces out requests to the same host across all workers, with a little random jitter."""
+
+    def __init__(self, min_interval=PAGE_INTERVAL, jitter=PAGE_INTERVAL / 4):
+        self.min_interval = min_interval
+        self.jitter = jitter
+
+        # host -> earliest time the next request may start
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Blocks until a request to the URL's host is allowed."""
+        host = urlparse(url).netloc
+
+        # Reserve the next free slot for this host, then sleep outside the lock
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = start + self.min_interval + random.uniform(0, self.jitter)
+
+        delay = start - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def worker_rate_limiter(num_workers, page_interval=PAGE_INTERVAL):
+    """Returns a limiter that lets each of num_workers browsers load a page of a host every page_interval seconds.
+
+    The limiter is shared by the workers, so the host sees num_workers pages per
+    page_interval in total: adding workers adds throughput at the same per-browser pace.
+    """
+    interval = page_interval / max(1, num_workers)
+    return HostRateLimiter(min_interval=interval, jitter=interval / 4)
+
+
+## Scrape Team Links
+def scrape_team_urls(league_url=LEAGUE_URL, driver_factory=make_driver, timeout=PAGE_TIMEOUT, timings=None,
+                     cancel_event=None):
+    if is_cancelled(cancel_event):
+        return []
+
+    # Initialize the WebDriver
+    driver = driver_factory()
+
+    try:
+        # Navigate to the webpage and wait for the team list to render
+        load_page(driver, league_url, EC.presence_of_element_located((By.CSS_SELECTOR, TEAM_LIST_SELECTOR)),
+                  timeout, timings)
+
+        # Read the team links from a single snapshot of the page
+        team_urls = parse_team_urls(driver.page_source, league_url)
+        for team_url in team_urls:
+            print(team_url)
+    finally:
+        # Close the WebDriver, also when the page failed to load
+        driver.quit()
+
+    # Return the list of team URLs
+    return team_urls
+
+
+## Scrape Player Links
+def scrape_squad_urls(team_urls, driver_factory=make_driver, timeout=PAGE_TIMEOUT, timings=None,
+                      on_progress=None, cancel_event=None):
+    """Returns a dictionary of team URL -> player page URLs; teams whose squad could not be read are left out.
+
+    on_progress(done, total) is called after each team; a set cancel_event stops before the next team.
+    """
+    # Initialize the WebDriver
+    driver = driver_factory()
+
+    # Create a dictionary to store the player page urls of each team
+    squad_urls = {}
+
+    try:
+        # Loop through each team URL
+        for done, team_url in enumerate(team_urls, start=1):
+            if is_cancelled(cancel_event):
+                break
+
+            try:
+                # Navigate to the team webpage and wait until the squad tab can be clicked
+                element = load_page(driver, team_url, EC.element_to_be_clickable((By.XPATH, SQUAD_TAB_XPATH)),
+                                    timeout, timings)
+                if element is None:
+                    print(f"Timed out waiting for the squad tab of {team_url}")
+                    continue
+
+                # Click it to navigate to the squad page and wait for the squad list to render
+                element.click()
+                squad_list = EC.presence_of_element_located((By.CSS_SELECTOR, SQUAD_LIST_SELECTOR))
+                if wait_for(driver, squad_list, timeout) is None:
+                    print(f"Timed out waiting for the squad list of {team_url}")
+                    continue
+
+                # Read the player links from a single snapshot of the squad page
+                player_urls = parse_squad_urls(driver.page_source, team_url)
+                for player_url in player_urls:
+                    print(player_url)
+
+                squad_urls[team_url] = player_urls
+
+            except Exception as e:
+                print(f"Error processing {team_url}: {e}")
+
+            finally:
+                if on_progress is not None:
+                    on_progress(done, len(team_urls))
+    finally:
+        # Close the WebDriver, also when a page load raised
+        driver.quit()
+
+    # Return the player URLs of each team
+    return squad_urls
+
+
+def scrape_player_urls(team_urls, driver_factory=make_driver, timeout=PAGE_TIMEOUT, timings=None,
+                       on_progress=None, cancel_event=None):
+    squad_urls = scrape_squad_urls(team_urls, driver_factory, timeout, timings, on_progress, cancel_event)
+
+    # Return the list of player URLs
+    return [player_url for player_urls in squad_urls.values() for player_url in player_urls]
+
+
+## Scrape Player Data
+def extract_player_data(driver, player_url):
+    """Reads the stats of the player page currently loaded in the driver.
+
+    The page is read in one page_source round-trip and parsed locally, with each value
+    paired to its stat label. Returns None if the page has no stats for the current season.
+    """
+    return parse_player_page(driver.page_source, player_url)
+
+
+def iter_player_data(player_urls, driver_factory=make_driver, timeout=PAGE_TIMEOUT, cancel_event=None, limiter=None):
+    """Scrapes player pages one after another with a single browser, yielding (index, url, data, error, seconds).
+
+    Pages are spaced out by the same per-host rate limiter as the parallel scrape (one
+    page every PAGE_INTERVAL by default). A set cancel_event stops the scrape before the next page.
+    """
+    if limiter is None:
+        limiter = worker_rate_limiter(1)
+
+    # Initialize the WebDriver
+    driver = driver_factory()
+
+    try:
+        for index, player_url in enumerate(player_urls):
+            if is_cancelled(cancel_event):
+                break
+
+            start = time.perf_counter()
+            try:
+                limiter.wait(player_url)
+                start = time.perf_counter()
+
+                # Navigate to the player's webpage and wait only until its stats are shown
+                if load_page(driver, player_url, player_page_ready, timeout) is None:
+                    raise TimeoutException(f"Timed out after {timeout}s")
+                yield index, player_url, extract_player_data(driver, player_url), None, time.perf_counter() - start
+            except Exception as e:
+                yield index, player_url, None, e, time.perf_counter() - start
+    finally:
+        # Close the WebDriver
+        driver.quit()
+
+
+def scrape_player_data(player_urls, driver_factory=make_driver, timeout=PAGE_TIMEOUT, timings=None, limiter=None):
+    # Instantiate a list to store the stats of each player
+    players_list = []
+
+    for _, player_url, player_dict, error, seconds in iter_player_data(player_urls, driver_factory, timeout,
+                                                                       limiter=limiter):
+        if timings is not None:
+            timings.append((player_url, seconds, error is None))
+
+        if error is not None:
+            print(f"Error processing {player_url}: {error}")
+        elif player_dict is not None:
+            # Append the dictionary to the list
+            players_list.append(player_dict)
+
+    # Create and return DataFrame of players
+    players_df = pd.DataFrame(players_list)
+    return players_df
+
+
+## Parallel Scraping
+
+def _scrape_shard(shard, results, limiter, driver_factory, timeout, cancel_event):
+    """Scrapes one shard of (index, url) pairs with its own browser, putting results on the queue."""
+    try:
+        driver = driver_factory()
+    except Exception as e:
+        # Report every URL of the shard so the consumer is not left waiting for them
+        for index, player_url in shard:
+            results.put((index, player_url, None, e, 0.0))
+        return
+
+    try:
+        for index, player_url in shard:
+            # Still report cancelled pages so the consumer is not left waiting for them
+            if is_cancelled(cancel_event):
+                results.put((index, player_url, None, ScrapeCancelled(), 0.0))
+                continue
+
+            start = time.perf_counter()
+            try:
+                limiter.wait(player_url)
+                start = time.perf_counter()
+                if load_page(driver, player_url, player_page_ready, timeout) is None:
+                    raise TimeoutException(f"Timed out after {timeout}s")
+                results.put((index, player_url, extract_player_data(driver, player_url), None,
+                             time.perf_counter() - start))
+            except Exception as e:
+                results.put((index, player_url, None, e, time.perf_counter() - start))
+    finally:
+        driver.quit()
+
+
+def iter_player_data_parallel(player_urls, max_workers=4, limiter=None, driver_factory=None, timeout=PAGE_TIMEOUT,
+                              cancel_event=None):
+    """Scrapes player pages with up to max_workers browsers, yielding (index, url, data, error, seconds) as pages finish.
+
+    The URLs are split round-robin into one shard per worker and every request goes
+    through a shared per-host rate limiter instead of a fixed sleep. By default it lets
+    each worker load a page every PAGE_INTERVAL, so more workers mean more pages per second. Once cancel_event
+    is set, the remaining pages are reported with a ScrapeCancelled error and every
+    worker closes its browser.
+    """
+    if driver_factory is None:
+        driver_factory = make_headless_driver
+    indexed_urls = list(enumerate(player_urls))
+    num_workers = max(1, min(max_workers, len(indexed_urls)))
+    if limiter is None:
+        limiter = worker_rate_limiter(num_workers)
+    shards = [indexed_urls[i::num_workers] for i in range(num_workers)]
+
+    results = queue.Queue()
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(_scrape_shard, shard, results, limiter, driver_factory, timeout,
+                                   cancel_event) for shard in shards]
+
+        # Stream results back until every URL is accounted for
+        for _ in range(len(indexed_urls)):
+            yield results.get()
+
+        # Surface errors raised while starting or closing a browser
+        for future in futures:
+            future.result()
+
+
+def scrape_player_data_parallel(player_urls, max_workers=4, limiter=None, driver_factory=None, on_progress=None,
+                                timeout=PAGE_TIMEOUT, timings=None):
+    """Parallel version of scrape_player_data that returns the same players_df layout."""
+    players = []
+    for done, (index, player_url, player_dict, error, seconds) in enumerate(
+            iter_player_data_parallel(player_urls, max_workers, limiter, driver_factory, timeout), start=1):
+        if timings is not None:
+            timings.append((player_url, seconds, error is None))
+
+        if error is not None:
+            print(f"Error processing {player_url}: {error}")
+        elif player_dict is not None:
+            players.append((index, player_dict))
+
+        if on_progress is not None:
+            on_progress(done, len(player_urls))
+
+    # Keep the players in the order of the input URLs
+    players.sort(key=lambda item: item[0])
+    return pd.DataFrame([player_dict for _, player_dict in players])
+
+
+def iter_player_pages(player_urls, max_workers=1, timeout=PAGE_TIMEOUT, cancel_event=None,
+                      page_interval=PAGE_INTERVAL, driver_factory=make_headless_driver):
+    """Yields (index, url, data, error, seconds) for each player page, in parallel when max_workers > 1.
+
+    Either way each browser loads a page of a host at most every page_interval seconds,
+    and browsers are headless unless another driver_factory is given.
+    """
+    num_workers = max(1, min(max_workers, len(player_urls)))
+    limiter = worker_rate_limiter(num_workers, page_interval)
+    if num_workers > 1:
+        return iter_player_data_parallel(player_urls, max_workers=num_workers, limiter=limiter,
+                                         driver_factory=driver_factory, timeout=timeout, cancel_event=cancel_event)
+    return iter_player_data(player_urls, driver_factory, timeout, cancel_event, limiter)
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_import
+
+# Roles that only goalkeepers are considered for
+KEEPER_ROLES = ["Traditional Keeper", "Sweeper Keeper"]
+
+# Roles grouped by the squad position they count towards
+POSITION_ROLES = {
+    "Goalkeeper": ["Traditional Keeper", "Sweeper Keeper"],
+    "Defender": ["Ball-Playing Defender", "No-Nonsense Defender", "Full-Back"],
+    "Midfielder": ["All-Action Midfielder", "Midfield Playmaker", "Traditional Winger", "Inverted Winger"],
+    "Attacker": ["Goal Poacher", "Target Man"]
+}
+
+# Default quotas, matching the inputs of the Squad Generator tab
+DEFAULT_NUM_PLAYERS_PER_POSITION = {"Goalkeeper": 3, "Defender": 8, "Midfielder": 8, "Attacker": 4}
+DEFAULT_NUM_PLAYERS_PER_ROLE = {
+    "Traditional Keeper": 2,
+    "Sweeper Keeper": 1,
+    "Ball-Playing Defender": 2,
+    "No-Nonsense Defender": 2,
+    "Full-Back": 4,
+    "All-Action Midfielder": 2,
+    "Midfield Playmaker": 2,
+    "Traditional Winger": 2,
+    "Inverted Winger": 2,
+    "Goal Poacher": 2,
+    "Target Man": 2
+}
+
+SQUAD_COLUMNS = ['Player Name', 'Score', 'Role']
+
+
+def eligibility(roles, scores, positions, quotas):
+    """Returns the player x role mask of pairs that can be picked.
+
+    Goalkeepers are only evaluated for goalkeeper roles and outfield players for
+    outfield roles; roles nobody is wanted for and missing scores are skipped.
+    """
+    positions = np.asarray(positions)
+    is_keeper = positions == 'G'
+    is_outfield = np.isin(positions, ['M', 'D', 'F'])
+    keeper_role = np.isin(roles, KEEPER_ROLES)
+
+    eligible = np.where(keeper_role[None, :], is_keeper[:, None], is_outfield[:, None])
+    return eligible & (quotas > 0)[None, :] & ~np.isnan(scores)
+
+
+def role_quotas(roles, num_players_per_role):
+    return np.array([num_players_per_role.get(role, 0) for role in roles], dtype=int)
+
+
+def squad_frame(squad):
+    return pd.DataFrame(squad, columns=SQUAD_COLUMNS) if squad else pd.DataFrame()
+
+
+def generate_squad(role_scores, positions, num_players_per_role, num_players_per_position=None):
+    """Generates a squad greedily, taking the best remaining (player, role) pair until every role is filled.
+
+    Fast, but an early high score can block a better squad overall; see optimal_squad.
+    num_players_per_position is accepted for the same signature as optimal_squad and is
+    not used, as the greedy pass only fills the role quotas.
+    """
+    roles = list(role_scores.columns)
+    scores = role_scores.to_numpy()
+    quotas = role_quotas(roles, num_players_per_role)
+    eligible = eligibility(roles, scores, positions, quotas)
+
+    # Flatten the eligible (player, role) pairs and sort them by score in descending order
+    player_idx, role_idx = np.nonzero(eligible)
+    candidate_scores = scores[player_idx, role_idx]
+    order = np.argsort(-candidate_scores, kind='stable')
+
+    # Track the number of players selected for each role and which players are already taken
+    role_counts = np.zeros(len(roles), dtype=int)
+    selected_players = np.zeros(len(scores), dtype=bool)
+    squad_size = quotas.sum()
+    squad = []
+
+    for k in order:
+        player, role = player_idx[k], role_idx[k]
+
+        if selected_players[player] or role_counts[role] >= quotas[role]:
+            continue
+
+        # Assign player to the role
+        squad.append((role_scores.index[player], float(candidate_scores[k]), roles[role]))
+        selected_players[player] = True
+        role_counts[role] += 1
+
+        # Stop if the squad is full
+        if len(squad) == squad_size:
+            break
+
+    return squad_frame(squad)
+
+
+def optimal_squad(role_scores, positions, num_players_per_role, num_players_per_position=None):
+    """Generates the squad with the highest total score as an assignment problem.
+
+    Every role is expanded into one slot per player wanted, and the Hungarian method
+    (scipy's linear_sum_assignment) matches players to slots. When the role quotas of
+    a position add up to more than num_players_per_position allows, the surplus slots
+    are taken by placeholder rows that any slot of that position prefers, so the
+    solver also picks which roles give up a player. Pairs a player is not eligible
+    for are only used when nobody else is left and are dropped from the result.
+    """
+    roles = list(role_scores.columns)
+    scores = role_scores.to_numpy(dtype=float)
+    quotas = role_quotas(roles, num_players_per_role)
+    eligible = eligibility(roles, scores, positions, quotas)
+
+    # Only players eligible for a wanted role can be picked
+    candidates = np.flatnonzero(eligible.any(axis=1))
+    slot_roles = np.repeat(np.arange(len(roles)), quotas)
+    if not len(candidates) or not len(slot_roles):
+        return squad_frame([])
+
+    slot_scores = scores[np.ix_(candidates, slot_roles)]
+    slot_eligible = eligible[np.ix_(candidates, slot_roles)]
+
+    # A penalty larger than any possible total keeps ineligible pairs and unused placeholders out
+    penalty = len(slot_roles) * (np.nanmax(np.abs(slot_scores), initial=0.0) + 1) + 1
+    gains = np.where(slot_eligible, slot_scores, -penalty)
+
+    # Placeholder rows for the slots a position has to leave empty
+    placeholders = []
+    for position, position_roles in POSITION_ROLES.items():
+        cap = (num_players_per_position or {}).get(position)
+        in_position = np.isin(np.array(roles)[slot_roles], position_roles)
+        surplus = int(in_position.sum()) - cap if cap is not None else 0
+        if surplus > 0:
+            placeholders.extend([np.where(in_position, penalty, -penalty)] * surplus)
+    if placeholders:
+        gains = np.vstack([gains, np.array(placeholders)])
+
+    rows, slots = lazy_import('scipy.optimize').linear_sum_assignment(gains, maximize=True)
+
+    squad = []
+    for row, slot in zip(rows, slots):
+        if row < len(candidates) and slot_eligible[row, slot]:
+            player = candidates[row]
+            squad.append((role_scores.index[player], float(slot_scores[row, slot]), roles[slot_roles[slot]]))
+
+    # List the squad best first, like the greedy pass
+    squad.sort(key=lambda pick: -pick[1])
+    return squad_frame(squad)
+
+
+# Squad selection methods offered in the app
+SQUAD_METHODS = {
+    "Optimal": optimal_squad,
+    "Greedy": generate_squad
+}
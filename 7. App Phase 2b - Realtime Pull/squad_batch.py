@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from squad import POSITION_ROLES, optimal_squad
+
+# Example configurations: one row per configuration, a column per role quota and optional position caps
+SQUAD_CONFIGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'squad_configs.csv')
+
+CONFIG_NAME_COLUMN = 'Configuration'
+
+# Score matrix shared by every configuration solved in a worker process, set once per worker.
+# Only pool workers use it: in-process solves get the matrix as arguments, so concurrent
+# Streamlit sessions never see each other's scores
+_shared = {}
+
+
+def load_squad_configs(path_or_buffer=SQUAD_CONFIGS_PATH):
+    """Reads a CSV of quota configurations into {name: (num_players_per_role, num_players_per_position)}.
+
+    Role columns are the role quotas; Goalkeeper/Defender/Midfielder/Attacker columns
+    are optional position caps. Empty cells mean 0 for roles and no cap for positions.
+    """
+    configs_df = pd.read_csv(path_or_buffer)
+    if CONFIG_NAME_COLUMN not in configs_df.columns:
+        raise ValueError(f"Squad configuration file needs a '{CONFIG_NAME_COLUMN}' column")
+
+    roles = [role for position_roles in POSITION_ROLES.values() for role in position_roles]
+    unknown = [column for column in configs_df.columns
+               if column != CONFIG_NAME_COLUMN and column not in roles and column not in POSITION_ROLES]
+    if unknown:
+        raise ValueError(f"Unknown columns in squad configuration file: {', '.join(unknown)}")
+
+    configs = {}
+    for _, row in configs_df.iterrows():
+        num_players_per_role = {role: int(row[role]) for role in roles if role in row and pd.notna(row[role])}
+        num_players_per_position = {position: int(row[position]) for position in POSITION_ROLES
+                                    if position in row and pd.notna(row[position])}
+        configs[str(row[CONFIG_NAME_COLUMN])] = (num_players_per_role, num_players_per_position)
+    return configs
+
+
+def _init_worker(role_scores, positions):
+    _shared['role_scores'] = role_scores
+    _shared['positions'] = positions
+
+
+def _solve(method, quotas):
+    num_players_per_role, num_players_per_position = quotas
+    return method(_shared['role_scores'], _shared['positions'], num_players_per_role, num_players_per_position)
+
+
+def solve_configs(role_scores, positions, configs, method=optimal_squad, max_workers=1):
+    """Solves every configuration and returns {name: squad}.
+
+    By default the configurations are solved in this process: each takes milliseconds,
+    less than starting a worker, and the app never forks its Streamlit server. Batches
+    from the command line can pass max_workers > 1 (or None for one per CPU) to use
+    spawned worker processes; the score matrix is handed to each worker once, when it
+    starts, and every configuration after that only sends its quotas.
+    """
+    names = list(configs)
+    if max_workers == 1 or len(names) <= 1:
+        return {name: method(role_scores, positions, *configs[name]) for name in names}
+
+    # Spawned rather than forked, so workers never copy the threads of the calling process
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(role_scores, positions)) as executor:
+        squads = executor.map(_solve, [method] * len(names), [configs[name] for name in names])
+        return dict(zip(names, squads))
+
+
+def compare_squads(squads, configs):
+    """Returns the comparison table of a batch: total score, size and per-role coverage of each squad.
+
+    Coverage is the share of a role's quota that could be filled (blank when the role was not asked for).
+    """
+    rows = []
+    for name, squad in squads.items():
+        num_players_per_role = configs[name][0]
+        filled = squad['Role'].value_counts() if not squad.empty else pd.Series(dtype=int)
+
+        row = {
+            CONFIG_NAME_COLUMN: name,
+            'Total Score': squad['Score'].sum() if not squad.empty else 0.0,
+            'Players': len(squad),
+            'Wanted': sum(num_players_per_role.values())
+        }
+        for role, quota in num_players_per_role.items():
+            row[f'Coverage {role}'] = filled.get(role, 0) / quota if quota else None
+        rows.append(row)
+
+    return pd.DataFrame(rows).set_index(CONFIG_NAME_COLUMN)
+
+
+def squad_overlap(squads):
+    """Returns a configuration x configuration table of how many players two squads share."""
+    players = {name: set(squad['Player Name']) if not squad.empty else set() for name, squad in squads.items()}
+    names = list(players)
+    return pd.DataFrame([[len(players[a] & players[b]) for b in names] for a in names], index=names, columns=names)
+
+
+def batch_squads(role_scores, positions, configs, method=optimal_squad, max_workers=1):
+    """Runs a what-if batch from one score matrix and returns (comparison, overlap, squads)."""
+    squads = solve_configs(role_scores, positions, configs, method, max_workers)
+    return compare_squads(squads, configs), squad_overlap(squads), squads
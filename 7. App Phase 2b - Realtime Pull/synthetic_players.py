@@ -0,0 +1,134 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from schema import STAT_COLUMNS
+
+# Pool sizes the benchmarks run at
+BENCHMARK_SIZES = [1000, 10000, 100000, 1000000]
+
+# Position and nationality mix of players_raw.csv (182 players, 63% SIN)
+POSITION_SHARES = {'G': 0.10, 'D': 0.36, 'M': 0.39, 'F': 0.15}
+NATIONALITIES = ['SIN', 'JPN', 'BRU', 'SRB', 'THA', 'CRO', 'MNE', 'BIH', 'AUS', 'KOR']
+NATIONALITY_SHARES = [0.63, 0.14, 0.06, 0.03, 0.03, 0.03, 0.02, 0.02, 0.02, 0.02]
+FOOT_SHARES = {'Right': 0.67, 'Left': 0.13, 'Both': 0.03, '': 0.17}
+
+# Mean per-game value of each stat by position (G, D, M, F), roughly as in players_raw.csv.
+# For the percentage stats this is the count shown before the percentage
+STAT_MEANS = {
+    'Goals per game': (0.0, 0.05, 0.12, 0.35),
+    'Assists': (0.1, 0.8, 1.5, 1.5),
+    'Accurate per game': (14.0, 30.0, 25.0, 10.0),
+    'Acc. long balls': (4.0, 2.5, 1.5, 0.3),
+    'Acc. crosses': (0.0, 0.4, 0.6, 0.4),
+    'Interceptions per game': (0.1, 1.6, 1.0, 0.3),
+    'Balls recovered per game': (2.0, 5.0, 4.0, 2.0),
+    'Dribbled past per game': (0.0, 0.9, 0.9, 0.4),
+    'Clearances per game': (0.6, 2.5, 0.6, 0.3),
+    'Succ. dribbles': (0.0, 0.4, 0.9, 1.0),
+    'Total duels won': (0.5, 4.5, 4.0, 4.0),
+    'Aerial duels won': (0.3, 1.5, 0.6, 1.0),
+    'Clean sheets': (3.0, 2.0, 0.0, 0.0),
+    'Saves per game': (2.5, 0.0, 0.0, 0.0)
+}
+
+# Mean success rate of the percentage stats by position (G, D, M, F)
+STAT_RATES = {
+    'Accurate per game': (0.70, 0.82, 0.80, 0.70),
+    'Acc. long balls': (0.40, 0.45, 0.45, 0.30),
+    'Acc. crosses': (0.0, 0.25, 0.28, 0.25),
+    'Succ. dribbles': (0.0, 0.70, 0.60, 0.50),
+    'Total duels won': (0.70, 0.50, 0.45, 0.38),
+    'Aerial duels won': (0.70, 0.55, 0.40, 0.38),
+    'Saves per game': (0.68, 0.0, 0.0, 0.0)
+}
+
+# Stats only recorded for some positions; the rest of the players leave them blank like SofaScore
+STAT_POSITIONS = {
+    'Clean sheets': ('G', 'D'),
+    'Saves per game': ('G',)
+}
+
+# Other columns of a real scrape that the pipeline does not read
+EXTRA_STAT_LABELS = ['Total played', 'Started', 'Minutes per game', 'Goals', 'Shots per game', 'Key passes',
+                     'Fouls', 'Was fouled', 'Yellow', 'Red cards']
+
+
+def format_number(values, decimals=1):
+    """Formats floats like SofaScore ("0.9"); NaN becomes a blank cell."""
+    text = pd.Series(np.round(values, decimals)).map(f'{{:.{decimals}f}}'.format)
+    return text.where(~np.isnan(values), '')
+
+
+def format_percentage(counts, rates):
+    """Formats counts and success rates like SofaScore ("12.8 (80%)"); NaN becomes a blank cell."""
+    percentages = pd.Series(np.round(rates * 100)).map('{:.0f}'.format)
+    text = format_number(counts) + ' (' + percentages + '%)'
+    return text.where(~np.isnan(counts), '')
+
+
+def generate_players(num_players, seed=0, date_columns=8):
+    """Returns a raw players frame shaped like a SofaScore scrape, with random but plausible stats.
+
+    Has every schema label in the scrape's text formats, the scrape's other stat columns
+    and date_columns mostly empty date-of-birth columns, like players_raw.csv.
+    """
+    rng = np.random.default_rng(seed)
+
+    positions = rng.choice(list(POSITION_SHARES), size=num_players, p=list(POSITION_SHARES.values()))
+    position_index = pd.Categorical(positions, categories=list(POSITION_SHARES)).codes
+
+    # Players differ in how much they play, which scales all their per-game stats together
+    involvement = rng.gamma(4.0, 0.25, size=num_players)
+
+    columns = {'Player Name': [f'synthetic player {i}' for i in range(num_players)]}
+    for label in EXTRA_STAT_LABELS:
+        columns[label] = format_number(rng.gamma(2.0, 1.0, size=num_players))
+
+    for column in STAT_COLUMNS:
+        means = np.array(STAT_MEANS[column.label])[position_index]
+        counts = rng.gamma(2.0, 0.5, size=num_players) * means * involvement
+        if column.label in ('Assists', 'Clean sheets'):
+            counts = np.floor(counts)
+
+        recorded = np.isin(positions, STAT_POSITIONS.get(column.label, list(POSITION_SHARES)))
+        counts = np.where(recorded, counts, np.nan)
+
+        if column.parse == 'percentage':
+            rates = np.clip(rng.normal(np.array(STAT_RATES[column.label])[position_index], 0.12), 0.0, 1.0)
+            # Players who never attempted something show "0.0 (0%)"
+            rates = np.where(np.round(counts, 1) > 0, rates, 0.0)
+            columns[column.label] = format_percentage(counts, rates)
+        else:
+            columns[column.label] = format_number(counts, 0 if column.label in ('Assists', 'Clean sheets') else 1)
+
+    columns['NATIONALITY'] = rng.choice(NATIONALITIES, size=num_players, p=NATIONALITY_SHARES)
+    heights = rng.normal(176, 6, size=num_players).round()
+    columns['HEIGHT'] = pd.Series(heights).map('{:.0f} cm'.format).where(rng.random(num_players) > 0.1, '')
+    columns['PREFERRED FOOT'] = rng.choice(list(FOOT_SHARES), size=num_players, p=list(FOOT_SHARES.values()))
+    columns['SHIRT NUMBER'] = pd.Series(rng.integers(1, 100, size=num_players)).astype(str).where(
+        rng.random(num_players) > 0.03, '')
+    columns['POSITION'] = positions
+
+    # The scrape turns a player's date of birth into a header over their age ("23 yrs"),
+    # leaving a column with a single value
+    for _ in range(date_columns):
+        age = int(rng.integers(17, 38))
+        birth_date = pd.Timestamp('2024-06-01') - pd.Timedelta(days=int(age * 365.25 + rng.integers(0, 365)))
+        ages = np.full(num_players, '', dtype=object)
+        ages[rng.integers(0, num_players)] = f'{age} yrs'
+        columns[f'{birth_date.day} {birth_date.strftime("%b %Y").upper()}'] = ages
+
+    players_df = pd.DataFrame(columns)
+    return players_df.replace('', np.nan)
+
+
+if __name__ == '__main__':
+    # Usage: python synthetic_players.py <num_players> <output.csv> [seed]
+    num_players, output_path = int(sys.argv[1]), sys.argv[2]
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    players_df = generate_players(num_players, seed)
+    players_df.to_csv(output_path, index=False)
+    print(f"Wrote {len(players_df)} synthetic players to {output_path}")
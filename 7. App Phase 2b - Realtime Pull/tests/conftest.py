@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The app's modules live one folder up and are imported by name, like the app does
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
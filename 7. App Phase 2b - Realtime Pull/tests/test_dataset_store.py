@@ -0,0 +1,45 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+pytest.importorskip('scipy')
+
+from conftest import APP_DIR
+from dataset_store import load_stage, save_stage
+from schema import ROLES
+from squad import DEFAULT_NUM_PLAYERS_PER_POSITION, DEFAULT_NUM_PLAYERS_PER_ROLE, optimal_squad
+from squad_batch import batch_squads, load_squad_configs
+
+
+@pytest.fixture(scope='module')
+def players_df_sin_reco():
+    return pd.read_csv(os.path.join(APP_DIR, 'players_df_sin_reco.csv'))
+
+
+def round_trip(frame, tmp_path, name):
+    save_stage(frame, 'squads', name, root=str(tmp_path))
+    return load_stage('squads', name, root=str(tmp_path))
+
+
+def test_squad_round_trip(players_df_sin_reco, tmp_path):
+    squad = optimal_squad(players_df_sin_reco[ROLES], players_df_sin_reco['POSITION'],
+                          DEFAULT_NUM_PLAYERS_PER_ROLE, DEFAULT_NUM_PLAYERS_PER_POSITION)
+
+    loaded = round_trip(squad, tmp_path, 'squad')
+
+    assert not squad.empty
+    pd.testing.assert_frame_equal(loaded, squad, check_dtype=False)
+
+    # A frame read back (with str columns under pandas 2 and later) can be stored again
+    pd.testing.assert_frame_equal(round_trip(loaded, tmp_path, 'squad_again'), loaded)
+
+
+def test_batch_tables_round_trip(players_df_sin_reco, tmp_path):
+    comparison, overlap, _ = batch_squads(players_df_sin_reco[ROLES], players_df_sin_reco['POSITION'].to_numpy(),
+                                          load_squad_configs(), max_workers=1)
+
+    for name, table in [('comparison', comparison), ('overlap', overlap)]:
+        table = table.reset_index()
+        pd.testing.assert_frame_equal(round_trip(table, tmp_path, name), table, check_dtype=False)
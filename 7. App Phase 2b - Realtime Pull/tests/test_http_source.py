@@ -0,0 +1,170 @@
+import asyncio
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('aiohttp')
+pytest.importorskip('bs4')
+
+from conftest import FIXTURES_DIR
+from http_source import (FetchError, HttpSource, ResponseCache, SavedPageHandler, fetch_players_df,
+                         start_stand_in_server)
+from page_parser import parse_player_page
+
+SAVED_PAGES = os.path.join(FIXTURES_DIR, 'saved_pages')
+LEAGUE_PATH = '/tournament/football/singapore/premier-league/634'
+
+# Player pages in squad order, as listed by the saved team pages
+PLAYER_PATHS = ['/player/boris-kopitovic/100001', '/player/faris-ramli/100002', '/player/syazwan-buhari/100003',
+                '/player/old-timer/100004']
+
+
+class FlakyHandler(SavedPageHandler):
+    """Answers each path with its queued error statuses first, then with the saved page."""
+
+    # path -> statuses still to return, e.g. [503, 429]
+    failures = {}
+    # path -> requests received
+    requests = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.requests[self.path] = self.requests.get(self.path, 0) + 1
+            statuses = self.failures.get(self.path)
+            status = statuses.pop(0) if statuses else None
+
+        if status is None:
+            return super().do_GET()
+
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture
+def flaky_server():
+    FlakyHandler.failures, FlakyHandler.requests = {}, {}
+    server, base_url = start_stand_in_server(SAVED_PAGES, handler=FlakyHandler)
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(base_url, cache=None, max_retries=3):
+    async def run():
+        async with HttpSource(max_concurrency=4, max_retries=max_retries, backoff=0.01, cache=cache) as source:
+            players_df = await source.fetch_players(base_url + LEAGUE_PATH)
+            return players_df, source.stats
+    return asyncio.run(run())
+
+
+def expected_players_df(base_url):
+    """The players_df scrape_player_data builds from the same pages: one parsed row per kept player, in URL order."""
+    players_list = []
+    for path in PLAYER_PATHS:
+        with open(os.path.join(SAVED_PAGES, path.lstrip('/')), encoding='utf-8') as f:
+            player_dict = parse_player_page(f.read(), base_url + path)
+        if player_dict is not None:
+            players_list.append(player_dict)
+    return pd.DataFrame(players_list)
+
+
+def test_fetch_players_matches_scrape_layout(flaky_server):
+    players_df, stats = fetch_players_df(flaky_server + LEAGUE_PATH, cache=ResponseCache())
+
+    expected = expected_players_df(flaky_server)
+    assert list(players_df.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(players_df, expected)
+    assert list(players_df['Player Name']) == ['boris kopitovic', 'faris ramli', 'syazwan buhari']
+    assert stats['errors'] == 0
+
+
+def test_retries_server_errors_and_rate_limits(flaky_server):
+    FlakyHandler.failures = {LEAGUE_PATH: [503, 429], PLAYER_PATHS[0]: [500]}
+
+    players_df, stats = fetch(flaky_server, cache=ResponseCache())
+
+    assert len(players_df) == 3
+    assert stats['retries'] == 3
+    assert FlakyHandler.requests[LEAGUE_PATH] == 3
+    assert FlakyHandler.requests[PLAYER_PATHS[0]] == 2
+
+
+def test_gives_up_after_the_retries(flaky_server):
+    FlakyHandler.failures = {PLAYER_PATHS[1]: [503] * 3}
+
+    players_df, stats = fetch(flaky_server, cache=ResponseCache(), max_retries=2)
+
+    assert list(players_df['Player Name']) == ['boris kopitovic', 'syazwan buhari']
+    assert stats['errors'] == 1
+    assert FlakyHandler.requests[PLAYER_PATHS[1]] == 3
+
+
+def test_client_errors_are_not_retried(flaky_server):
+    FlakyHandler.failures = {LEAGUE_PATH: [404]}
+
+    with pytest.raises(FetchError):
+        fetch(flaky_server, cache=ResponseCache())
+    assert FlakyHandler.requests[LEAGUE_PATH] == 1
+
+
+def test_cached_pages_are_not_fetched_again(flaky_server, tmp_path):
+    cache = ResponseCache(directory=str(tmp_path))
+    first, first_stats = fetch(flaky_server, cache=cache)
+    second, second_stats = fetch(flaky_server, cache=cache)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert second_stats['requests'] == 0
+    assert second_stats['cache_hits'] == first_stats['pages']
+
+    # The disk copy serves a new process's cache too
+    third, third_stats = fetch(flaky_server, cache=ResponseCache(directory=str(tmp_path)))
+    pd.testing.assert_frame_equal(first, third)
+    assert third_stats['requests'] == 0
+
+
+def test_stale_pages_are_fetched_again(flaky_server):
+    cache = ResponseCache(ttl=-1)
+    fetch(flaky_server, cache=cache)
+    _, stats = fetch(flaky_server, cache=cache)
+
+    assert stats['cache_hits'] == 0
+    assert FlakyHandler.requests[LEAGUE_PATH] == 2
+
+
+def test_background_fetch_runs_on_the_scrape_runner(flaky_server):
+    background_scrape = pytest.importorskip('background_scrape')
+    runner = background_scrape.ScrapeRunner()
+
+    scrape = runner.submit(max_workers=4, league_url=flaky_server + LEAGUE_PATH, http_cache=ResponseCache())
+    scrape.future.result(timeout=30)
+
+    assert scrape.status == 'finished'
+    pd.testing.assert_frame_equal(scrape.result, expected_players_df(flaky_server))
+    assert (scrape.teams_done, scrape.teams_total) == (2, 2)
+    assert (scrape.players_done, scrape.players_total) == (4, 4)
+    assert scrape.stats['errors'] == scrape.errors == 0
+
+
+def test_cancelled_fetch_skips_the_remaining_pages(flaky_server):
+    background_scrape = pytest.importorskip('background_scrape')
+    scrape = background_scrape.BackgroundScrape(max_workers=4, league_url=flaky_server + LEAGUE_PATH,
+                                                http_cache=ResponseCache())
+
+    # Cancel once the team pages are in, before any player page is requested
+    def on_team_progress(done, total):
+        if done == total:
+            scrape.cancel()
+    scrape._on_team_progress = on_team_progress
+
+    players_df = scrape.run()
+
+    assert players_df.empty
+    assert scrape.errors == 0
+    assert scrape.message.startswith("Cancelled")
+    assert not any(path in FlakyHandler.requests for path in PLAYER_PATHS)
@@ -0,0 +1,77 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sklearn = pytest.importorskip('sklearn')
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from conftest import APP_DIR
+from model_export import ExportedModel, export_model, load_exported_model, save_exported_model
+
+FEATURES = ['Goals per game', 'Assists', 'Interceptions per game']
+
+
+class IncludeWrapper:
+    """Stands in for pycaret's TransformerWrapper: a fitted transformer applied to the include columns."""
+
+    def __init__(self, transformer, include):
+        self.transformer = transformer
+        self.include = include
+
+    def fit(self, X, y=None):
+        self.transformer.fit(X[self.include])
+        return self
+
+    def transform(self, X):
+        X = X.copy()
+        X[self.include] = self.transformer.transform(X[self.include])
+        return X
+
+
+def make_data(rows=60, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.random((rows, len(FEATURES))), columns=FEATURES)
+    data.iloc[::7, 1] = np.nan
+    labels = (data['Goals per game'] + data['Interceptions per game'] > 1).astype(int)
+    return data, labels
+
+
+def make_pipeline():
+    data, labels = make_data()
+    pipeline = Pipeline([
+        ('numerical_imputer', IncludeWrapper(SimpleImputer(strategy='mean'), FEATURES)),
+        ('actual_estimator', LogisticRegression())
+    ])
+    return pipeline.fit(data, labels)
+
+
+def test_export_round_trip_matches_pipeline(tmp_path):
+    pipeline = make_pipeline()
+    exported = export_model('Goal Poacher', pipeline, source='0' * 64)
+    path = save_exported_model(exported, export_dir=str(tmp_path))
+
+    loaded = load_exported_model(path)
+    data, _ = make_data(seed=1)
+    actual = loaded.predict(data)
+    proba = pipeline.predict_proba(data)
+
+    np.testing.assert_array_equal(actual['prediction_label'].to_numpy(), pipeline.predict(data))
+    np.testing.assert_array_equal(actual['prediction_score'].to_numpy(),
+                                  np.round(proba.max(axis=1), 4))
+
+
+def test_export_pickles_the_importable_class(tmp_path):
+    path = save_exported_model(export_model('Goal Poacher', make_pipeline(), source='1' * 64),
+                               export_dir=str(tmp_path))
+
+    # Loading in a fresh interpreter only works if the class was pickled under model_export
+    code = (f"import sys; sys.path.insert(0, {APP_DIR!r}); import joblib; "
+            f"print(type(joblib.load({path!r})).__module__)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'model_export'
+    assert isinstance(load_exported_model(path), ExportedModel)
@@ -0,0 +1,76 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('bs4')
+
+from conftest import APP_DIR, FIXTURES_DIR
+from page_parser import (AGE_LABEL, BIRTH_DATE_LABEL, BIRTH_DATE_PATTERN, parse_player_page, parse_squad_urls,
+                         parse_stat_box, parse_team_urls)
+
+SAVED_PAGES = os.path.join(FIXTURES_DIR, 'saved_pages')
+SITE_URL = 'https://www.sofascore.com'
+
+PLAYER_PATHS = {
+    'boris kopitovic': '/player/boris-kopitovic/100001',
+    'faris ramli': '/player/faris-ramli/100002',
+    'syazwan buhari': '/player/syazwan-buhari/100003'
+}
+
+
+def read_page(path):
+    with open(os.path.join(SAVED_PAGES, path.lstrip('/')), encoding='utf-8') as f:
+        return f.read()
+
+
+def selenium_row(player_name):
+    """Returns the player's row of players_raw.csv, the output of the Selenium lines[0]/lines[1] scrape."""
+    players_raw = pd.read_csv(os.path.join(APP_DIR, 'players_raw.csv'), dtype=str, keep_default_na=False)
+    row = players_raw[players_raw['Player Name'] == player_name].iloc[0]
+    return {label: value for label, value in row.items() if value}
+
+
+@pytest.mark.parametrize('player_name', list(PLAYER_PATHS))
+def test_player_page_matches_selenium_scrape(player_name):
+    parsed = parse_player_page(read_page(PLAYER_PATHS[player_name]), SITE_URL + PLAYER_PATHS[player_name])
+    expected = selenium_row(player_name)
+
+    # The Selenium scrape turned the date of birth into a column header over the age
+    birth_dates = [label for label in expected if BIRTH_DATE_PATTERN.match(label)]
+    assert len(birth_dates) == 1
+    assert parsed.pop(BIRTH_DATE_LABEL) == birth_dates[0]
+    assert parsed.pop(AGE_LABEL) == expected.pop(birth_dates[0])
+
+    assert parsed == expected
+
+
+def test_player_without_current_season_is_skipped():
+    assert parse_player_page(read_page('/player/old-timer/100004'), SITE_URL + '/player/old-timer/100004') is None
+
+
+def test_team_and_squad_links():
+    league_url = SITE_URL + '/tournament/football/singapore/premier-league/634'
+    team_urls = parse_team_urls(read_page('/tournament/football/singapore/premier-league/634'), league_url)
+    assert team_urls == [SITE_URL + '/team/football/tampines-rovers/200001',
+                         SITE_URL + '/team/football/geylang-international/200002']
+
+    squad_urls = parse_squad_urls(read_page('/team/football/tampines-rovers/200001'), team_urls[0])
+    assert squad_urls == [SITE_URL + PLAYER_PATHS['boris kopitovic'], SITE_URL + PLAYER_PATHS['faris ramli']]
+
+
+def test_stat_box_joins_split_values():
+    assert parse_stat_box(['Accurate per game', '12.8', '(80%)']) == {'Accurate per game': '12.8 (80%)'}
+    assert parse_stat_box(['27 APR 1995', '29 yrs']) == {BIRTH_DATE_LABEL: '27 APR 1995', AGE_LABEL: '29 yrs'}
+
+
+def test_unknown_label_ends_the_previous_value(caplog):
+    stats = parse_stat_box(['Goals', '3', 'Expected goals', '2.1', 'Assists', '1'])
+
+    assert stats == {'Goals': '3', 'Expected goals': '2.1', 'Assists': '1'}
+    assert "Unknown stat label 'Expected goals'" in caplog.text
+
+
+def test_box_without_known_label_is_logged(caplog):
+    assert parse_stat_box(['Matches']) == {}
+    assert "Unknown stat label 'Matches'" in caplog.text
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from player_history import PlayerHistory
+from schema import INFO_NAMES, STAT_NAMES
+
+ROLE = 'Target Man'
+TAKEN_AT = '2024-06-01T12:00:00'
+
+
+def players_df_sin_reco(score):
+    row = {name: None for name in INFO_NAMES + STAT_NAMES}
+    row.update({'Player Name': 'boris kopitovic', 'NATIONALITY': 'MNE', ROLE: score, f'Class_{ROLE}': 1})
+    return pd.DataFrame([row])
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = PlayerHistory(str(tmp_path / 'history.db'))
+    yield history
+    history.close()
+
+
+def test_risers_orders_same_second_snapshots_by_id(history):
+    for score in [40.0, 55.0, 70.0]:
+        history.record_snapshot(players_df_sin_reco(score), taken_at=TAKEN_AT)
+
+    risers = history.risers(ROLE, '2024-06-01')
+
+    assert risers[['first_score', 'last_score', 'change', 'snapshots']].iloc[0].tolist() == [40.0, 70.0, 30.0, 3]
+
+
+def test_player_form_keeps_the_last_same_second_snapshots(history):
+    snapshot_ids = [history.record_snapshot(players_df_sin_reco(score), taken_at=TAKEN_AT)
+                    for score in [40.0, 55.0, 70.0]]
+    pid = history.query('SELECT player_id FROM players')['player_id'][0]
+
+    form = history.player_form(pid, last=2)
+
+    assert len(set(snapshot_ids)) == 3
+    assert form['score'].tolist() == [55.0, 70.0]
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from types import SimpleNamespace
+from urllib.request import urlopen
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('selenium')
+pytest.importorskip('bs4')
+
+from conftest import FIXTURES_DIR
+from http_source import start_stand_in_server
+from page_parser import make_soup
+from scraper import (HostRateLimiter, ScrapeCancelled, iter_player_data_parallel, scrape_player_data,
+                     scrape_player_data_parallel, worker_rate_limiter)
+
+SAVED_PAGES = os.path.join(FIXTURES_DIR, 'saved_pages')
+
+PLAYER_PATHS = ['/player/boris-kopitovic/100001', '/player/faris-ramli/100002', '/player/syazwan-buhari/100003',
+                '/player/old-timer/100004']
+
+
+class FakeDriver:
+    """Stands in for a WebDriver: loads pages from the stand-in server and answers CSS lookups from their HTML."""
+
+    # Every driver created, and the (time, url) of every page load across them
+    drivers = []
+    loads = []
+    lock = threading.Lock()
+
+    def __init__(self, on_get=None):
+        self.on_get = on_get
+        self.page_source = ''
+        self.quit_called = False
+        with self.lock:
+            self.drivers.append(self)
+
+    def get(self, url):
+        with self.lock:
+            self.loads.append((time.monotonic(), url))
+        with urlopen(url) as response:
+            self.page_source = response.read().decode('utf-8')
+        if self.on_get is not None:
+            self.on_get()
+
+    def find_elements(self, by, selector):
+        return [SimpleNamespace(text=element.get_text(strip=True))
+                for element in make_soup(self.page_source).select(selector)]
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def player_urls():
+    FakeDriver.drivers, FakeDriver.loads = [], []
+    server, base_url = start_stand_in_server(SAVED_PAGES)
+    yield [base_url + path for path in PLAYER_PATHS]
+    server.shutdown()
+    server.server_close()
+
+
+def no_wait():
+    return HostRateLimiter(min_interval=0, jitter=0)
+
+
+def test_parallel_scrape_matches_the_sequential_scrape(player_urls):
+    # Reversed and repeated, so the shards finish out of order
+    urls = player_urls[::-1] * 2
+
+    sequential = scrape_player_data(urls, FakeDriver, limiter=no_wait())
+    parallel = scrape_player_data_parallel(urls, max_workers=3, limiter=no_wait(), driver_factory=FakeDriver)
+
+    pd.testing.assert_frame_equal(parallel, sequential)
+    assert list(parallel['Player Name']) == ['syazwan buhari', 'faris ramli', 'boris kopitovic'] * 2
+    assert len(FakeDriver.drivers) == 4
+    assert all(driver.quit_called for driver in FakeDriver.drivers)
+
+
+def test_parallel_scrape_reports_every_url_once(player_urls):
+    results = list(iter_player_data_parallel(player_urls, max_workers=2, limiter=no_wait(),
+                                             driver_factory=FakeDriver))
+
+    assert sorted((index, url) for index, url, _, _, _ in results) == list(enumerate(player_urls))
+    assert all(error is None for _, _, _, error, _ in results)
+
+
+def test_cancelled_pages_come_back_as_scrape_cancelled(player_urls):
+    urls = player_urls * 2
+    cancel_event = threading.Event()
+
+    results = list(iter_player_data_parallel(urls, max_workers=2, limiter=no_wait(),
+                                             driver_factory=lambda: FakeDriver(on_get=cancel_event.set),
+                                             cancel_event=cancel_event))
+
+    cancelled = [url for _, url, _, error, _ in results if isinstance(error, ScrapeCancelled)]
+    assert sorted(index for index, _, _, _, _ in results) == list(range(len(urls)))
+    # Each worker finishes at most the page it was loading when the scrape was cancelled
+    assert len(cancelled) >= len(urls) - 2
+    assert len(FakeDriver.loads) == len(urls) - len(cancelled)
+    assert all(driver.quit_called for driver in FakeDriver.drivers)
+
+
+def test_worker_rate_limiter_paces_the_host(player_urls):
+    page_interval = 0.2
+    limiter = worker_rate_limiter(4, page_interval)
+
+    list(iter_player_data_parallel(player_urls * 2, max_workers=4, limiter=limiter, driver_factory=FakeDriver))
+
+    # Four workers share the host: one page every page_interval / 4, give or take thread wake-up times
+    starts = sorted(start for start, _ in FakeDriver.loads)
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert len(starts) == 8
+    assert min(gaps) >= 0.8 * page_interval / 4
+    assert starts[-1] - starts[0] >= 7 * page_interval / 4
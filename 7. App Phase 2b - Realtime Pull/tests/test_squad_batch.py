@@ -0,0 +1,30 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('scipy')
+
+import squad_batch
+from conftest import APP_DIR
+from schema import ROLES
+from squad_batch import load_squad_configs, solve_configs
+
+
+@pytest.fixture(scope='module')
+def players_df_sin_reco():
+    return pd.read_csv(os.path.join(APP_DIR, 'players_df_sin_reco.csv'))
+
+
+def test_spawned_workers_solve_the_same_squads(players_df_sin_reco):
+    role_scores, positions = players_df_sin_reco[ROLES], players_df_sin_reco['POSITION'].to_numpy()
+    configs = load_squad_configs()
+
+    in_process = solve_configs(role_scores, positions, configs)
+    pooled = solve_configs(role_scores, positions, configs, max_workers=2)
+
+    # Solved in this process by default, without touching the worker globals
+    assert squad_batch._shared == {}
+    assert list(pooled) == list(in_process) == list(configs)
+    for name in configs:
+        pd.testing.assert_frame_equal(pooled[name], in_process[name])
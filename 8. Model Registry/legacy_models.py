@@ -0,0 +1,21 @@
+import os
+
+import streamlit as st
+from pycaret.classification import load_model
+
+from model_store import LEGACY_TRACK, ModelStore
+
+# The phase 1a, 1b and 2a apps load their role models through here
+model_store = ModelStore()
+
+
+# Cache each model once per server process; stored files are named by their content hash,
+# so registering a new version changes the cache key without restarting the server
+@st.cache_resource
+def load_cached_model(model_path):
+    return load_model(model_path)
+
+
+def load_role_model(role):
+    """Loads the current legacy model for a role from the model store."""
+    return load_cached_model(os.path.splitext(model_store.path(role, LEGACY_TRACK))[0])
@@ -0,0 +1,315 @@
+import hashlib
+import io
+import json
+import os
+import pickletools
+import re
+import shutil
+import sys
+import threading
+import time
+
+# This folder: manifest.json plus the content-addressed objects/ folder
+STORE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(STORE_DIR)
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Model lines kept side by side: the original model_y* models used by the phase 1a-2a
+# apps, and the model_Class_* models trained on the scraped SofaScore stats
+LEGACY_TRACK = 'legacy'
+FINAL_TRACK = 'final'
+
+ROLES = [
+    'Traditional Keeper',
+    'Sweeper Keeper',
+    'Ball-Playing Defender',
+    'No-Nonsense Defender',
+    'Full-Back',
+    'All-Action Midfielder',
+    'Midfield Playmaker',
+    'Traditional Winger',
+    'Inverted Winger',
+    'Goal Poacher',
+    'Target Man'
+]
+
+# File name stems of the legacy models, in role order (model_y1_tradkeeper ... model_y11_targetman)
+LEGACY_MODEL_NAMES = [
+    'model_y1_tradkeeper',
+    'model_y2_sweeperkeeper',
+    'model_y3_ballplayingdefender',
+    'model_y4_nononsensedefender',
+    'model_y5_fullback',
+    'model_y6_allactionmidfielder',
+    'model_y7_midfieldplaymaker',
+    'model_y8_traditionalwinger',
+    'model_y9_invertedwinger',
+    'model_y10_goalpoacher',
+    'model_y11_targetman'
+]
+
+METRIC_NAMES = ['train_accuracy', 'test_accuracy', 'train_f1', 'test_f1', 'TT']
+
+# Target columns (y1_tradkeeper, Class_Full-Back) that are not model features
+TARGET_PATTERN = re.compile(r'^(y\d+_|Class_)')
+
+
+def role_key(name):
+    """Normalizes a role name, so "Class_Ball Playing Defender" and "Ball-Playing Defender" match."""
+    name = re.sub(r'^(model_)?Class_', '', name)
+    return re.sub(r'[^a-z]', '', name.lower())
+
+
+ROLE_BY_KEY = {role_key(role): role for role in ROLES}
+
+
+def file_hash(path):
+    """Returns the sha256 hex digest of a file, which is also its address in the store."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pickled_feature_names(path):
+    """Reads a pycaret pipeline's feature_names_in_ straight from the pickle stream, without unpickling it.
+
+    joblib stores the array as a wrapper whose shape gives the number of names, then two
+    '|' byte-order markers, then the names. Returns None if the file has another layout.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    found, previous, count, markers, names = False, None, None, 0, []
+    try:
+        for opcode, arg, _ in pickletools.genops(io.BytesIO(data)):
+            is_string = 'UNICODE' in opcode.name
+            if not found:
+                found = is_string and arg == 'feature_names_in_'
+                continue
+
+            if is_string:
+                if markers >= 2:
+                    names.append(arg)
+                    if len(names) == count:
+                        # pycaret also records the target column(s) it was set up with
+                        return [name for name in names if not TARGET_PATTERN.match(name)]
+                elif arg == '|':
+                    markers += 1
+                previous = arg
+            elif opcode.name.startswith('BININT') and previous == 'shape' and count is None:
+                count = arg
+    except ValueError:
+        return None
+    return None
+
+
+def readme_metrics(readme_path=os.path.join(REPO_DIR, 'README.md')):
+    """Returns {role: {metric: value}} from the per-target results table in README.md."""
+    metrics = {}
+    if not os.path.exists(readme_path):
+        return metrics
+
+    with open(readme_path, encoding='utf-8') as f:
+        for line in f:
+            cells = [cell.strip() for cell in line.strip().strip('|').split('|')]
+            if len(cells) == len(METRIC_NAMES) + 1 and cells[0].startswith('Class_'):
+                role = ROLE_BY_KEY.get(role_key(cells[0]))
+                if role is not None:
+                    metrics[role] = dict(zip(METRIC_NAMES, (float(value) for value in cells[1:])))
+    return metrics
+
+
+class ModelStore:
+    """Versioned registry of role models, with every model file stored once under its sha256.
+
+    The manifest lists one entry per (track, role, version) with the file's hash, the
+    feature schema, metrics and where it came from, plus the current version of every
+    role in each track. Identical files registered from several folders share one object.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self.manifest = {"manifest_version": MANIFEST_VERSION, "models": [], "current": {}}
+        self.load()
+
+    def load(self):
+        self._loaded_mtime = None
+        if os.path.exists(self.manifest_path):
+            self._loaded_mtime = os.stat(self.manifest_path).st_mtime_ns
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+            if self.manifest.get("manifest_version") != MANIFEST_VERSION:
+                raise ValueError(f"{self.manifest_path} has an unsupported manifest version")
+
+    def refresh(self):
+        """Reloads the manifest if another process changed it, e.g. to make a new version current."""
+        if os.path.exists(self.manifest_path) and os.stat(self.manifest_path).st_mtime_ns != self._loaded_mtime:
+            with self._lock:
+                self.load()
+
+    def save(self):
+        """Writes the manifest to a temporary file first so a crash never leaves it half written."""
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        self._loaded_mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    def object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest + '.pkl')
+
+    def versions(self, role, track=FINAL_TRACK):
+        """Returns the manifest entries of a role in a track, oldest version first."""
+        entries = [entry for entry in self.manifest["models"] if entry["role"] == role and entry["track"] == track]
+        return sorted(entries, key=lambda entry: entry["version"])
+
+    def roles(self, track=FINAL_TRACK):
+        return [role for role in ROLES if role in self.manifest["current"].get(track, {})]
+
+    def resolve(self, role, track=FINAL_TRACK, version=None):
+        """Returns the manifest entry of a role's current model in a track, or of the given version."""
+        if version is None:
+            version = self.manifest["current"].get(track, {}).get(role)
+            if version is None:
+                raise KeyError(f"No current '{track}' model registered for '{role}'")
+
+        for entry in self.versions(role, track):
+            if entry["version"] == version:
+                return entry
+        raise KeyError(f"'{role}' has no '{track}' model version {version}")
+
+    def path(self, role, track=FINAL_TRACK, version=None):
+        """Returns the file of a role's current (or given) model version."""
+        return self.object_path(self.resolve(role, track, version)["sha256"])
+
+    def set_current(self, role, track, version):
+        self.resolve(role, track, version)
+        self.manifest["current"].setdefault(track, {})[role] = version
+
+    def register(self, path, role, track=FINAL_TRACK, feature_schema=None, metrics=None, make_current=True):
+        """Adds a model file to the store and returns its manifest entry.
+
+        The file is copied to objects/ under its hash unless an identical file is already
+        stored. Registering a file that is already a version of the role only records the
+        extra source path and leaves the current version alone, so registering a folder
+        again changes nothing. Call save() to write the manifest.
+        """
+        digest = file_hash(path)
+        source = os.path.relpath(os.path.abspath(path), REPO_DIR).replace(os.sep, '/')
+
+        with self._lock:
+            object_path = self.object_path(digest)
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                shutil.copyfile(path, object_path + '.tmp')
+                os.replace(object_path + '.tmp', object_path)
+
+            existing = [entry for entry in self.versions(role, track) if entry["sha256"] == digest]
+            if existing:
+                entry = existing[0]
+                if source not in entry["sources"]:
+                    entry["sources"].append(source)
+            else:
+                versions = self.versions(role, track)
+                entry = {
+                    "role": role,
+                    "track": track,
+                    "version": versions[-1]["version"] + 1 if versions else 1,
+                    "sha256": digest,
+                    "size": os.path.getsize(path),
+                    "feature_schema": feature_schema if feature_schema is not None else pickled_feature_names(path),
+                    "metrics": metrics,
+                    "sources": [source],
+                    "registered_at": time.strftime('%Y-%m-%dT%H:%M:%S')
+                }
+                self.manifest["models"].append(entry)
+
+                if make_current:
+                    self.manifest["current"].setdefault(track, {})[role] = entry["version"]
+        return entry
+
+    def prune_sources(self):
+        """Drops source paths whose file no longer exists in the repo, e.g. copies moved into the store."""
+        for entry in self.manifest["models"]:
+            entry["sources"] = [source for source in entry["sources"]
+                                if os.path.exists(os.path.join(REPO_DIR, source))]
+
+    def verify(self):
+        """Returns the manifest entries whose stored object is missing or no longer matches its hash."""
+        return [entry for entry in self.manifest["models"]
+                if not os.path.exists(self.object_path(entry["sha256"]))
+                or file_hash(self.object_path(entry["sha256"])) != entry["sha256"]]
+
+
+def register_folder(store, folder, track, make_current=True, metrics=None):
+    """Registers every role model found in one of the repo's model folders and returns the entries."""
+    entries = []
+    if not os.path.isdir(folder):
+        return entries
+
+    for file_name in sorted(os.listdir(folder)):
+        stem, extension = os.path.splitext(file_name)
+        if extension != '.pkl':
+            continue
+
+        # Legacy files may carry a ".1" copy suffix (model_y1_tradkeeper.1.pkl)
+        legacy_name = stem.split('.')[0]
+        if track == LEGACY_TRACK and legacy_name in LEGACY_MODEL_NAMES:
+            role = ROLES[LEGACY_MODEL_NAMES.index(legacy_name)]
+        else:
+            role = ROLE_BY_KEY.get(role_key(stem)) if stem.startswith('model_Class_') else None
+        if role is None:
+            continue
+
+        role_metrics = (metrics or {}).get(role)
+        entries.append(store.register(os.path.join(folder, file_name), role, track,
+                                      metrics=role_metrics, make_current=make_current))
+    return entries
+
+
+def bootstrap(store):
+    """Registers the repo's model folders, oldest first, so the newest models end up current.
+
+    Folders whose copies were already moved into the store (and deleted) are skipped.
+
+    The README results table describes the models saved by 3. Final Model/02-modelling.ipynb,
+    so its metrics are attached to those; the identical copies in other folders only add sources.
+    """
+    register_folder(store, os.path.join(REPO_DIR, '1. Model Formulation'), LEGACY_TRACK)
+    register_folder(store, os.path.join(REPO_DIR, '6. App Phase 2a - Squad Selection'), LEGACY_TRACK)
+    register_folder(store, os.path.join(REPO_DIR, '9. Old Model PKL Files (for 1a 1b 2a)'), LEGACY_TRACK)
+    register_folder(store, os.path.join(REPO_DIR, '3. Final Model'), FINAL_TRACK, metrics=readme_metrics())
+    register_folder(store, os.path.join(REPO_DIR, '7. App Phase 2b - Realtime Pull'), FINAL_TRACK)
+    store.prune_sources()
+    store.save()
+
+
+if __name__ == '__main__':
+    # Usage: python model_store.py register <folder> <legacy|final> | bootstrap | verify | list
+    store = ModelStore()
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+
+    if command == 'bootstrap':
+        bootstrap(store)
+    elif command == 'register':
+        folder, track = sys.argv[2], sys.argv[3]
+        metrics = readme_metrics() if track == FINAL_TRACK else None
+        for entry in register_folder(store, folder, track, metrics=metrics):
+            print(f"{entry['track']:<7} {entry['role']:<24} v{entry['version']}  {entry['sha256'][:12]}")
+        store.save()
+    elif command == 'verify':
+        broken = store.verify()
+        for entry in broken:
+            print(f"Missing or changed: {entry['track']} {entry['role']} v{entry['version']}")
+        print("All objects match the manifest." if not broken else f"{len(broken)} broken entries.")
+    else:
+        for track, current in store.manifest["current"].items():
+            for role, version in current.items():
+                entry = store.resolve(role, track, version)
+                print(f"{track:<7} {role:<24} v{version}  {entry['sha256'][:12]}  {', '.join(entry['sources']) or 'store only'}")